@@ -0,0 +1,26 @@
+"""
+Dashboard sections, each rendered on its own.
+
+streamlit_app.py used to execute the whole report top to bottom on every
+interaction, importing plotly and every data module and reading every
+dataset before the first widget could respond. Each module here holds
+one section and exposes `render()`; the app imports only the module of
+the section picked in the sidebar, so a rerun (e.g. switching the
+TensorBoard model) executes that section alone. Data shared between
+sections goes through the `FileCache` in `wildfire.data`, which lives for
+the whole server process.
+
+Streamlit "magic" only works in the main script, so text that was a bare
+string in the single-script app is an explicit `st.markdown` here.
+"""
+
+TITLE = "A World on Fire: Confronting the Growing Challenge of Wildfire Detection and Suppression"
+
+SECTIONS = {
+    "Introduction": "sections.intro",
+    "I. The Increasing Toll": "sections.toll",
+    "II. Key Causes": "sections.causes",
+    "III. Taking Action": "sections.action",
+    "Results": "sections.results",
+    "Conclusions": "sections.about",
+}
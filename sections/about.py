@@ -0,0 +1,90 @@
+"""
+Conclusions, team and tools.
+"""
+
+import streamlit as st
+
+BLOCK_11 = """
+TEAM
+
+**Ben Feuer** served as the project lead, designed and performed all the
+tests in Part III, created the interactive dashboard, created and
+maintained the repository, and wrote the final report.
+
+All other team members produced supplemental project reports, which are
+available in the repository.
+
+**Subei Han** lead the [FIRMS
+dataset](https://firms.modaps.eosdis.nasa.gov/download/) and created all
+of the analytics used in Part I, as well as portions of Part II.
+
+**Dennis Pang** and **Jinyang Xue** co-lead the investigation into the
+[NIFC
+data](https://data-nifc.opendata.arcgis.com/datasets/nifc::wfigs-wildland-fire-locations-full-history/about)
+and created portions of the analytics used in Part II.
+
+**Yuvraj Raina** lead the investigation into the [NCWG
+dataset](https://www.kaggle.com/rtatman/188-million-us-wildfires) and
+created portions of the analytics used in Part II.
+
+TOOLS
+
+All code was written and all models were trained on [Google Colab
+Pro](https://www.google.com/url?sa=t&rct=j&q=&esrc=s&source=web&cd=&cad=rja&uact=8&ved=2ahUKEwi0waHs4-30AhVZjYkEHfOtASYQFnoECAQQAQ&url=https%3A%2F%2Fcolab.research.google.com%2Fsignup&usg=AOvVaw0l1TdGCKd9vmmpE5Q0Zrk1)
+and written in [Jupyter notebooks](jupyter.org).
+
+We used [PySpark](https://spark.apache.org/docs/latest/api/python/)
+environment for the majority of our analytics. The techniques we used
+included aggregation, pivoting and window functions. When necessary, we
+used [miniconda](https://docs.conda.io/en/latest/miniconda.html) within
+Colab as an environment manager.
+
+Our graphs and charts were produced using
+[Matplotlib](https://matplotlib.org/),
+[Seaborn](https://seaborn.pydata.org/),
+[Altair](https://altair-viz.github.io/), and [Plotly
+Express](https://plotly.com/python/plotly-express/).
+
+We used [Fiona](https://pypi.org/project/Fiona/) and
+[RasterIO](https://rasterio.readthedocs.io/en/latest/) to process
+geospatial data and images.
+
+Our map visualizations were generated using
+[Folium](https://python-visualization.github.io/folium/plugins.html) and
+[Plotly Express](https://plotly.com/python/plotly-express/).
+
+Our base classifier models were written in
+[PyTorch](https://pytorch.org/) and
+[XGBoost](https://xgboost.readthedocs.io/en/stable/).
+
+We used [PyArrow](https://arrow.apache.org/docs/python/index.html) to
+generate parquet files for the distributed classifiers.
+
+Our distributed classifiers were written in [PyTorch
+Lightning](https://www.pytorchlightning.ai/),
+[Dask-ml](https://dask.org/) and
+[RAPIDS](https://developer.nvidia.com/rapids).
+
+[MongoDB Atlas](https://www.mongodb.com/atlas/database) and
+[Tensorboard](https://www.tensorflow.org/tensorboard) were used to log
+the results of the classifiers.
+
+Our interactive dashboard was created using [streamlit](streamlit.io/).
+
+LICENSE
+
+The contents of this report and repository are subject to the [MIT
+License](https://opensource.org/licenses/MIT).
+"""
+
+
+def render():
+    st.subheader("Conclusions and Future Work")
+
+    st.markdown("""
+We consider these results a promising start to understanding the full transformative potential of big data in this area. However, there is more work to be done, including robustifying our classifiers and refining our testing methodology to improve accuracy and consistency. We look forward to pursuing this work in the near future.
+""")
+
+    st.subheader("Our Team and Our Tools")
+
+    st.markdown(BLOCK_11)
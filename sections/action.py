@@ -0,0 +1,163 @@
+"""
+Section III: early detection, our methodology and key findings.
+"""
+
+import streamlit as st
+
+BLOCK_2 = """
+Wildfires play an important role in natural systems, and their
+elimination is neither practical nor desirable. However, containment of
+[megafires](https://www.nationalgeographic.org/encyclopedia/megafire/)
+could achieve the best of both worlds, preventing unnatural surges while
+allowing healthy fires to burn under close monitoring. Unfortunately, it
+is impossible to contain a fire if you don't know where it is.
+
+For this reason, it is a well-documented fact that early detection,
+partnered with prevention, must form the cornerstones of any successful
+wildfire management policy. Even small delays in detection can be very
+costly. Megafires can move at speeds of [nearly 15 miles per
+hour](https://en.wikipedia.org/wiki/Wildfire) under favorable winds.
+"""
+
+YOUTUBE = r'<iframe width="560" height="315" src="https://www.youtube.com/embed/vhJeDYQVtdQ?start=15" title="YouTube video player" frameborder="0" clipboard-write; encrypted-media; gyroscope" allowfullscreen></iframe>'
+
+BLOCK_12 = """
+At its peak, the Camp Fire is estimated to have burned an area greater
+than one [football
+field](https://www.cnn.com/2018/11/09/us/wildfires-why-they-spread-so-quickly-wcx/index.html)
+(roughly 1.32 acres) in a single second.
+
+[Pano
+AI](https://www.sfchronicle.com/travel/article/S-F-startup-uses-AI-to-detect-wildfires-before-16668146.php),
+a San Francisco startup, is one of a number of private and public
+ventures that are currently attempting to use deep learning algorithms
+to detect wildfires quickly. While Pano and U. Nevada's
+[ALERT](https://www.alertwildfire.org/) focus on aerial and ground-level
+detection, respectively, placing high-definition panoramic cameras and
+satellite transmitters everywhere from telephone poles to remote
+mountaintops, other systems, like [U.C. Berkeley's
+FUEGO](https://fuego.ssl.berkeley.edu/) and [UCSD's
+WiFire](https://wifire.ucsd.edu/), have chosen to focus on detecting
+wildfires from satellite imagery. Still others have proposed using
+[fleets of
+drones](https://spectrum.ieee.org/drones-sensors-wildfire-detection) to
+sweep high-risk areas.
+
+One thing that all of these solutions have in common is their reliance
+on state of the art deep learning models to distinguish images which
+contain fires from those which do not. These methods can be extremely
+fast and accurate, particularly when they combine image classification
+and semantic segmentation models with
+[traditional](https://www.mdpi.com/journal/remotesensing/special_issues/biomass_burning_rs)
+[algorithmic](https://doi.org/10.1016/j.rse.2016.02.027)
+[approaches](https://doi.org/10.1016/j.rse.2015.08.032). Research is
+[ongoing](https://www.mdpi.com/journal/remotesensing/special_issues/biomass_burning_rs)
+in the area, but results are promising, and data on active fires are
+currently collected in real time from
+[NASA](https://firms.modaps.eosdis.nasa.gov/download/) and
+[NOAA](https://raws.nifc.gov/) satellites, among others.
+
+Our investigation focused on the potential of distributed systems to
+improve the speed and accuracy of image classifiers on fire data, since
+improvements in these areas could decrease the cost and improve the
+utility of all fire detection systems.
+"""
+
+BLOCK_9 = """
+1.  We collected and cleaned three image classification datasets of fire
+    / non-fire images. The datasets were chosen to simulate a range of
+    natural environments in which a remote sensor could be placed; at
+    ground level, in the air, and on a satellite.
+
+2.  We designed and implemented a control group of image classifiers
+    using convention ML and DL frameworks (XGBoost and PyTorch,
+    respectively)
+
+3.  We re-implemented our models in distributed frameworks. Wherever
+    possible, we replicated the hyperparameters and architecture of the
+    model. We did, however, adapt the data ingest process to account for
+    the unique demands of distributed systems, switching from image
+    directories to parquet files in situations where they were
+    supported.
+
+4.  We logged the results of our experiments to a remote database and
+    compared them.
+"""
+
+BLOCK_10 = """
+-   With proper data cleaning and methodology, modern DL and ML models
+    are capable of achieving classification accuracy greater than 90% on
+    all three types of data, without the benefit of metadata or
+    additional algorithmic techniques.
+
+-   On average, the traditional ML boosted tree classifier was generally
+    less accurate than deep CNNs -- however, the difference was often
+    not large, and careful cleaning and preparation of data it was
+    possible to eliminate much of the difference
+
+-   The boosted tree classifier was, on average, between 2x and 3x
+    faster than the deep CNNs, on both training and inference.
+
+-   When multispectral data was available (as in the case of the
+    Landsat-8 GeoTIFF files), training the classifier on all 10 bands
+    was prohibitively slow and led to worse results. The choice of bands
+    was pivotal in achieving peak accuracy, particularly the boosted
+    tree classifiers, which are not location-invariant. Specifically,
+    the use of SWIR data ([bands 6 and
+    7](https://www.usgs.gov/faqs/what-are-band-designations-landsat-satellites)
+    for Landsat-8) improved accuracy dramatically.
+
+-   Google Colab Pro is a poor environment for distributed computing
+    experiments because of its lack of support for virtual environments,
+    unpredictable hardware assignments and frequent timeouts. Future
+    experiments should be conducted on a different cloud service or on
+    the HPC.
+
+-   Dask-ml and RAPIDS are considerably less mature than PySpark, and
+    remain rough around the edges. For instance, RAPIDS cannot be
+    installed in a non-conda environment, and Dask and RAPIDS both lack
+    direct support for ANY deep learning framework, although it is
+    possible to distribute certain aspects of a PyTorch model manually
+    using Dask's joblib (we did not attempt this). However, their
+    potential for distributed learning is unparalleled because RAPIDS
+    allows the offloading of massive datasets from the GPU to RAM
+    without disrupting training -- this means that the size of a RAPIDS
+    dataset is (in theory) bounded only by the hardware it is running
+    on.
+
+-   PyTorch Lightning includes built-in SLURM support and highlights the
+    powerful flexibility of the underlying PyTorch architecture --
+    switching from a fully local to a fully distributed environment in
+    Lightning involves changing just one line of code, unlike in
+    Dask/RAPIDS, where it requires a complete refactor.
+
+-   Even in the completely sub-optimal distributed environment (one
+    node, one GPU, remote training) under which these experiments were
+    conducted, distributed models were either as fast or faster than
+    their non-distributed counterparts (20% faster, on average). We
+    attribute this difference to more efficient data processing.
+
+-   Accuracy varied wildly between distributed and non-distributed
+    models. We are still trying to account for the reasons for these
+    differences -- however, we suspect it has to do with the different
+    frameworks either processing the data differently or running with
+    different default hyperparameters.
+"""
+
+
+def render():
+    st.subheader("SECTION III: Taking Action on Wildfires")
+
+    st.markdown(BLOCK_2)
+
+    st.components.v1.html(YOUTUBE)
+
+    st.markdown(BLOCK_12)
+
+    st.subheader("Our Methodology")
+
+    st.markdown(BLOCK_9)
+
+    st.subheader("Key Findings")
+
+    st.markdown(BLOCK_10)
@@ -0,0 +1,234 @@
+"""
+Section II: where wildfires burn and what starts them.
+"""
+
+import os
+
+import plotly.express as px
+import streamlit as st
+
+from wildfire import assets
+from wildfire import data
+from wildfire import fpafod
+from wildfire import perimeters
+from wildfire import tiles
+
+# years of the burned-area maps
+MAP_YEARS = (2000, 2020)
+
+
+def render():
+    st.subheader("SECTION II: Understanding Key Wildfire Causes")
+
+    st.markdown("""
+In Section I, we showed that wildfires have indeed grown more frequent
+and more intense. However, in order to consider how best to combat the
+issue, we must consider another aspect of the problem.
+
+**Can we draw any meaningful conclusions about the causes and locations
+of these wildfires, and can we use this information to better evaluate
+potential solutions?**
+
+To answer this question, we may begin by noting that this increase is
+not evenly distributed among all states. Historically, the drier states
+west of the Mississippi river have accounted for nearly all of the major
+wildfires by acreage burned, and this continues to be true, as this
+[NCWG dataset](https://www.kaggle.com/rtatman/188-million-us-wildfires)
+shows.
+""")
+
+    st.image(assets.image(".//media/image4.png"), caption="A map depicting the location of large wildfires, 2000-2020")
+
+    st.markdown("""
+Drought-ridden California, in particular, accounts for a
+disproportionate share of the increase in 2020, as we can see below in
+this [FIRMS dataset](https://firms.modaps.eosdis.nasa.gov/download/)
+graph of fire frequency by region (with regions represented as (lat,
+long) coordinate pairs).
+""")
+
+    if os.path.isdir(data.FIRMS_TILES):
+        map_years = st.slider("Years", 2001, 2020, (2019, 2020))
+        map_region = st.radio("Region", ("California", "United States"))
+        bbox = tiles.CA_BBOX if map_region == "California" else tiles.US_BBOX
+        cells = tiles.query(data.FIRMS_TILES, bbox, map_years)
+        fig = px.scatter_geo(cells, lat="latitude", lon="longitude", size="count", color="count", scope="usa",
+                             title="FIRMS fire detections, {}-{}".format(*map_years))
+        st.plotly_chart(fig)
+    else:
+        st.image(assets.image(".//media/image5.png"), caption="A surge in California wildfires in 2020")
+
+    st.markdown("""
+Indeed, if we consider the raw increase in number of reported fires
+year-over-year, California consistently shows up as a hotspot. 
+Using data from NOAA's NIDIS Drought monitor, we can see that the recent
+droughts in California correlate closely with peak fire years recorded
+in FIRMS.
+""")
+
+    st.image(assets.image(".//media/image7.jpeg"), caption="NOAA NIDIS Drought Data in California")
+
+    st.markdown("""
+These data suggest that an increase in drought conditions is strongly
+correlated with an increase in wildfire frequency and intensity, and
+that [ongoing conditions](https://climate.nasa.gov/evidence/) leading to
+extreme shifts in climate may also be driving the surge in wildfires we
+have documented above.
+
+We can further confirm this by considering how regional data on wildfire
+causes, sourced from [NIFC WFIGS Wildfire
+Locations](https://data-nifc.opendata.arcgis.com/datasets/nifc::wfigs-wildland-fire-locations-full-history/about)
+data, influence the problem.
+
+By raw count, human-initiated wildfires exceed that of natural
+wildfires. Furthermore, human-initiated wildfires are increasing in
+frequency, whereas the frequency of natural wildfires has remained flat.
+""")
+
+    if data.wfigs_available():
+        per_state = data.load_wfigs_per_state(years=(2014, None), by_year=True)
+        fig = px.choropleth(per_state, locations="state", locationmode="USA-states", color="count", range_color=[0, 5000],
+                            animation_frame="year", animation_group="state", scope="usa", title="NIFC wildfires per state")
+        st.plotly_chart(fig)
+        by_cause = data.load_wfigs_by_cause()
+        fig = px.line(by_cause, x=by_cause.index, y=by_cause.columns, title="NIFC Causes of Wildfires over time")
+        st.plotly_chart(fig)
+    else:
+        st.image(assets.image(".//media/image9.png"), caption="NIFC Causes of Wildfires")
+        st.image(assets.image(".//media/image8.png"), caption="NIFC Causes of Wildfires over time")
+
+    st.markdown("""
+This might seem to contradict our earlier conclusions
+about drought being a major driver of increasing wildfire intensity.
+However, when we look at area burned in this [NCWG
+dataset](https://www.kaggle.com/rtatman/188-million-us-wildfires), we
+can see that the story is in fact quite different. Lightning alone
+accounts for more burned area than all other causes combined, with room
+to spare.
+""")
+
+    if os.path.isdir(data.FPAFOD_ROOT):
+        store = data.load_fpafod()
+        burn_years = st.slider("Fire years", *store.years, store.years)
+        burn_states = st.multiselect("States", store.states)
+        by_cause = store.aggregate(by=["cause"], years=burn_years, states=burn_states or None)
+        fig = px.bar(by_cause.sort_values("acres"), x="acres", y="cause", orientation="h",
+                     title="NCWG burned area by cause, {}-{}".format(*burn_years))
+        st.plotly_chart(fig)
+    else:
+        st.image(assets.image(".//media/image10.png"), caption="Burned area aggregated by cause")
+
+    st.markdown("""
+The explanation for this is well understood \-- fires started by human
+beings tend to occur in populated areas, and are therefore more likely
+to be detected and contained before they grow into uncontained
+megafires. Fires caused by lightning (and to a lesser extent,
+malfunctioning electrical equipment) tend to happen in remote and
+inaccessible areas and are more difficult to detect and combat
+effectively.
+
+This fact accounts for the following
+graph. Alaska is the bottom third of states for wildfire frequency.
+However, in terms of acreage burned, it exceeds the bottom twenty states
+in the list combined. Alaska's low population and rugged terrain make it
+a very difficult environment for firefighters.
+""")
+
+    if os.path.isdir(data.FPAFOD_ROOT):
+        burn_causes = st.multiselect("Causes", store.causes)
+        by_state = store.aggregate(by=["state"], years=burn_years, causes=burn_causes or None)
+        fig = px.bar(by_state.sort_values("acres", ascending=False), x="state", y="acres",
+                     title="NCWG burned area by state, {}-{}".format(*burn_years))
+        st.plotly_chart(fig)
+        st.markdown("In {}-{}, Alaska burned more acreage than the bottom {} states combined.".format(
+            *burn_years, fpafod.exceeded_states(store, "AK", burn_years)))
+    else:
+        st.image(assets.image(".//media/image11.png"), caption="Burned area aggregated by state")
+
+    st.markdown("""
+Although large uncontrolled forest fires have always been a historical
+fact of life, that does not mean that the size and frequency of
+wildfires we are seeing today is somehow natural. Indeed, it is likely
+that the side-effects of man-made climate change, such as the droughts
+we documented above, are driving a vicious cycle in the environment
+which itself contributes to further climate change. [Consider that from
+1950 until 2009, forest fires in Alaska have released CO2 equal to half
+of all carbon emissions from the european
+union.](https://www.Dw.Com/en/forest-fires-in-alaska-a-ticking-climate-time-bomb/a-18684423)
+Uncontrolled wildfire, natural or not, poses a significant climate
+threat when ignored.
+
+Alaska's northerly latitude has previously protected it from large-scale
+wildfires -- simply put, where there's ice, there isn't fire. However,
+ice coverage has [dropped precipitously in
+Alaska](https://www.carbonbrief.org/humans-causing-up-to-two-thirds-arctic-summer-sea-ice-loss-study-confirms)
+since the 1970s, and at least 50% of this loss is caused by greenhouse
+gas emissions.
+
+Furthermore, there is reason to believe that as Earth's climate
+continues to change, so may the regional character of fire distribution
+in the United States. According to [NIFC
+data](https://data-nifc.opendata.arcgis.com/datasets/nifc::wfigs-wildland-fire-locations-full-history/about),
+in 2021, midwestern states have had fire counts similar to those found
+in West Coast states in 2014 and 2015. Even more alarmingly, as we can
+see in the maps below from 2002 (left) and 2020 (right), the majority of
+wildfire burned area is no longer a Western state problem; in 2020, all
+but a handful of states saw enough annual burned area to register on the
+chart.
+""")
+
+    if os.path.exists(data.BURNED_CUBE):
+        burned = data.load_burned()
+        burned = burned[burned["year"].between(*MAP_YEARS)]
+        fig = px.choropleth(burned, locations="state", locationmode="USA-states", color="percent", range_color=[0, 10],
+                            animation_frame="year", animation_group="state", scope="usa", hover_data=["acres", "fires"],
+                            title="Percent of State Burned, {}-{}".format(*MAP_YEARS))
+        st.plotly_chart(fig)
+    else:
+        st.image(assets.image(".//media/image12.jpg"), caption="2002 Map: Percent of State Burned")
+        st.image(assets.image(".//media/image13.jpg"), caption="2020 Map: Percent of State Burned")
+
+    shape_years = []
+    if os.path.isdir(os.path.join(data.PERIMETERS_ROOT, "shapes")):
+        shape_years = [y for y in perimeters.shape_years(data.PERIMETERS_ROOT) if MAP_YEARS[0] <= y <= MAP_YEARS[1]]
+    if shape_years:
+        perim_year = st.slider("Perimeter year", shape_years[0], shape_years[-1], shape_years[-1])
+        perim_state = st.selectbox("Perimeters in", ["United States"] + sorted(perimeters.STATE_SQMI))
+        states = None if perim_state == "United States" else [perim_state]
+        shapes = perimeters.shapes(perim_year, states, root=data.PERIMETERS_ROOT)
+        props = [f["properties"] for f in shapes["features"]]
+        fig = px.choropleth(geojson=shapes, locations=[f["id"] for f in shapes["features"]],
+                            color=[prop["acres"] for prop in props], hover_name=[prop["name"] for prop in props],
+                            featureidkey="id", scope="usa", labels={"color": "acres"},
+                            title="Fire perimeters, {} ({})".format(perim_year, perim_state))
+        if states is not None:
+            fig.update_geos(fitbounds="locations")
+        st.plotly_chart(fig)
+
+    st.markdown("""
+Overall, the data lead us to conclude that the size and scale of
+lightning-caused wildfires is the major driver of the overall increase
+in wildfire intensity and acreage burned, which is in turn driven by
+changes in Earth's climate. We further conclude that the scope of the
+problem is broadening to include areas which were previously protected,
+which is likely to continue the vicious cycle of the destruction of
+forests, which serve as natural [carbon
+sinks](https://www.wri.org/insights/forests-absorb-twice-much-carbon-they-emit-each-year),
+and the corresponding release of CO2 into the atmosphere.
+
+The unhappy fact is that the challenges represented by these findings
+are predominantly the result of long-term, collective policies and
+incentives rather than individual choices. While it remains vitally
+important for vacationers to extinguish their campfires and cigarettes
+fully before leaving a forest, it will not and cannot make Alaskan
+mountain ranges easier to traverse, nor can it stop the polar ice caps
+from vanishing.
+
+As such, we contend that systemic solutions are demanded. Governor Gavin
+Newsom of California recognized this fact with his [recent dedication of
+funds](https://www.google.com/url?sa=t&rct=j&q=&esrc=s&source=web&cd=&cad=rja&uact=8&ved=2ahUKEwjzm4qu2u30AhWVjIkEHSAABNQ4ChAWegQIBRAB&url=https%3A%2F%2Fwww.gov.ca.gov%2F2021%2F04%2F13%2Fgovernor-newsom-signs-landmark-536-million-wildfire-package-accelerating-projects-to-protect-high-risk-communities%2F&usg=AOvVaw090ezI0vcqoykBw5YD8to4)
+to wildfire suppression. While national and state policy and budgeting
+decisions are well beyond the scope of this report, we can address a
+different aspect of the challenge -- the role of deep learning models in
+early detection of wildfires.
+""")
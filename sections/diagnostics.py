@@ -0,0 +1,54 @@
+"""
+Diagnostics panel: section render times, loader spans, cache hit rates and
+memory, from `wildfire.instrument`. Shown from the sidebar when the server
+runs with WILDFIRE_TRACE=1; the numbers cover every session in the process.
+"""
+
+import json
+
+import pandas as pd
+import streamlit as st
+
+from wildfire import instrument
+
+SECTION_PREFIX = "section/"
+
+STAT_COLS = ["calls", "total_s", "mean_ms", "max_ms", "errors"]
+
+
+def _spans(stats, strip=""):
+    rows = [(name[len(strip):], n, total, mean * 1000, peak * 1000, errors)
+            for name, (n, total, mean, peak, errors) in stats.items()]
+    return pd.DataFrame(rows, columns=["span"] + STAT_COLS).set_index("span")
+
+
+def render():
+    st.subheader("Diagnostics")
+
+    snap = instrument.snapshot("diagnostics")
+    st.metric("Resident memory (MB)", round(snap["rss"] / 2 ** 20, 1))
+    if "traced_peak" in snap:
+        st.metric("Peak traced Python memory (MB)", round(snap["traced_peak"] / 2 ** 20, 1))
+
+    st.markdown("**Section render time**")
+    st.table(_spans(instrument.span_stats(SECTION_PREFIX), SECTION_PREFIX))
+
+    st.markdown("**Loaders and queries**")
+    stats = {k: v for k, v in instrument.span_stats().items() if not k.startswith(SECTION_PREFIX)}
+    st.table(_spans(stats))
+
+    st.markdown("**Caches**")
+    caches = pd.DataFrame([(name, hits, misses, rate) for name, (hits, misses, rate) in instrument.cache_stats().items()],
+                          columns=["cache", "hits", "misses", "hit_rate"]).set_index("cache")
+    st.table(caches)
+
+    counters = instrument.counters()
+    if counters:
+        st.table(pd.Series(counters, name="count").to_frame())
+
+    st.download_button("Prometheus metrics", instrument.prometheus_text(), file_name="metrics.prom")
+    st.download_button("JSON trace", json.dumps(instrument.trace()), file_name="trace.json")
+    profiler = instrument.profiler()
+    if profiler is not None:
+        st.download_button("Profile (folded stacks, {} samples)".format(profiler.samples), profiler.folded(),
+                           file_name="profile.folded")
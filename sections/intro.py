@@ -0,0 +1,83 @@
+"""
+Title page: team, abstract and the Dixie Creek case study.
+"""
+
+import streamlit as st
+
+from wildfire import assets
+
+DIXIE_FIRE = "results/img/dixie.gif"
+
+CAPTION = "Satellite imagery from 2021's Dixie Creek Fire in Oregon"
+
+BLOCK_7 = """
+This report aims to succinctly document the existence of a novel and
+growing threat in the United States -- the rise of uncontrolled
+megafires driven primarily by climate change. It lays out the reasons it
+is reasonable to believe that the frequency and intensity of fires is
+increasing, and why systemic climate change is the likely culprit for
+these changes. Finally, it addresses how recent advances in distributed
+technology can potentially lead to successful and timely interventions
+by professional firefighting teams.
+
+Below is a summary of the three major points we cover \--
+
+-   I. Recent evidence derived from data released by US Government
+    agencies leads us to conclude that wildfires pose an increasing
+    threat to the lives and property of United States citizens.
+
+-   II\. This threat is driven by changes at the level of society rather than
+    the individual, and as such, we must seek systemic, structural solutions
+    to the problem.
+
+-   III\. Distributed deep learning models for image classification can potentially improve wildfire emergency team response times and thereby reduce wildfire spread.
+
+Afterwards, we offer a brief conclusion and a list of resources for
+further exploration.
+"""
+
+BLOCK_6 = """
+The images below are from a 2021 California wildfire called Dixie Creek. By August 6, it had grown to become the largest single (i.e. non-complex) wildfire in the state's history, and the second-largest overall (after the August Complex fire of 2020),[7][8] bigger than the state of Rhode Island, according to Wikipedia.
+"""
+
+DIX_IMG = "https://upload.wikimedia.org/wikipedia/commons/thumb/5/52/Pyrocumulus_cloud_produced_by_the_Dixie_Fire_on_July_22-5865.jpg/2560px-Pyrocumulus_cloud_produced_by_the_Dixie_Fire_on_July_22-5865.jpg"
+
+DIX_CAPT = "The Dixie Creek Wildfire from ground level."
+
+
+def render():
+    st.header("Team Members")
+
+    st.markdown("Benjamin Feuer, Dennis Pang, Jinyang Xue, Subei Han, Yuvraj Raina")
+
+    st.markdown("For more analysis and notebooks containing the code used to generate this project, please visit out [project Github.](https://github.com/penfever/bigdata-proj)")
+
+    st.subheader("ABSTRACT")
+
+    st.markdown(BLOCK_7)
+
+    st.subheader("Case Study: Dixie Creek")
+
+    st.markdown(BLOCK_6)
+
+    st.image(assets.image(DIX_IMG), caption=DIX_CAPT)
+
+    clip = assets.video(DIXIE_FIRE)
+    if clip is None:
+        st.image(DIXIE_FIRE, caption=CAPTION, width=None, use_column_width=None, clamp=False, channels="RGB", output_format="auto")
+    else:
+        st.video(*clip)
+        st.caption(CAPTION)
+
+    st.markdown("These shocking images were captured by NASA's high-resolution MODIS imager and converted from GEOTIFF to RGB format crops which you see here. The images are spread out over a series of weeks. Note the massive smoke trail that develops and fades, clearly visible from space.")
+
+    st.image(assets.image(".//media/image18.jpeg"), caption="A home burns in Plumas County. Source: NY Times")
+
+    st.markdown("""
+Yet, at ground level, the message is all too easy to comprehend.
+
+This year, it was the homes, stores and services Plumas County that were
+razed to the ground.
+
+Next year, it could be ours.
+""")
@@ -0,0 +1,82 @@
+"""
+Classifier results: run tables, learning curves and TensorBoard runs.
+"""
+
+import plotly.express as px
+import streamlit as st
+
+from wildfire import assets
+from wildfire import data
+from wildfire import tensorboard
+
+TB = "results/img/tb_vid.mp4"
+
+TB_CAPTION = "Animated demonstration of interactive Tensorboard dashboard"
+
+TB_RUNS = {
+    "Densenet: Ground": "results/tensorboard/densenet",
+    "Resnet: Ground": "results/tensorboard/resnet",
+    "Densenet: Aerial": "results/tensorboard/densenet_aerial",
+}
+
+TB_CHARTS = {
+    "Accuracy": ["train_acc", "val_acc"],
+    "Loss": ["train_loss", "val_loss"],
+}
+
+BLOCK_3 = """
+Without distributed computing methods, our entire dataset has to be loaded into the RAM of a single node. This is not always possible, and even when it is possible, it is much slower.
+"""
+
+BLOCK_4 = """
+Distributed computing techniques enable us to generate results faster, and in some cases more accurately as well -- because we are able to distribute the load across multiple nodes, we can pick optimal settings for hyperparameters like batch size, which are usually constrained by the amount of GPU memory we have available.
+"""
+
+
+def render():
+    st.subheader("Without Distributed Computing")
+
+    st.markdown(BLOCK_3)
+
+    results = data.load_results(data.IC_RES)
+
+    st.write(results.wdc)
+
+    st.subheader("With Distributed Computing (XGBoost / Dask / RAPIDS)")
+
+    st.markdown(BLOCK_4)
+
+    st.write(results.dc)
+
+    st.subheader("Learning Curves")
+
+    curve_set = st.selectbox("Dataset", sorted(results.runs["dataset"].unique()))
+
+    curves = data.load_curves(dataset=curve_set)
+    curves = curves[~curves["phase"].isin(["Test"])]
+    curves = curves.merge(results.runs[["_id", "name"]], on="_id")
+    fig = px.line(curves, x="step", y="acc", color="name", line_dash="phase", title="Accuracy per epoch")
+    st.plotly_chart(fig)
+
+    st.subheader("With Distributed Computing (PyTorch Lightning)")
+
+    st.markdown("Please select a model to view its Tensorboard training curves.")
+
+    mod_pick = st.radio(
+         "Pick a model",
+         ("Animation", 'Densenet: Ground', 'Resnet: Ground', 'Densenet: Aerial'))
+
+    if mod_pick == "Animation":
+        # with ASSET_URL set the browser streams the file itself, with range requests
+        clip = assets.video(TB) or (TB, "video/mp4")
+        st.video(*clip)
+    else:
+        st.subheader(mod_pick)
+        run = tensorboard.load_run(TB_RUNS[mod_pick])
+        for title, tags in TB_CHARTS.items():
+            curves = tensorboard.curves_frame(run, tags)
+            fig = px.line(curves, x="step", y="value", color="tag", line_dash="version", title=title)
+            st.plotly_chart(fig)
+        test = tensorboard.curves_frame(run, ["test_acc", "test_loss"])
+        st.table(test[["tag", "version", "step", "value"]])
+        st.write(run.hparams)
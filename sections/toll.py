@@ -0,0 +1,133 @@
+"""
+Section I: frequency, intensity and public interest in wildfires.
+"""
+
+import calendar
+
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from wildfire import assets
+from wildfire import data
+from wildfire import firms
+from wildfire import rollups
+from wildfire import trends
+
+# yearly aggregate of the monthly Trends series
+INTEREST = {"Yearly peak": "peak", "Yearly mean": "mean"}
+
+WF_TREND = "https://www.epa.gov/sites/default/files/2021-04/wildfires_download2_2021.png"
+
+BLOCK_8 = """
+In order to justify increased action on wildfire prevention, we must
+first address the underlying implications of our investigation.
+
+**Do wildfires pose an increasing threat to the lives and property of
+United States citizens?**
+
+One possible measure of wildfire threat is a raw frequency count of
+wildfires per year, like the one we see here, aggregated from NASA's
+[FIRMS dataset](https://firms.modaps.eosdis.nasa.gov/download/). (2021
+is omitted throughout this report because for that year, the data remain
+incomplete as of this writing.)
+"""
+
+BLOCK_5 = """
+According to National Interagency Fire Center data, of the 10 years with the largest acreage burned, all have occurred since 2004, including the peak year in 2015. This period coincides with many of the warmest years on record nationwide (see the U.S. and Global Temperature indicator). The largest increases have occurred during the spring and summer months.
+"""
+
+
+def render():
+    st.subheader("SECTION I: Recognizing the Increasing Toll of Wildfires")
+
+    st.markdown(BLOCK_8)
+
+    if data.firms_available():
+        firms_cube = data.load_firms()
+        fig = px.line(firms.by_year(firms_cube, firms.EXCLUDE_YEARS), x="year", y="count", title="Wildfires per year, 2001-2020")
+        st.plotly_chart(fig)
+        year, months, count, prior = rollups.year_to_date(firms_cube)
+        if year > 2020:
+            # a partial year is compared with the same months of the year before
+            st.metric("Wildfires in {} so far".format(year), count, None if prior is None else count - prior,
+                      help="Change from January-{} {}".format(calendar.month_name[months], year - 1))
+    else:
+        firms_cube = None
+        st.image(assets.image(".//media/image1.png"), caption="Wildfires per year, 2001-2020")
+
+    st.markdown("""
+By this metric, wildfire frequency in 2020 was the 2nd-highest out of
+the entire 20-year record, and 60% of the 5 peak years occurred between
+2015 and 2020, which represents only 30% of the dataset.
+
+The data on the intensity of these wildfires tells a similar story. We
+see that the average fire intensity, as measured by sub-pixel fire
+radiative power retrievals (**FRP**)\[Csiszar et al., 2014\] and
+apparent brightness, both reached new records in 2020.
+""")
+
+    if firms_cube is not None:
+        fig = px.line(firms.mean_by_year(firms_cube, "frp", firms.EXCLUDE_YEARS), x="year", y="frp", title="Wildfire FRP per year, 2001-2020")
+        st.plotly_chart(fig)
+        fig = px.line(firms.mean_by_year(firms_cube, "brightness", firms.EXCLUDE_YEARS), x="year", y="brightness", title="Wildfire Apparent Brightness per year, 2001-2020")
+        st.plotly_chart(fig)
+    else:
+        st.image(assets.image(".//media/image2.png"), caption="Wildfire FRP per year, 2001-2020")
+        st.image(assets.image(".//media/image3.png"), caption="Wildfire Apparent Brightness per year, 2001-2020")
+
+    st.markdown("""
+By all three of these measures, we can see that wildfires are increasing
+in frequency and intensity. It is logical to conclude that more frequent
+and more intense wildfires will cause greater damage to life, property
+and ecosystem and will require greater resources to combat, and indeed
+the evidence bears this out \-- federal wildfire suppression costs in
+the United States have spiked from an annual average of about \$425
+million from 1985 to 1999 to \$1.6 billion from 2000 to 2019, according
+to data from
+[NIFC](https://www.nfpa.org/News-and-Research/Publications-and-media/NFPA-Journal/2020/November-December-2020/Features/Wildfire).
+In 2017 alone, damage from wildfires across the US exceeded a staggering
+[\$18 billion](https://www.iii.org/graph-archive/208963). Other parts of
+the world are being hit hard, too. This past summer, Spain suffered the
+worst wildfires that [it's seen in 20
+years](https://www.theguardian.com/world/2019/jun/27/hundreds-of-firefighters-tackle-blaze-in-north-east-spain),
+while [thousands of fires
+burned](https://www.nationalgeographic.com/environment/2019/08/amazon-fires-cause-deforestation-graphic-map/)
+in the Amazon Rainforest, an increase of [over 80 percent compared to
+the same time period last
+year](http://queimadas.dgi.inpe.br/queimadas/portal-static/situacao-atual/).
+""")
+
+    st.markdown(BLOCK_5)
+
+    st.image(assets.image(WF_TREND))
+
+    st.markdown("As the damage caused by wildfires intensifies, so does public interest in a more complete understanding of its causes and consequences.")
+
+    interest_how = st.radio("Google Trends interest", list(INTEREST))
+    dfg_agg = data.load_interest(data.GF_RES, INTEREST[interest_how])
+    title = "Year over year {} interest in wildfires (Google Trends)".format(INTEREST[interest_how])
+    if firms_cube is None:
+        fig = px.line(dfg_agg, x="year", y="wildfire", title=title)
+        st.plotly_chart(fig)
+    else:
+        activity = trends.activity(firms_cube, firms.EXCLUDE_YEARS)
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(go.Scatter(x=dfg_agg["year"], y=dfg_agg["wildfire"], name="Google Trends interest"))
+        fig.add_trace(go.Scatter(x=activity.index, y=activity["count"], name="FIRMS wildfires"), secondary_y=True)
+        fig.update_layout(title=title + " and FIRMS wildfires per year")
+        st.plotly_chart(fig)
+        corr = trends.lagged_correlation(dfg_agg.set_index("year")["wildfire"], activity["count"])
+        # needs at least three overlapping years at some lag
+        if corr["r"].notna().any():
+            same_year = corr.loc[corr["lag"] == 0, "r"].iloc[0]
+            best = corr.loc[corr["r"].abs().idxmax()]
+            lag = int(best["lag"])
+            if lag == 0:
+                strongest = "strongest in the same year"
+            else:
+                strongest = "strongest with interest {} year{} {}".format(abs(lag), "" if abs(lag) == 1 else "s",
+                                                                          "behind" if lag > 0 else "ahead")
+            st.caption("Correlation with FIRMS wildfire counts: r = {:.2f} in the same year, {} (r = {:.2f})."
+                       .format(same_year, strongest, best["r"]))
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from wildfire import rollups
+
+HEADER = ["latitude", "longitude", "brightness", "scan", "track", "acq_date", "acq_time", "satellite",
+          "instrument", "confidence", "version", "bright_t31", "frp", "daynight", "type"]
+
+
+def _fires(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2020-06-01") + pd.to_timedelta(rng.integers(0, 400, n), unit="D")
+    return pd.DataFrame({
+        "latitude": rng.uniform(25, 49, n).round(4),
+        "longitude": rng.uniform(-124, -67, n).round(4),
+        "brightness": rng.uniform(300, 450, n).round(1),
+        "scan": 1.0, "track": 1.0,
+        "acq_date": dates.strftime("%Y-%m-%d"),
+        "acq_time": rng.integers(0, 2400, n),
+        "satellite": "Terra", "instrument": "MODIS",
+        "confidence": rng.integers(0, 100, n),
+        "version": "6.1", "bright_t31": 290.0,
+        "frp": rng.uniform(1, 200, n).round(1),
+        "daynight": "D", "type": 0,
+    })[HEADER]
+
+
+def _count(store):
+    return int(rollups.load(store)["count"].sum())
+
+
+def test_ingest_same_file_twice_is_noop(tmp_path):
+    store, path = str(tmp_path / "store"), str(tmp_path / "nrt.csv")
+    _fires(1000).to_csv(path, index=False)
+    assert rollups.ingest(store, path)
+    expected = _count(store)
+    assert rollups.ingest(store, path) == []
+    assert _count(store) == expected
+
+
+def test_grown_file_replaces_its_earlier_rows(tmp_path):
+    store, path = str(tmp_path / "store"), str(tmp_path / "nrt.csv")
+    fires = _fires(2000)
+    fires.iloc[:1000].to_csv(path, index=False)
+    rollups.ingest(store, path)
+    fires.to_csv(path, index=False)
+    rollups.ingest(store, path)
+
+    fresh, other = str(tmp_path / "fresh"), str(tmp_path / "all.csv")
+    fires.to_csv(other, index=False)
+    rollups.ingest(fresh, other)
+    assert _count(store) == _count(fresh)
+    pd.testing.assert_frame_equal(rollups.load(store), rollups.load(fresh))
+
+
+def test_rewritten_file_drops_years_it_no_longer_has(tmp_path):
+    store, path = str(tmp_path / "store"), str(tmp_path / "nrt.csv")
+    fires = _fires(500)
+    fires.to_csv(path, index=False)
+    rollups.ingest(store, path)
+    assert rollups.stored_years(store) == [2020, 2021]
+    fires[fires["acq_date"] < "2021"].to_csv(path, index=False)
+    rollups.ingest(store, path)
+    assert rollups.stored_years(store) == [2020]
@@ -0,0 +1,3 @@
+"""
+Data access and pipeline helpers for the Wildfire Web App
+"""
@@ -0,0 +1,126 @@
+"""
+Cold start and rerun times of the dashboard, per section.
+
+Streamlit executes the app script once when a session opens and again on
+every widget interaction. This times both in fresh interpreters, with
+streamlit already imported as it is in a running server:
+
+    cold    first execution: imports, data loads and rendering
+    rerun   a later execution in the same process (median), as after a
+            widget change
+
+for the app as served (`streamlit_app.py`, which renders the first
+section), for each module in `sections` on its own, and optionally for a
+single-script version of the app to compare against. Outside a server
+Streamlit elements render to nothing and widgets return their defaults.
+Results go to results/bench/apptime.json.
+
+    python -m wildfire.apptime --baseline-rev <commit before the sections split>
+    python -m wildfire.apptime --baseline old_streamlit_app.py --repeats 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+APP = "streamlit_app.py"
+
+APPTIME_OUT = "results/bench/apptime.json"
+
+# fresh processes per target
+REPEATS = 3
+
+# executions after the first in each process
+RERUNS = 3
+
+_PROBE = r"""
+import importlib, json, runpy, sys, time
+import streamlit
+target, kind, reruns = sys.argv[1], sys.argv[2], int(sys.argv[3])
+before = len(sys.modules)
+times = []
+for _ in range(reruns + 1):
+    t = time.perf_counter()
+    if kind == "script":
+        runpy.run_path(target, run_name="__main__")
+    else:
+        importlib.import_module(target).render()
+    times.append(time.perf_counter() - t)
+print(json.dumps({"times": times, "modules": len(sys.modules) - before}))
+"""
+
+
+def probe(target, kind, root, reruns=RERUNS):
+    """One fresh interpreter: execution times and the number of modules the target imported."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    out = subprocess.run([sys.executable, "-c", _PROBE, target, kind, str(reruns)], cwd=root, env=env,
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError("{} failed:\n{}".format(target, out.stderr))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(target, kind, root, repeats=REPEATS, reruns=RERUNS):
+    runs = [probe(target, kind, root, reruns) for _ in range(repeats)]
+    return {
+        "cold_s": float(np.median([r["times"][0] for r in runs])),
+        "rerun_s": float(np.median([t for r in runs for t in r["times"][1:]])) if reruns else None,
+        "modules": runs[0]["modules"],
+    }
+
+
+def baseline_script(rev, root, app=APP):
+    """Write the app script as of git revision `rev` to a temporary file."""
+    source = subprocess.run(["git", "show", "{}:{}".format(rev, app)], cwd=root, check=True,
+                            capture_output=True, text=True).stdout
+    fd, path = tempfile.mkstemp(suffix=".py", prefix="baseline_app_")
+    with os.fdopen(fd, "w") as f:
+        f.write(source)
+    return path
+
+
+def report(root=".", baseline=None, repeats=REPEATS, reruns=RERUNS):
+    """One row per target; with a baseline, speedups of each row against it."""
+    from sections import SECTIONS
+
+    root = os.path.abspath(root)
+    targets = [("app", os.path.join(root, APP), "script")]
+    targets += [(label, module, "module") for label, module in SECTIONS.items()]
+    if baseline is not None:
+        targets.insert(0, ("baseline", os.path.abspath(baseline), "script"))
+    rows = [dict(target=name, **measure(target, kind, root, repeats, reruns)) for name, target, kind in targets]
+    table = pd.DataFrame(rows)
+    if baseline is not None:
+        base = table.iloc[0]
+        table["cold_speedup"] = base["cold_s"] / table["cold_s"]
+        table["rerun_speedup"] = base["rerun_s"] / table["rerun_s"]
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time cold starts and reruns of the dashboard sections")
+    parser.add_argument("--root", default=".", help="directory holding streamlit_app.py")
+    baselines = parser.add_mutually_exclusive_group()
+    baselines.add_argument("--baseline", default=None, help="single-script app to compare against")
+    baselines.add_argument("--baseline-rev", default=None, help="git revision whose streamlit_app.py is the baseline")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--reruns", type=int, default=RERUNS)
+    parser.add_argument("--out", default=APPTIME_OUT)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.root))
+    baseline = baseline_script(args.baseline_rev, args.root) if args.baseline_rev else args.baseline
+    try:
+        table = report(args.root, baseline, args.repeats, args.reruns)
+    finally:
+        if args.baseline_rev:
+            os.remove(baseline)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(table.to_dict(orient="records"), f, indent=1)
+    print(table.to_string(index=False, float_format="{:.3f}".format))
@@ -0,0 +1,410 @@
+"""
+Media asset build step and delivery helpers for the Wildfire Web App.
+
+The app shipped its PNG/JPEG figures from `media/` at full size (Streamlit
+re-decodes and resizes anything wider than the page on every render),
+the 1.8 MB `dixie.gif`, a TensorBoard MP4 read into memory with
+`open(TB, 'rb').read()` on every rerun, and hotlinked two images from
+Wikimedia and the EPA. `build` writes everything the pages show into
+results/assets, named by content hash:
+
+    <name>-<width>w-<hash>.webp|.avif   resized derivatives, never upscaled
+    <name>-<hash>.mp4|.webm             GIFs as video (ffmpeg H.264 when
+                                        installed, else VP9 through OpenCV);
+                                        MP4 sources copied as they are
+    remote/                             mirrored copies of remote images
+    manifest.json                       source (path or URL) -> outputs
+
+Sources whose content is unchanged are not re-encoded. A remote image is
+re-fetched only with `refresh`; if that fails the previous copy is kept,
+and one that was never fetched keeps its URL.
+
+The sections look media up with `image` and `video`. When ASSET_URL is
+set (any static host or CDN serving results/assets, or `serve` below)
+they return URLs there, so browsers fetch media, and stream video with
+HTTP range requests, without going through the Streamlit process.
+
+    python -m wildfire.assets build
+    python -m wildfire.assets serve --port 8502
+    ASSET_URL=http://localhost:8502 streamlit run streamlit_app.py
+"""
+
+import argparse
+import hashlib
+import importlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from http.server import SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from wildfire import instrument
+from wildfire.cache import FileCache
+from wildfire.cache import file_digests
+
+ASSET_DIR = "results/assets"
+
+MANIFEST = "manifest.json"
+
+SOURCES = ("media", "results/img")
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")
+
+VIDEO_EXTS = (".gif", ".mp4", ".webm")
+
+# Streamlit scales images down to at most twice its 730 px content width
+CONTENT_WIDTH = 1460
+
+WIDTHS = (480, 960, CONTENT_WIDTH)
+
+FORMATS = ("webp", "avif")
+
+QUALITY = {"webp": 80, "avif": 60}
+
+HASH_LENGTH = 10
+
+FETCH_TIMEOUT = 20
+
+# bytes per read when streaming a file to a client
+CHUNK = 1 << 16
+
+_REMOTE_IMAGE = re.compile(r"^https?://\S+\.(png|jpe?g|gif|webp)$", re.IGNORECASE)
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_MANIFESTS = instrument.watch_cache("assets", FileCache(maxsize=4))
+
+
+def _named(data, stem, suffix, ext):
+    return "{}{}-{}{}".format(stem, suffix, hashlib.sha1(data).hexdigest()[:HASH_LENGTH], ext)
+
+
+def _write(root, name, data):
+    path = os.path.join(root, name)
+    if not os.path.exists(path):
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+    return name
+
+
+def remote_images():
+    """Remote image URLs the sections show (module-level string constants)."""
+    from sections import SECTIONS
+
+    urls = []
+    for module in SECTIONS.values():
+        for value in vars(importlib.import_module(module)).values():
+            if isinstance(value, str) and _REMOTE_IMAGE.match(value) and value not in urls:
+                urls.append(value)
+    return urls
+
+
+def mirror(url, cache_dir, refresh=False, timeout=FETCH_TIMEOUT):
+    """Local copy of a remote file, or None when it was never fetched."""
+    name = "{}-{}".format(hashlib.sha1(url.encode()).hexdigest()[:HASH_LENGTH], os.path.basename(url))
+    path = os.path.join(cache_dir, name)
+    if os.path.exists(path) and not refresh:
+        return path
+    os.makedirs(cache_dir, exist_ok=True)
+    request = urllib.request.Request(url, headers={"User-Agent": "wildfire-assets/1.0"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response, open(path + ".tmp", "wb") as f:
+            shutil.copyfileobj(response, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        warnings.warn("could not fetch {}: {}".format(url, e))
+    return path if os.path.exists(path) else None
+
+
+def _encode_image(path, root, stem, widths, formats):
+    from PIL import Image
+
+    with Image.open(path) as im:
+        im = im.convert("RGBA" if "A" in im.getbands() or im.mode == "P" else "RGB")
+        width, height = im.size
+        variants = {fmt: {} for fmt in formats}
+        for w in sorted({min(w, width) for w in widths}):
+            resized = im if w == width else im.resize((w, round(height * w / width)), Image.LANCZOS)
+            for fmt in formats:
+                out = io.BytesIO()
+                resized.save(out, fmt.upper(), quality=QUALITY[fmt])
+                variants[fmt][str(w)] = _write(root, _named(out.getvalue(), stem, "-{}w".format(w), "." + fmt),
+                                               out.getvalue())
+    return {"width": width, "height": height, "variants": variants}
+
+
+def _gif_frames(path):
+    from PIL import Image
+    from PIL import ImageSequence
+
+    with Image.open(path) as im:
+        frames = [(f.convert("RGB"), f.info.get("duration", 100) or 100) for f in ImageSequence.Iterator(im)]
+    return frames, 1000.0 * len(frames) / sum(d for _, d in frames)
+
+
+def _gif_to_video(path):
+    """(bytes, extension, mime type) of a GIF as a video."""
+    if shutil.which("ffmpeg"):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "out.mp4")
+            subprocess.run(["ffmpeg", "-loglevel", "error", "-y", "-i", path, "-movflags", "+faststart",
+                            "-pix_fmt", "yuv420p", "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+                            "-c:v", "libx264", "-crf", "28", out], check=True)
+            with open(out, "rb") as f:
+                return f.read(), ".mp4", "video/mp4"
+    import cv2
+    import numpy as np
+
+    frames, fps = _gif_frames(path)
+    size = frames[0][0].size
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "out.webm")
+        writer = cv2.VideoWriter(out, cv2.VideoWriter_fourcc(*"VP90"), fps, size)
+        if not writer.isOpened():
+            raise RuntimeError("no video encoder for {}: install ffmpeg".format(path))
+        for frame, _ in frames:
+            writer.write(cv2.cvtColor(np.asarray(frame), cv2.COLOR_RGB2BGR))
+        writer.release()
+        with open(out, "rb") as f:
+            return f.read(), ".webm", "video/webm"
+
+
+def _encode_video(path, root, stem):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".gif":
+        data, ext, mimetype = _gif_to_video(path)
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+        mimetype = "video/" + ext[1:]
+    return {"file": _write(root, _named(data, stem, "", ext), data), "format": mimetype}
+
+
+def _encode(kind, path, root, stem, widths, formats):
+    if kind == "images":
+        return _encode_image(path, root, stem, widths, formats)
+    return _encode_video(path, root, stem)
+
+
+def _local_sources(sources):
+    for directory in sources:
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                ext = os.path.splitext(name)[1].lower()
+                if ext in IMAGE_EXTS + VIDEO_EXTS:
+                    yield os.path.normpath(os.path.join(directory, name))
+
+
+def _outputs(entry):
+    if "file" in entry:
+        return [entry["file"]]
+    return [name for by_width in entry["variants"].values() for name in by_width.values()]
+
+
+def build(root=ASSET_DIR, sources=SOURCES, widths=WIDTHS, formats=FORMATS, remote=None, refresh=False,
+          workers=None):
+    """
+    Encode every image and video under `sources`, plus mirrored `remote`
+    image URLs (by default those in `sections`), into `root`. Returns the
+    manifest; outputs no longer referenced are removed.
+    """
+    from PIL import features
+
+    formats = [fmt for fmt in formats if features.check(fmt)]
+    os.makedirs(root, exist_ok=True)
+    remote = remote_images() if remote is None else remote
+    files = {path: path for path in _local_sources(sources)}
+    for url in remote:
+        path = mirror(url, os.path.join(root, "remote"), refresh)
+        if path is not None:
+            files[url] = path
+    digests = file_digests(sorted(set(files.values())), os.path.join(root, "digests.json"), workers)
+    old = load_manifest(root) or {"images": {}, "videos": {}}
+    settings = {"widths": list(widths), "formats": formats, "quality": QUALITY}
+    manifest = {"settings": settings, "images": {}, "videos": {}, "remote": {url: files.get(url) for url in remote}}
+    todo = []
+    for source, path in files.items():
+        kind = "videos" if os.path.splitext(path)[1].lower() in VIDEO_EXTS else "images"
+        entry = old[kind].get(source)
+        if (entry and entry["digest"] == digests[path] and old.get("settings") == settings
+                and all(os.path.exists(os.path.join(root, name)) for name in _outputs(entry))):
+            manifest[kind][source] = entry
+        else:
+            stem = os.path.splitext(os.path.basename(source))[0]
+            todo.append((kind, source, path, stem))
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = pool.map(_encode, [t[0] for t in todo], [t[2] for t in todo], [root] * len(todo),
+                            [t[3] for t in todo], [widths] * len(todo), [formats] * len(todo))
+            for (kind, source, path, _), entry in zip(todo, done):
+                manifest[kind][source] = dict(entry, digest=digests[path])
+    keep = {name for kind in ("images", "videos") for entry in manifest[kind].values() for name in _outputs(entry)}
+    for name in os.listdir(root):
+        if os.path.isfile(os.path.join(root, name)) and name not in keep and name not in (MANIFEST, "digests.json"):
+            os.remove(os.path.join(root, name))
+    tmp = os.path.join(root, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(root, MANIFEST))
+    return manifest
+
+
+def _read_manifest(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_manifest(root=ASSET_DIR):
+    """The build manifest, reloaded when it changes; None before the first build."""
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    return _MANIFESTS.get(path, _read_manifest)
+
+
+def location(name, root=ASSET_DIR):
+    """URL under ASSET_URL when it is set, else the path of a built asset."""
+    base = os.environ.get("ASSET_URL")
+    if base:
+        return "{}/{}".format(base.rstrip("/"), name)
+    return os.path.join(root, name)
+
+
+def _key(src):
+    return src if re.match(r"^https?://", src) else os.path.normpath(src)
+
+
+def image(src, width=CONTENT_WIDTH, fmt="webp", root=ASSET_DIR):
+    """
+    What to pass to `st.image` for `src`: the widest derivative no wider
+    than `width`, else the mirrored copy, else `src` itself.
+    """
+    manifest = load_manifest(root)
+    entry = manifest and manifest["images"].get(_key(src))
+    if not entry or not entry["variants"].get(fmt):
+        return src
+    by_width = entry["variants"][fmt]
+    fits = [int(w) for w in by_width if int(w) <= width] or [min(int(w) for w in by_width)]
+    return location(by_width[str(max(fits))], root)
+
+
+def video(src, root=ASSET_DIR):
+    """(location, mime type) to pass to `st.video` for `src`, or None when it was not built."""
+    manifest = load_manifest(root)
+    entry = manifest and manifest["videos"].get(_key(src))
+    if not entry:
+        return None
+    return location(entry["file"], root), entry["format"]
+
+
+def derivatives(path, root=ASSET_DIR):
+    """{format: {width: path}} of the image that `path` (a source or a derivative) belongs to."""
+    manifest = load_manifest(root)
+    if not manifest:
+        return None
+    name = os.path.basename(path)
+    for source, entry in manifest["images"].items():
+        if source == _key(path) or any(name in by_width.values() for by_width in entry["variants"].values()):
+            return {fmt: {int(w): os.path.join(root, n) for w, n in by_width.items()}
+                    for fmt, by_width in entry["variants"].items()}
+    return None
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Static files with single `Range: bytes=` requests answered by 206
+    partial responses, streamed in chunks. Content-hashed files are
+    immutable, so they are cached for a year.
+    """
+
+    def end_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        super().end_headers()
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+        size = os.path.getsize(path)
+        start, end, status = 0, size - 1, 200
+        match = _RANGE.match(self.headers.get("Range", "").strip())
+        if match and match.group(1):
+            start, end, status = int(match.group(1)), min(int(match.group(2) or end), end), 206
+        elif match and match.group(2):
+            start, status = max(size - int(match.group(2)), 0), 206
+        if status == 206 and start > end:
+            self.send_response(416)
+            self.send_header("Content-Range", "bytes */{}".format(size))
+            self.end_headers()
+            return None
+        f = open(path, "rb")
+        f.seek(start)
+        self._remaining = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(self._remaining))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, end, size))
+        if os.path.basename(path) != MANIFEST:
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "_remaining", None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        while remaining > 0:
+            chunk = source.read(min(CHUNK, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+
+def serve(root=ASSET_DIR, host="0.0.0.0", port=8502):
+    handler = lambda *args: RangeRequestHandler(*args, directory=root)
+    with ThreadingHTTPServer((host, port), handler) as server:
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or serve the dashboard's media assets")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_args = commands.add_parser("build", help="encode derivatives, videos and mirrors into the asset directory")
+    build_args.add_argument("--root", default=ASSET_DIR)
+    build_args.add_argument("--sources", nargs="+", default=list(SOURCES))
+    build_args.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS))
+    build_args.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    build_args.add_argument("--refresh", action="store_true", help="fetch remote images again")
+    build_args.add_argument("--workers", type=int, default=None)
+    serve_args = commands.add_parser("serve", help="serve the asset directory with range requests")
+    serve_args.add_argument("--root", default=ASSET_DIR)
+    serve_args.add_argument("--host", default="0.0.0.0")
+    serve_args.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+    if args.command == "serve":
+        print("serving {} on http://{}:{}".format(args.root, args.host, args.port))
+        serve(args.root, args.host, args.port)
+    else:
+        start = time.perf_counter()
+        manifest = build(args.root, args.sources, args.widths, args.formats, refresh=args.refresh,
+                         workers=args.workers)
+        size = sum(os.path.getsize(os.path.join(args.root, n)) for n in os.listdir(args.root)
+                   if os.path.isfile(os.path.join(args.root, n)))
+        missing = [url for url, path in manifest["remote"].items() if path is None]
+        print("{} images, {} videos, {:.1f} MB in {} ({:.1f}s)".format(len(manifest["images"]), len(manifest["videos"]),
+                                                                   size / 2 ** 20, args.root,
+                                                                   time.perf_counter() - start))
+        for url in missing:
+            print("not mirrored, served from its URL: {}".format(url))
@@ -0,0 +1,408 @@
+"""
+Benchmark suite behind the `runtime` column of xgb_pt.csv.
+
+The logged runtimes are `time() - start_time` deltas from `save_results`,
+taken once per run on whatever Colab machine was attached, with data
+loading, training and evaluation lumped together. This harness runs the
+same pipelines (XGBoost, XGBoost on a Dask LocalCluster, and the
+DenseNet161 / Wide-ResNet50-2 fine-tuning loop) on fixed data, timing
+load, train and inference separately over warmup and measured repeats:
+
+    synthetic                   seeded random images with a learnable signal
+    --sample ground FIRE NOFIRE image folders, via wildfire.features
+    --sample satellite FIRE NOFIRE  landsat_mini tiles, via wildfire.landsat
+
+Each run writes results/bench/<timestamp>.json with host, thread and
+library metadata, plus runtimes.csv with the xgb_pt.csv columns
+(name, classifier, dataset, distributed, runtime), and compares the
+medians against a stored baseline.
+
+    python -m wildfire.bench --cases xgboost xgboost-dask --repeats 5 --save-baseline
+    python -m wildfire.bench --cases xgboost xgboost-dask --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from wildfire import instrument
+
+BENCH_DIR = "results/bench"
+
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+STAGES = ("load", "train", "infer")
+
+# relative change in a median that counts as a regression or an improvement
+TOLERANCE = 0.10
+
+# stages faster than this (seconds) in both runs are too noisy to flag
+MIN_SECONDS = 0.05
+
+LIBRARIES = ("numpy", "pandas", "pyarrow", "xgboost", "dask", "distributed", "torch", "torchvision", "cv2", "rasterio")
+
+THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+PARAMS = {
+    "samples": 2000,
+    "image_size": 32,
+    "test_split": 0.25,
+    "seed": 42,
+    "threads": None,
+    "workers": 2,
+    "xgb_rounds": 50,
+    "batch_size": 8,
+    "train_steps": 10,
+    "cnn_size": 64,
+}
+
+
+def synthetic(samples, image_size, seed):
+    """Seeded (X, y): flattened HxWx3 images in [0, 1], fire images redder."""
+    rng = np.random.default_rng(seed)
+    y = (np.arange(samples) % 2).astype("float32")
+    X = rng.random((samples, image_size, image_size, 3), dtype="float32")
+    X[y == 1, :, :, 2] = np.clip(X[y == 1, :, :, 2] + 0.15, 0, 1)
+    return X.reshape(samples, -1), y
+
+
+def load_data(dataset, sources, params):
+    """(X, y) for one benchmark dataset, decoded from scratch on every call."""
+    if dataset == "synthetic":
+        return synthetic(params["samples"], params["image_size"], params["seed"])
+    fire, no_fire = sources
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if dataset == "satellite":
+            from wildfire.landsat import BandStore
+
+            store = BandStore([(fire, 1), (no_fire, 0)], cache_dir=cache_dir, workers=params["workers"])
+            return np.array(store.features()), store.labels.astype("float32")
+        from wildfire.features import load_matrix
+
+        size = (params["image_size"], params["image_size"])
+        X, y = load_matrix([(fire, 1), (no_fire, 0)], cache_dir=cache_dir, size=size,
+                           max_samples=params["samples"] // 2, workers=params["workers"])
+        return np.array(X), y
+
+
+def split(X, y, params):
+    rng = np.random.default_rng(params["seed"])
+    order = rng.permutation(len(y))
+    n_test = int(len(y) * params["test_split"])
+    test, train = order[:n_test], order[n_test:]
+    return X[train], X[test], y[train], y[test]
+
+
+def _xgboost(data, params):
+    import xgboost as xgb
+
+    X_train, X_test, y_train, y_test = data
+
+    def train():
+        model = xgb.XGBClassifier(n_estimators=params["xgb_rounds"], tree_method="hist",
+                                  n_jobs=params["threads"], random_state=params["seed"])
+        return model.fit(X_train, y_train)
+
+    def infer(model):
+        return model.predict(X_test)
+
+    return train, infer, y_test
+
+
+def _xgboost_dask(data, params):
+    import dask.array as da
+    from dask.distributed import Client, LocalCluster
+    from xgboost import dask as dxgb
+
+    X_train, X_test, y_train, y_test = data
+    cluster = LocalCluster(n_workers=params["workers"], threads_per_worker=params["threads"] or 1,
+                           processes=True, dashboard_address=None)
+    client = Client(cluster)
+    chunk = -(-len(X_train) // params["workers"])
+    dX, dy = da.from_array(X_train, chunks=(chunk, -1)), da.from_array(y_train, chunks=chunk)
+    dX_test = da.from_array(X_test, chunks=(-(-len(X_test) // params["workers"]), -1))
+
+    def train():
+        dtrain = dxgb.DaskDMatrix(client, dX, dy)
+        return dxgb.train(client, {"objective": "binary:logistic", "eval_metric": "error", "tree_method": "hist"},
+                          dtrain, num_boost_round=params["xgb_rounds"])["booster"]
+
+    def infer(booster):
+        return np.rint(dxgb.predict(client, booster, dX_test).compute())
+
+    def close():
+        client.close()
+        cluster.close()
+
+    return train, infer, y_test, close
+
+
+def _cnn(arch):
+    def case(data, params):
+        import torch
+        import torch.nn.functional as F
+
+        from wildfire.inference import build_model
+
+        torch.manual_seed(params["seed"])
+        X_train, X_test, y_train, y_test = data
+        side = int(round((X_train.shape[1] / 3) ** 0.5))
+        size = params["cnn_size"]
+
+        def tensors(X):
+            x = torch.from_numpy(np.ascontiguousarray(X, dtype="float32")).view(-1, side, side, 3).permute(0, 3, 1, 2)
+            return F.interpolate(x, size=(size, size), mode="bilinear", align_corners=False) if side != size else x
+
+        x_train, x_test = tensors(X_train), tensors(X_test)
+        t_train = torch.from_numpy(y_train.astype("int64"))
+
+        def train():
+            # the notebook's loop: Adam, lr 0.001, cross entropy, batch 8
+            model = build_model(arch)
+            optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+            model.train()
+            for step in range(params["train_steps"]):
+                i = (step * params["batch_size"]) % len(x_train)
+                xb, yb = x_train[i:i + params["batch_size"]], t_train[i:i + params["batch_size"]]
+                optimizer.zero_grad()
+                F.cross_entropy(model(xb), yb).backward()
+                optimizer.step()
+            return model.eval()
+
+        def infer(model):
+            with torch.inference_mode():
+                out = [model(x_test[i:i + 64]).argmax(1) for i in range(0, len(x_test), 64)]
+            # the CNNs label Fire as class 0
+            return 1 - torch.cat(out).numpy()
+
+        return train, infer, y_test
+
+    return case
+
+
+# name -> (classifier as logged, distributed, case)
+CASES = {
+    "xgboost": ("xgboost", False, _xgboost),
+    "xgboost-dask": ("xgboost", True, _xgboost_dask),
+    "densenet161": ("densenet161", False, _cnn("densenet161")),
+    "wide_resnet50_2": ("wide_resnet50_2", False, _cnn("wide_resnet50_2")),
+}
+
+PREFIXES = {"ground": "groundfire", "aerial": "aerialfire", "satellite": "satfire", "synthetic": "synthetic"}
+
+
+def _summary(times):
+    t = np.array(times)
+    return {"median": float(np.median(t)), "min": float(t.min()), "mean": float(t.mean()),
+            "std": float(t.std()), "times": [float(v) for v in t]}
+
+
+def run_case(name, dataset, sources, params, warmup=1, repeats=3):
+    """Time load/train/infer of one case; warmup iterations are not recorded."""
+    classifier, distributed, case = CASES[name]
+    times = {stage: [] for stage in STAGES}
+    acc = None
+    for i in range(warmup + repeats):
+        t0 = time.perf_counter()
+        with instrument.span("bench.load", case=name, dataset=dataset):
+            data = split(*load_data(dataset, sources, params), params)
+        t1 = time.perf_counter()
+        train, infer, y_test, *close = case(data, params)
+        try:
+            t2 = time.perf_counter()
+            with instrument.span("bench.train", case=name, dataset=dataset):
+                model = train()
+            t3 = time.perf_counter()
+            instrument.snapshot("bench.{}.trained".format(name))
+            with instrument.span("bench.infer", case=name, dataset=dataset):
+                preds = infer(model)
+            t4 = time.perf_counter()
+        finally:
+            for c in close:
+                c()
+        acc = float((np.asarray(preds).reshape(-1) == y_test).mean())
+        if i >= warmup:
+            times["load"].append(t1 - t0)
+            times["train"].append(t3 - t2)
+            times["infer"].append(t4 - t3)
+    if classifier != "xgboost":
+        classifier = "{}_{}".format(PREFIXES[dataset], classifier)
+    return {
+        "case": name,
+        "dataset": dataset,
+        "classifier": classifier,
+        "distributed": distributed,
+        "acc": acc,
+        "stages": {stage: _summary(t) for stage, t in times.items()},
+    }
+
+
+def _version(module):
+    try:
+        mod = __import__(module)
+    except ImportError:
+        return None
+    return getattr(mod, "__version__", "unknown")
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def _memory_bytes():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(params):
+    torch_threads = None
+    if _version("torch"):
+        import torch
+
+        torch_threads = torch.get_num_threads()
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "affinity": len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+        "memory_bytes": _memory_bytes(),
+        "threads": {v: os.environ.get(v) for v in THREAD_VARS},
+        "torch_threads": torch_threads,
+        "libraries": {m: _version(m) for m in LIBRARIES},
+        "commit": _git_commit(),
+        "params": params,
+    }
+
+
+def runtime_rows(results):
+    """Rows shaped like xgb_pt.csv, with runtime = median load + train + infer."""
+    stamp = datetime.fromisoformat(results["meta"]["timestamp"]).strftime("%d_%m_%Y_%H_%M_%S")
+    rows = []
+    for r in results["cases"]:
+        rows.append({
+            "name": "bench_{}_{}_{}".format(r["case"], r["dataset"], stamp),
+            "classifier": r["classifier"],
+            "dataset": r["dataset"],
+            "distributed": r["distributed"],
+            "acc": r["acc"],
+            "runtime": sum(r["stages"][s]["median"] for s in STAGES),
+        })
+    return pd.DataFrame(rows)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Per (case, dataset, stage) medians against the baseline, with a status column."""
+    base = {(r["case"], r["dataset"]): r for r in baseline["cases"]}
+    rows = []
+    for r in results["cases"]:
+        b = base.get((r["case"], r["dataset"]))
+        for stage in STAGES:
+            current = r["stages"][stage]["median"]
+            before = b["stages"][stage]["median"] if b else None
+            ratio = current / before if before else None
+            if ratio is None:
+                status = "new"
+            elif max(current, before) < MIN_SECONDS:
+                status = "ok"
+            elif ratio > 1 + tolerance:
+                status = "regression"
+            elif ratio < 1 - tolerance:
+                status = "improvement"
+            else:
+                status = "ok"
+            rows.append({"case": r["case"], "dataset": r["dataset"], "stage": stage,
+                         "baseline": before, "current": current, "ratio": ratio, "status": status})
+    return pd.DataFrame(rows)
+
+
+def _write_json(obj, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=1)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the classifier pipelines")
+    parser.add_argument("--cases", nargs="+", default=["xgboost"], choices=sorted(CASES))
+    parser.add_argument("--sample", nargs=3, action="append", default=[], metavar=("DATASET", "FIRE", "NO_FIRE"),
+                        help="ground, aerial or satellite folders to benchmark in addition to synthetic data")
+    parser.add_argument("--no-synthetic", action="store_true")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", default=BENCH_DIR)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    for key, value in PARAMS.items():
+        parser.add_argument("--" + key.replace("_", "-"), type=float if key == "test_split" else int, default=value)
+    args = parser.parse_args(argv)
+    params = {key: getattr(args, key) for key in PARAMS}
+    if params["threads"]:
+        os.environ.setdefault("OMP_NUM_THREADS", str(params["threads"]))
+        if _version("torch"):
+            import torch
+
+            torch.set_num_threads(params["threads"])
+
+    datasets = [] if args.no_synthetic else [("synthetic", None)]
+    datasets += [(name, (fire, no_fire)) for name, fire, no_fire in args.sample]
+    results = {"meta": metadata(params), "cases": []}
+    for dataset, sources in datasets:
+        for name in args.cases:
+            r = run_case(name, dataset, sources, params, args.warmup, args.repeats)
+            results["cases"].append(r)
+            print("{:<16} {:<10} ".format(name, dataset)
+                  + "  ".join("{} {:.3f}s".format(s, r["stages"][s]["median"]) for s in STAGES)
+                  + "  acc {:.3f}".format(r["acc"]))
+
+    os.makedirs(args.out, exist_ok=True)
+    stamp = results["meta"]["timestamp"].replace(":", "-")
+    _write_json(results, os.path.join(args.out, "{}.json".format(stamp)))
+    runtime_rows(results).to_csv(os.path.join(args.out, "runtimes.csv"), index=False)
+    if args.save_baseline:
+        _write_json(results, args.baseline)
+        print("baseline written to {}".format(args.baseline))
+        return 0
+    if not os.path.exists(args.baseline):
+        print("no baseline at {}; run with --save-baseline first".format(args.baseline))
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    report = compare(results, baseline, args.tolerance)
+    print(report.to_string(index=False, float_format="{:.3f}".format))
+    regressed = report["status"].eq("regression").any()
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Bounded in-process cache for values derived from files on disk.
+
+Entries are keyed on the file path and validated against the file's
+mtime/size and a content hash, so replacing a file invalidates whatever
+was built from it while a plain `touch` does not force a rebuild.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+HASH_CHUNK = 1 << 20
+
+
+def file_digest(path):
+    """sha1 of the file contents, read in fixed-size chunks."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_digests(paths, index_path, workers=None):
+    """
+    Content hash of every file in paths. Hashes are remembered in a JSON
+    index per (path, size, mtime), so unchanged files are not re-read on
+    later calls; new or modified files are hashed on a process pool.
+    """
+    known = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            known = json.load(f)
+    out = {}
+    todo = []
+    for path in paths:
+        st = os.stat(path)
+        entry = known.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            out[path] = entry[2]
+        else:
+            todo.append((path, st.st_size, st.st_mtime_ns))
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hashed = pool.map(file_digest, [t[0] for t in todo], chunksize=64)
+            for (path, size, mtime), digest in zip(todo, hashed):
+                known[path] = [size, mtime, digest]
+                out[path] = digest
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        tmp = index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(known, f)
+        os.replace(tmp, index_path)
+    return out
+
+
+def file_stat(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileCache:
+    """
+    LRU cache of `loader(path)` results.
+
+    A lookup only stats the file. The file is re-hashed when its mtime or
+    size has moved, and the loader is re-run only if the hash changed too.
+    With `hash_contents=False` the (mtime, size) pair alone is the key,
+    for large append-only files where hashing would cost as much as a
+    reload.
+    """
+
+    def __init__(self, maxsize=32, hash_contents=True):
+        self.maxsize = maxsize
+        self.hash_contents = hash_contents
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, loader, key=None):
+        path = os.path.abspath(path)
+        ckey = (path, key if key is not None else getattr(loader, "__qualname__", loader))
+        stat = file_stat(path)
+        with self._lock:
+            entry = self._entries.get(ckey)
+            if entry is not None and entry[0] == stat:
+                self._entries.move_to_end(ckey)
+                self.hits += 1
+                return entry[2]
+        digest = file_digest(path) if self.hash_contents else None
+        if self.hash_contents and entry is not None and entry[1] == digest:
+            with self._lock:
+                self._entries[ckey] = (stat, digest, entry[2])
+                self._entries.move_to_end(ckey)
+                self.hits += 1
+            return entry[2]
+        value = loader(path)
+        with self._lock:
+            self._entries[ckey] = (stat, digest, value)
+            self._entries.move_to_end(ckey)
+            self.misses += 1
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = os.path.abspath(path)
+            for ckey in [k for k in self._entries if k[0] == path]:
+                del self._entries[ckey]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,250 @@
+"""
+Backend-agnostic distributed XGBoost pipeline.
+
+004_bd_xgboost_distributed.ipynb is wired to `LocalCUDACluster`,
+`dask_cudf.read_parquet` and `DaskDeviceQuantileDMatrix`, so it cannot
+run without a GPU. The functions here keep the notebook's API
+(`load_groundfire`, `fit_model_customized_es`, `explain`, `predict`) and
+take a `backend`: "cpu" uses a `LocalCluster`, `dask.dataframe` and
+`DaskQuantileDMatrix` with the `hist` tree method, "gpu" the RAPIDS
+stack as before. Both read the `groundfire.parquet` / `landsatfire.parquet`
+layout: one `feature-<i>` column per pixel value plus `label`.
+
+`scaling` runs the whole pipeline for 1..N workers and reports wall
+time per stage and peak memory per worker:
+
+    python -m wildfire.dask_xgb groundfire.parquet --workers 1 2 4 --threads 2
+    python -m wildfire.dask_xgb groundfire.parquet --write-from /data/Fire /data/No_Fire --rows-per-file 256
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from wildfire import instrument
+
+BACKENDS = ("cpu", "gpu")
+
+TEST_SIZE = 0.25
+
+EARLY_STOPPING_ROUNDS = 10
+
+NUM_BOOST_ROUND = 1000
+
+# rows per Parquet file written by write_parquet
+ROWS_PER_FILE = 512
+
+SCALING_OUT = "results/bench/scaling.csv"
+
+# seconds between worker memory samples during scaling runs
+MEMORY_INTERVAL = 0.25
+
+
+def make_cluster(backend="cpu", workers=None, threads=None, memory_limit="auto"):
+    if backend == "gpu":
+        from dask_cuda import LocalCUDACluster
+
+        return LocalCUDACluster(n_workers=workers, threads_per_worker=threads or 1, memory_limit=memory_limit)
+    from dask.distributed import LocalCluster
+
+    return LocalCluster(n_workers=workers, threads_per_worker=threads, memory_limit=memory_limit,
+                        processes=True, dashboard_address=None)
+
+
+def write_parquet(X, y, path, rows_per_file=ROWS_PER_FILE):
+    """
+    Write a feature matrix in the groundfire.parquet layout, split into
+    files of `rows_per_file` rows (one Dask partition each when read back).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(path, exist_ok=True)
+    names = ["feature-{}".format(i) for i in range(X.shape[1])] + ["label"]
+    for n, start in enumerate(range(0, len(X), rows_per_file)):
+        rows = slice(start, start + rows_per_file)
+        arrays = [pa.array(np.ascontiguousarray(X[rows, i])) for i in range(X.shape[1])]
+        arrays.append(pa.array(np.asarray(y[rows], dtype="float32")))
+        target = os.path.join(path, "part-{:05d}.parquet".format(n))
+        pq.write_table(pa.Table.from_arrays(arrays, names=names), target + ".tmp")
+        os.replace(target + ".tmp", target)
+    return path
+
+
+@instrument.traced()
+def load_groundfire(client, path, backend="cpu", test_size=TEST_SIZE, partition_size=None, npartitions=None,
+                    seed=None):
+    """
+    (X_train, X_valid, y_train, y_valid), persisted on the cluster.
+    `partition_size` (e.g. "64MB") or `npartitions` repartitions after reading.
+    """
+    from dask.distributed import wait
+
+    if backend == "gpu":
+        import dask_cudf
+
+        df = dask_cudf.read_parquet(path)
+    else:
+        import dask.dataframe as dd
+
+        df = dd.read_parquet(path)
+    if partition_size is not None:
+        df = df.repartition(partition_size=partition_size)
+    elif npartitions is not None:
+        df = df.repartition(npartitions=npartitions)
+    train, valid = df.random_split([1 - test_size, test_size], random_state=seed)
+    features = [c for c in df.columns if c != "label"]
+    parts = client.persist([train[features], valid[features], train["label"], valid["label"]])
+    wait(parts)
+    return tuple(parts)
+
+
+def _quantile_dmatrix(client, X, y, backend):
+    from xgboost import dask as dxgb
+
+    if backend == "gpu" and hasattr(dxgb, "DaskDeviceQuantileDMatrix"):
+        return dxgb.DaskDeviceQuantileDMatrix(client, X, y)
+    if hasattr(dxgb, "DaskQuantileDMatrix"):
+        return dxgb.DaskQuantileDMatrix(client, X, y)
+    return dxgb.DaskDMatrix(client, X, y)
+
+
+@instrument.traced()
+def fit_model_customized_es(client, X, y, X_valid, y_valid, backend="cpu", num_boost_round=NUM_BOOST_ROUND,
+                            early_stopping_rounds=EARLY_STOPPING_ROUNDS):
+    import xgboost as xgb
+    from xgboost import dask as dxgb
+
+    es = xgb.callback.EarlyStopping(rounds=early_stopping_rounds, save_best=True)
+    Xy = _quantile_dmatrix(client, X, y, backend)
+    Xy_valid = dxgb.DaskDMatrix(client, X_valid, y_valid)
+    params = {"objective": "binary:logistic", "eval_metric": "error",
+              "tree_method": "gpu_hist" if backend == "gpu" else "hist"}
+    return dxgb.train(client, params, Xy, evals=[(Xy_valid, "Valid")], num_boost_round=num_boost_round,
+                      callbacks=[es])["booster"]
+
+
+def explain(client, model, X):
+    from xgboost import dask as dxgb
+
+    # use the array in case the output has more than two dimensions
+    return dxgb.predict(client, model, X.values, pred_contribs=True, validate_features=False)
+
+
+@instrument.traced()
+def predict(client, model, X):
+    from xgboost import dask as dxgb
+
+    return dxgb.predict(client, model, X)
+
+
+def _rss():
+    import psutil
+
+    return psutil.Process().memory_info().rss
+
+
+class _MemorySampler:
+    """Peak RSS per worker, sampled with client.run on a background thread."""
+
+    def __init__(self, client, interval=MEMORY_INTERVAL):
+        self.client = client
+        self.interval = interval
+        self.peak = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        for worker, rss in self.client.run(_rss).items():
+            self.peak[worker] = max(self.peak.get(worker, 0), rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                # the cluster may be shutting down
+                return
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def run_once(path, workers, threads=None, backend="cpu", partition_size=None, npartitions=None, seed=0,
+             num_boost_round=NUM_BOOST_ROUND):
+    """Load, fit and predict on a fresh cluster; returns one scaling row."""
+    from dask.distributed import Client
+
+    with make_cluster(backend, workers, threads) as cluster, Client(cluster) as client:
+        with _MemorySampler(client) as memory:
+            t0 = time.perf_counter()
+            X_train, X_valid, y_train, y_valid = load_groundfire(client, path, backend, partition_size=partition_size,
+                                                                 npartitions=npartitions, seed=seed)
+            t1 = time.perf_counter()
+            booster = fit_model_customized_es(client, X_train, y_train, X_valid, y_valid, backend, num_boost_round)
+            t2 = time.perf_counter()
+            preds = np.rint(np.asarray(predict(client, booster, X_valid).compute()))
+            expected = np.asarray(y_valid.compute())
+            t3 = time.perf_counter()
+        peak = np.array(list(memory.peak.values()), dtype="float64") / 2 ** 20
+        return {
+            "workers": workers,
+            "threads": threads,
+            "partitions": X_train.npartitions,
+            "load_s": t1 - t0,
+            "train_s": t2 - t1,
+            "predict_s": t3 - t2,
+            "total_s": t3 - t0,
+            "rounds": booster.best_iteration + 1,
+            "acc": float((preds == expected).mean()),
+            "peak_rss_mb_mean": float(peak.mean()),
+            "peak_rss_mb_max": float(peak.max()),
+        }
+
+
+def scaling(path, workers=(1, 2, 4), threads=None, backend="cpu", partition_size=None, npartitions=None, seed=0,
+            num_boost_round=NUM_BOOST_ROUND):
+    """Scaling table over worker counts, with speedup and efficiency against the first row."""
+    rows = [run_once(path, n, threads, backend, partition_size, npartitions, seed, num_boost_round) for n in workers]
+    report = pd.DataFrame(rows)
+    base = report.iloc[0]
+    report["speedup"] = base["total_s"] / report["total_s"]
+    report["efficiency"] = report["speedup"] * base["workers"] / report["workers"]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed XGBoost on a CPU or GPU Dask cluster, with a scaling report")
+    parser.add_argument("parquet")
+    parser.add_argument("--backend", choices=BACKENDS, default="cpu")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=None, help="threads per worker")
+    parser.add_argument("--partition-size", default=None, help='e.g. "64MB"')
+    parser.add_argument("--npartitions", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=NUM_BOOST_ROUND)
+    parser.add_argument("--out", default=SCALING_OUT)
+    parser.add_argument("--write-from", nargs=2, metavar=("FIRE", "NO_FIRE"), default=None,
+                        help="first write the Parquet layout from image folders (via wildfire.features)")
+    parser.add_argument("--rows-per-file", type=int, default=ROWS_PER_FILE)
+    args = parser.parse_args()
+    if args.write_from:
+        from wildfire.features import load_matrix
+
+        X, y = load_matrix([(args.write_from[0], 1), (args.write_from[1], 0)])
+        write_parquet(X, y, args.parquet, args.rows_per_file)
+    report = scaling(args.parquet, args.workers, args.threads, args.backend, args.partition_size,
+                     args.npartitions, num_boost_round=args.rounds)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    report.to_csv(args.out, index=False)
+    print(report.to_string(index=False, float_format="{:.3f}".format))
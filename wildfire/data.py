@@ -0,0 +1,163 @@
+"""
+Cached loaders for the results files shown in the Wildfire Web App.
+
+Each file is read, parsed and pre-aggregated once per version on disk.
+The frames returned here are shared between sessions, so callers must
+treat them as read-only. The store modules (and pyarrow behind them) are
+imported by the loaders that need them, so a page only pays for its own.
+"""
+
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from wildfire import instrument
+from wildfire.cache import FileCache
+
+IC_RES = "results/csv/xgb_pt.csv"
+
+GF_RES = "results/csv/fire_interest.csv"
+
+FIRMS_CUBE = "results/firms/cube.parquet"
+
+FIRMS_ROLLUPS = "results/firms/rollups"
+
+FIRMS_TILES = "results/tiles/firms"
+
+# wildfire.wfigs.WFIGS_ROOT and MANIFEST
+WFIGS_ROOT = "results/wfigs"
+
+WFIGS_MANIFEST = os.path.join(WFIGS_ROOT, "_manifest.json")
+
+# wildfire.fpafod.FPAFOD_ROOT
+FPAFOD_ROOT = "results/fpafod"
+
+# wildfire.perimeters.PERIMETERS_ROOT and CUBE
+PERIMETERS_ROOT = "results/perimeters"
+
+BURNED_CUBE = os.path.join(PERIMETERS_ROOT, "cube.parquet")
+
+RESULT_COLS = ["name", "dataset", "acc", "runtime"]
+
+CACHE = instrument.watch_cache("data", FileCache(maxsize=16))
+
+# wildfire.experiments.STORE
+STORE = "results/store"
+
+# wildfire.rollups.MANIFEST
+ROLLUPS_MANIFEST = "manifest.json"
+
+Results = namedtuple("Results", ["runs", "wdc", "dc"])
+
+
+def _build_results(path):
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    df = df.drop(columns=[c for c in df.columns if c.startswith("Unnamed")])
+    dist = df["distributed"].astype(bool)
+    wdc = df.loc[~dist, RESULT_COLS].sort_values(by=["dataset"])
+    dc = df.loc[dist, RESULT_COLS].sort_values(by=["dataset"])
+    return Results(df, wdc, dc)
+
+
+@instrument.traced()
+def load_results(path=IC_RES):
+    """
+    Run log from xgb_pt.csv, plus the non-distributed (`wdc`) and
+    distributed (`dc`) result tables sorted by dataset.
+    """
+    return CACHE.get(path, _build_results)
+
+
+@instrument.traced()
+def load_interest(path=GF_RES, how="peak"):
+    """
+    Yearly peak (or mean) Google Trends interest from fire_interest.csv.
+    Months appended to the file since the last call are folded in
+    incrementally.
+    """
+    from wildfire import trends
+
+    return trends.load(path).resample("year", how).reset_index()
+
+
+def _firms_manifest():
+    return os.path.join(FIRMS_ROLLUPS, ROLLUPS_MANIFEST)
+
+
+def firms_available():
+    return os.path.exists(_firms_manifest()) or os.path.exists(FIRMS_CUBE)
+
+
+@instrument.traced()
+def load_firms():
+    """
+    FIRMS cube from the incremental rollup store when there is one
+    (`python -m wildfire.rollups`), else the one-shot archive cube
+    (`python -m wildfire.firms`). The store is reloaded whenever its
+    manifest changes, i.e. after every ingest.
+    """
+    if os.path.exists(_firms_manifest()):
+        from wildfire import rollups
+
+        return CACHE.get(_firms_manifest(), rollups.load_manifest)
+    from wildfire import firms
+
+    return CACHE.get(FIRMS_CUBE, firms.load_cube)
+
+
+def wfigs_available():
+    return os.path.exists(WFIGS_MANIFEST)
+
+
+@instrument.traced()
+def load_wfigs_per_state(years=None, by_year=False):
+    """
+    WFIGS wildfire counts per state (and year) from the partitioned store
+    (`python -m wildfire.wfigs`), recomputed whenever it is rebuilt.
+    """
+    from wildfire import wfigs
+
+    return CACHE.get(WFIGS_MANIFEST, lambda path: wfigs.fires_per_state(os.path.dirname(path), years, by_year),
+                     key=("wfigs_per_state", years, by_year))
+
+
+@instrument.traced()
+def load_wfigs_by_cause(years=None):
+    """Yearly WFIGS wildfire counts with one column per FireCause, recomputed whenever the store is rebuilt."""
+    from wildfire import wfigs
+
+    return CACHE.get(WFIGS_MANIFEST, lambda path: wfigs.fires_by_cause(os.path.dirname(path), years),
+                     key=("wfigs_by_cause", years))
+
+
+@instrument.traced()
+def load_fpafod():
+    """
+    Indexed FPA FOD store (`python -m wildfire.fpafod`), reopened whenever
+    its index changes, i.e. after every ingest.
+    """
+    from wildfire import fpafod
+
+    return CACHE.get(os.path.join(FPAFOD_ROOT, fpafod.INDEX), fpafod.load_store)
+
+
+@instrument.traced()
+def load_burned():
+    """State x year burned acres and percent of state area (`python -m wildfire.perimeters cube`)."""
+    from wildfire import perimeters
+
+    return CACHE.get(BURNED_CUBE, perimeters.load_cube)
+
+
+@instrument.traced()
+def load_curves(dataset=None, classifier=None, store=STORE):
+    """
+    Per-epoch learning curves from the Parquet experiment store, filtered
+    by dataset and classifier. The store is only read here; runs are added
+    by `python -m wildfire.experiments` or, as they are logged, by a
+    `RunLogger` with a `StoreSink`.
+    """
+    from wildfire import experiments
+
+    return experiments.query_curves(store, dataset=dataset, classifier=classifier)
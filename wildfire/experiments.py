@@ -0,0 +1,239 @@
+"""
+Columnar experiment store for the classifier run log.
+
+`xgb_pt.csv` keeps the per-phase loss/accuracy curves and confusion
+matrices as Python-repr strings. `ingest` parses them once and writes two
+Parquet datasets, both hive-partitioned by `dataset`:
+
+    runs/    one row per run (name, classifier, dataset, acc, runtime, ...)
+    curves/  one row per (run, phase, step) with loss and acc
+
+New runs are appended as extra part files; runs already in the store
+(matched on `_id`) are skipped, so ingesting the same log twice is a no-op.
+Run records can also be appended as they are logged, through
+`wildfire.runlog.StoreSink`; the dashboard only reads the store.
+
+    python -m wildfire.experiments results/csv/xgb_pt.csv results/store
+"""
+
+import argparse
+import ast
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+IC_RES = "results/csv/xgb_pt.csv"
+
+STORE = "results/store"
+
+RUNS_SCHEMA = pa.schema([
+    ("_id", pa.string()),
+    ("name", pa.string()),
+    ("classifier", pa.string()),
+    ("dataset", pa.string()),
+    ("acc", pa.float64()),
+    ("runtime", pa.float64()),
+    ("epochs", pa.int32()),
+    ("LR", pa.float64()),
+    ("Optim", pa.string()),
+    ("batch_size", pa.int32()),
+    ("distributed", pa.bool_()),
+    ("train_test_split", pa.float64()),
+    ("cross_val", pa.int32()),
+    ("confmatrix", pa.list_(pa.list_(pa.int64()))),
+    ("metric", pa.string()),
+])
+
+CURVES_SCHEMA = pa.schema([
+    ("_id", pa.string()),
+    ("classifier", pa.string()),
+    ("dataset", pa.string()),
+    ("phase", pa.string()),
+    ("step", pa.int32()),
+    ("loss", pa.float64()),
+    ("acc", pa.float64()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("dataset", pa.string())]), flavor="hive")
+
+
+def _literal(value):
+    # the CSV log holds reprs; records from the run logger hold the values
+    if isinstance(value, (dict, list)):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return ast.literal_eval(value)
+
+
+def _optional_int(value):
+    return None if pd.isna(value) else int(value)
+
+
+def _optional_float(value):
+    return None if pd.isna(value) else float(value)
+
+
+def _optional_str(value):
+    return None if pd.isna(value) else str(value)
+
+
+def parse_log(path):
+    """Parse the CSV run log into (runs, curves) Arrow tables."""
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    return parse_records(df.to_dict("records"))
+
+
+def parse_records(records):
+    """
+    (runs, curves) Arrow tables from run-log records, as rows of the CSV
+    log or `RunLogger` records. A log can hold the same `_id` twice; the
+    first one is kept.
+    """
+    runs = {name: [] for name in RUNS_SCHEMA.names}
+    curves = {name: [] for name in CURVES_SCHEMA.names}
+    parsed = set()
+    for row in records:
+        run_id = str(row["_id"])
+        if run_id in parsed:
+            continue
+        parsed.add(run_id)
+        runs["_id"].append(run_id)
+        for col in ("name", "classifier", "dataset", "Optim", "metric"):
+            runs[col].append(_optional_str(row.get(col)))
+        for col in ("acc", "runtime", "LR", "train_test_split"):
+            runs[col].append(_optional_float(row.get(col)))
+        for col in ("epochs", "batch_size", "cross_val"):
+            runs[col].append(_optional_int(row.get(col)))
+        runs["distributed"].append(bool(row.get("distributed", False)))
+        runs["confmatrix"].append(_literal(row.get("confmatrix")))
+
+        losses = _literal(row.get("loss_dict")) or {}
+        accs = _literal(row.get("acc_dict")) or {}
+        for phase in list(losses) + [p for p in accs if p not in losses]:
+            loss = losses.get(phase, [])
+            acc = accs.get(phase, [])
+            for step in range(max(len(loss), len(acc))):
+                curves["_id"].append(run_id)
+                curves["classifier"].append(runs["classifier"][-1])
+                curves["dataset"].append(runs["dataset"][-1])
+                curves["phase"].append(str(phase))
+                curves["step"].append(step)
+                curves["loss"].append(loss[step] if step < len(loss) else None)
+                curves["acc"].append(acc[step] if step < len(acc) else None)
+    return (pa.Table.from_pydict(runs, schema=RUNS_SCHEMA),
+            pa.Table.from_pydict(curves, schema=CURVES_SCHEMA))
+
+
+def _dataset(store, table, schema):
+    path = os.path.join(store, table)
+    if not os.path.isdir(path):
+        return None
+    return ds.dataset(path, schema=schema, format="parquet", partitioning=PARTITIONING)
+
+
+def stored_ids(store=STORE):
+    runs = _dataset(store, "runs", RUNS_SCHEMA)
+    if runs is None:
+        return set()
+    return set(runs.to_table(columns=["_id"]).column("_id").to_pylist())
+
+
+def _append(table, store, name):
+    if table.num_rows == 0:
+        return
+    ds.write_dataset(
+        table,
+        os.path.join(store, name),
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template="part-{}-{}-{{i}}.parquet".format(int(time.time()), uuid.uuid4().hex[:8]),
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+_STORE_LOCKS = {}
+
+_LOCK = threading.Lock()
+
+
+def _store_lock(store):
+    key = os.path.abspath(store)
+    with _LOCK:
+        lock = _STORE_LOCKS.get(key)
+        if lock is None:
+            lock = _STORE_LOCKS[key] = threading.Lock()
+    return lock
+
+
+def ingest(path=IC_RES, store=STORE):
+    """Append runs from the CSV log that are not in the store yet; return how many."""
+    return _ingest(*parse_log(path), store)
+
+
+def ingest_records(records, store=STORE):
+    """Append run records (e.g. delivered by `RunLogger`) that are not in the store yet; return how many."""
+    return _ingest(*parse_records(records), store)
+
+
+def _ingest(runs, curves, store):
+    # concurrent writers (the CLI, a run logger) ingest one at a time, so the
+    # later ones see the runs the first one appended
+    with _store_lock(store):
+        seen = stored_ids(store)
+        new_ids = [run_id for run_id in runs.column("_id").to_pylist() if run_id not in seen]
+        if not new_ids:
+            return 0
+        keep = pa.array(new_ids)
+        runs = runs.filter(pc.is_in(runs.column("_id"), value_set=keep))
+        curves = curves.filter(pc.is_in(curves.column("_id"), value_set=keep))
+        _append(runs, store, "runs")
+        _append(curves, store, "curves")
+        return runs.num_rows
+
+
+def _filter(dataset=None, classifier=None, **eq):
+    expr = None
+    for col, val in dict(eq, dataset=dataset, classifier=classifier).items():
+        if val is None:
+            continue
+        field = ds.field(col)
+        cond = field.isin(list(val)) if isinstance(val, (list, tuple, set)) else field == val
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def query_runs(store=STORE, columns=None, dataset=None, classifier=None, distributed=None):
+    """
+    Run-level rows as a DataFrame. Only `columns` are read, and the
+    dataset/classifier/distributed filters are pushed down to Parquet.
+    """
+    runs = _dataset(store, "runs", RUNS_SCHEMA)
+    if runs is None:
+        return pd.DataFrame(columns=columns or RUNS_SCHEMA.names)
+    expr = _filter(dataset, classifier, distributed=distributed)
+    return runs.to_table(columns=columns, filter=expr).to_pandas()
+
+
+def query_curves(store=STORE, columns=None, dataset=None, classifier=None, run_id=None, phase=None):
+    """Learning-curve rows as a DataFrame, with the same pushdown as query_runs."""
+    curves = _dataset(store, "curves", CURVES_SCHEMA)
+    if curves is None:
+        return pd.DataFrame(columns=columns or CURVES_SCHEMA.names)
+    expr = _filter(dataset, classifier, _id=run_id, phase=phase)
+    return curves.to_table(columns=columns, filter=expr).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest the classifier run log into the Parquet experiment store")
+    parser.add_argument("log", nargs="?", default=IC_RES)
+    parser.add_argument("store", nargs="?", default=STORE)
+    args = parser.parse_args()
+    added = ingest(args.log, args.store)
+    print("{} new runs written to {}".format(added, args.store))
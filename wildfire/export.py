@@ -0,0 +1,460 @@
+"""
+Static, pre-rendered export of the Wildfire Web App.
+
+Apart from a few widgets, every page of the app is the same for every
+visitor, yet each one holds a live Python session. `export` runs each
+section of `sections` once against a recorder that stands in for
+`streamlit`, so the data steps execute a single time, and writes a site
+that any file server or CDN can host:
+
+    <out>/index.html, <section>.html   one page per section
+    <out>/assets/<name>-<hash>.<ext>   media, plotly.js and results tables
+                                       (CSV), named by content hash
+    <out>/manifest.json                pages, variants and source -> asset map
+    *.gz                               gzip copies of text files, for
+                                       servers that serve precompressed files
+
+Plotly figures are serialized to JSON inside each page and drawn by the
+bundled plotly.js. Radio and select widgets are pre-rendered: the section
+is rendered once per combination of their options (up to MAX_VARIANTS)
+and the page switches between those variants. Sliders keep their default
+value. PNG and JPEG media are re-encoded (PNG losslessly, JPEG with its
+own quantization tables) when that makes them smaller; images built by
+`wildfire.assets` are offered as AVIF/WebP `<picture>` sources at every
+width.
+
+    python -m wildfire.export results/site
+"""
+
+import argparse
+import gzip
+import hashlib
+import html
+import importlib
+import io
+import json
+import mimetypes
+import os
+import re
+import shutil
+import textwrap
+import warnings
+from types import SimpleNamespace
+
+from wildfire import assets
+
+SITE_DIR = "results/site"
+
+# renders per section when enumerating widget options
+MAX_VARIANTS = 48
+
+HASH_LENGTH = 10
+
+GZIP_EXTS = (".html", ".js", ".css", ".json", ".csv", ".svg")
+
+_ITEM = re.compile(r"^\s*([-*+]|\d+\.)\s+(.*)$")
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+
+_ESCAPE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!$])")
+
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+_ITALIC = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])")
+
+_CSS = """
+body { margin: 0; font-family: "Source Sans Pro", sans-serif; color: #262730; display: flex; }
+nav { width: 14rem; min-height: 100vh; padding: 2rem 1rem; background: #f0f2f6; flex-shrink: 0; }
+nav a { display: block; padding: .3rem 0; color: #262730; text-decoration: none; }
+nav a.current { font-weight: 600; }
+main { max-width: 46rem; padding: 2rem 1rem 6rem; margin: 0 auto; line-height: 1.6; }
+figure { margin: 1rem 0; }
+figure img, video { max-width: 100%; }
+figcaption { color: #808495; font-size: .9rem; text-align: center; }
+table.dataframe { border-collapse: collapse; font-size: .9rem; }
+table.dataframe td, table.dataframe th { border: 1px solid #e6eaf1; padding: .2rem .5rem; }
+.widget { margin: 1rem 0; }
+.widget select { margin-left: .5rem; }
+.metric .value { font-size: 2rem; }
+"""
+
+_SCRIPT = """
+var figures = JSON.parse(document.getElementById("figures").textContent);
+var variants = Array.prototype.slice.call(document.querySelectorAll(".variant"));
+function show(variant) {
+  variants.forEach(function (v) { v.hidden = v !== variant; });
+  variant.querySelectorAll(".plotly:not(.plotted)").forEach(function (div) {
+    var figure = JSON.parse(JSON.stringify(figures[div.dataset.fig]));
+    figure.config = {responsive: true};
+    Plotly.newPlot(div, figure);
+    div.classList.add("plotted");
+  });
+}
+document.querySelectorAll(".widget select").forEach(function (select) {
+  select.addEventListener("change", function () {
+    var want = JSON.parse(select.closest(".variant").dataset.choices);
+    want[select.name] = select.value;
+    var match = variants.filter(function (v) {
+      var choices = JSON.parse(v.dataset.choices);
+      return Object.keys(choices).every(function (k) { return !(k in want) || choices[k] === want[k]; });
+    })[0];
+    if (match) { show(match); }
+  });
+});
+show(variants[0]);
+"""
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{section} | {title}</title>
+<style>{css}</style>
+<script src="{plotly}"></script>
+</head>
+<body>
+<nav>{nav}</nav>
+<main>
+<h1>{title}</h1>
+{variants}
+</main>
+<script type="application/json" id="figures">{figures}</script>
+<script>{script}</script>
+</body>
+</html>
+"""
+
+
+def _inline(text):
+    escaped = []
+
+    def keep(m):
+        escaped.append(m.group(1))
+        return "\x00{}\x00".format(len(escaped) - 1)
+
+    text = html.escape(_ESCAPE.sub(keep, text), quote=False)
+    text = _LINK.sub(lambda m: '<a href="{}">{}</a>'.format(m.group(2).replace('"', "%22"), m.group(1)), text)
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    text = _ITALIC.sub(r"<em>\1</em>", text)
+    return re.sub("\x00(\\d+)\x00", lambda m: html.escape(escaped[int(m.group(1))]), text)
+
+
+def markdown_html(text):
+    """
+    HTML for the Markdown the report uses: paragraphs, headings, bullet
+    and numbered lists, links, bold, italics and backslash escapes.
+    """
+    blocks = []
+    mode, blank = None, False
+    for line in textwrap.dedent(text).splitlines():
+        if not line.strip():
+            blank = True
+            continue
+        item, heading = _ITEM.match(line), _HEADING.match(line)
+        if heading:
+            blocks.append(("h{}".format(len(heading.group(1))), heading.group(2)))
+            mode = None
+        elif item:
+            kind = "ol" if item.group(1)[0].isdigit() else "ul"
+            if mode == "list" and blocks[-1][0] == kind:
+                blocks[-1][1].append([item.group(2)])
+            else:
+                blocks.append((kind, [[item.group(2)]]))
+            mode = "list"
+        elif mode == "list" and (line[0].isspace() or not blank):
+            blocks[-1][1][-1].append(line.strip())
+        elif mode == "p" and not blank:
+            blocks[-1][1].append(line.strip())
+        else:
+            blocks.append(("p", [line.strip()]))
+            mode = "p"
+        blank = False
+    out = []
+    for kind, body in blocks:
+        if kind == "p":
+            out.append("<p>{}</p>".format(_inline(" ".join(body))))
+        elif kind in ("ul", "ol"):
+            items = "".join("<li>{}</li>".format(_inline(" ".join(lines))) for lines in body)
+            out.append("<{0}>{1}</{0}>".format(kind, items))
+        else:
+            out.append("<{0}>{1}</{0}>".format(kind, _inline(body)))
+    return "\n".join(out)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _compress_image(path):
+    """File contents, re-encoded with optimized settings if that is smaller (PNG and JPEG only)."""
+    data = _read(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".png", ".jpg", ".jpeg"):
+        return data
+    from PIL import Image
+
+    out = io.BytesIO()
+    with Image.open(io.BytesIO(data)) as im:
+        if ext == ".png":
+            im.save(out, "PNG", optimize=True)
+        else:
+            # "keep" reuses the source quantization tables and subsampling
+            im.save(out, "JPEG", quality="keep", optimize=True, progressive=True)
+    return out.getvalue() if out.tell() < len(data) else data
+
+
+class Site:
+    """Content-addressed assets under `<root>/assets`, written once each."""
+
+    def __init__(self, root):
+        self.root = root
+        self.sources = {}
+        os.makedirs(os.path.join(root, "assets"), exist_ok=True)
+
+    def asset(self, data, name, hashed=False):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        stem, ext = os.path.splitext(os.path.basename(name))
+        if hashed:
+            rel = "assets/" + os.path.basename(name)
+        else:
+            rel = "assets/{}-{}{}".format(stem, hashlib.sha1(data).hexdigest()[:HASH_LENGTH], ext)
+        path = os.path.join(self.root, rel)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        return rel
+
+    def file(self, path):
+        """Asset for a local media file, or None when the file is missing."""
+        path = os.path.normpath(path)
+        if path not in self.sources and not os.path.exists(path):
+            warnings.warn("not exported, missing: {}".format(path))
+            self.sources[path] = None
+        if path not in self.sources:
+            # files built by wildfire.assets are already named by content hash
+            hashed = os.path.dirname(os.path.abspath(path)) == os.path.abspath(assets.ASSET_DIR)
+            data = _read(path) if hashed else _compress_image(path)
+            self.sources[path] = self.asset(data, path, hashed)
+        return self.sources[path]
+
+
+def _label(value):
+    if isinstance(value, (tuple, list)):
+        return " – ".join(str(v) for v in value)
+    return str(value)
+
+
+class Recorder:
+    """
+    Stand-in for the `streamlit` module while a section renders. Elements
+    become HTML; widgets return the option picked in `choices` (else their
+    default) and report the options they offer.
+    """
+
+    def __init__(self, site, figures, choices=None):
+        self.site = site
+        self.figures = figures
+        self.choices = choices or {}
+        self.elements = []
+        self.options = {}
+        self.used = {}
+        self.sidebar = self
+        self.components = SimpleNamespace(v1=SimpleNamespace(html=self._html))
+
+    def _heading(self, tag, body):
+        self.elements.append("<{0}>{1}</{0}>".format(tag, html.escape(str(body))))
+
+    def title(self, body, **kwargs):
+        self._heading("h1", body)
+
+    def header(self, body, **kwargs):
+        self._heading("h2", body)
+
+    def subheader(self, body, **kwargs):
+        self._heading("h3", body)
+
+    def markdown(self, body, **kwargs):
+        self.elements.append(markdown_html(body))
+
+    def _frame(self, df):
+        link = self.site.asset(df.to_csv(), "table.csv")
+        self.elements.append('{}\n<p><a href="{}" download>CSV</a></p>'.format(df.to_html(classes="dataframe", border=0),
+                                                                              link))
+
+    def table(self, data=None):
+        self._frame(data)
+
+    def write(self, *args, **kwargs):
+        for arg in args:
+            if hasattr(arg, "to_html"):
+                self._frame(arg)
+            elif isinstance(arg, str):
+                self.markdown(arg)
+            else:
+                self.elements.append("<pre>{}</pre>".format(html.escape(json.dumps(arg, indent=1, default=str))))
+
+    def caption(self, body, **kwargs):
+        self.elements.append("<figcaption>{}</figcaption>".format(html.escape(str(body))))
+
+    def image(self, image, caption=None, **kwargs):
+        src = image if image.startswith(("http://", "https://")) else self.site.file(image)
+        if src is None:
+            return
+        sources = ""
+        for fmt, by_width in sorted((assets.derivatives(image) or {}).items()):
+            srcset = ", ".join("{} {}w".format(self.site.file(path), w) for w, path in sorted(by_width.items()))
+            sources += '<source type="image/{}" srcset="{}" sizes="(max-width: 46rem) 100vw, 46rem">'.format(fmt, srcset)
+        caption = html.escape(caption or "")
+        self.elements.append('<figure><picture>{}<img src="{}" alt="{}" loading="lazy"></picture>'
+                             '<figcaption>{}</figcaption></figure>'.format(sources, html.escape(src), caption, caption))
+
+    def video(self, data, format="video/mp4", start_time=0):
+        if isinstance(data, str):
+            src = data if data.startswith(("http://", "https://")) else self.site.file(data)
+            if src is None:
+                return
+        else:
+            src = self.site.asset(data, "video" + (mimetypes.guess_extension(format) or ""))
+        if start_time:
+            src += "#t={}".format(start_time)
+        self.elements.append('<video controls preload="metadata" src="{}"></video>'.format(html.escape(src)))
+
+    def plotly_chart(self, figure_or_data, **kwargs):
+        figure = figure_or_data.to_json()
+        key = hashlib.sha1(figure.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+        self.figures[key] = figure
+        self.elements.append('<div class="plotly" data-fig="{}"></div>'.format(key))
+
+    def metric(self, label, value, delta=None, **kwargs):
+        delta = '<div class="delta">{:+}</div>'.format(delta) if delta is not None else ""
+        self.elements.append('<div class="metric"><div>{}</div><div class="value">{}</div>{}</div>'
+                             .format(html.escape(str(label)), html.escape(str(value)), delta))
+
+    def _html(self, body, width=None, height=None, scrolling=False):
+        self.elements.append("<div>{}</div>".format(body))
+
+    def _select(self, label, options, index=0):
+        options = list(options)
+        value = self.choices.get(label, options[index])
+        self.options.setdefault(label, options)
+        self.used[label] = str(value)
+        items = "".join('<option{}>{}</option>'.format(" selected" if o == value else "", html.escape(str(o)))
+                        for o in options)
+        self.elements.append('<div class="widget"><label>{0}<select name="{0}">{1}</select></label></div>'
+                             .format(html.escape(label), items))
+        return value
+
+    def radio(self, label, options, index=0, **kwargs):
+        return self._select(label, options, index)
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        return self._select(label, options, index)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        value = min_value if value is None else value
+        self.elements.append('<div class="widget"><label>{}</label> {}</div>'.format(html.escape(label),
+                                                                                    html.escape(_label(value))))
+        return value
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        value = list(default or [])
+        self.elements.append('<div class="widget"><label>{}</label> {}</div>'.format(
+            html.escape(label), html.escape(", ".join(map(str, value)) or "all")))
+        return value
+
+
+def render_variants(module_name, site, max_variants=MAX_VARIANTS):
+    """
+    Render a section once per combination of its widget options. Returns
+    ([(choices, html)], {figure key: JSON}), the variant with every
+    widget at its default first.
+    """
+    module = importlib.import_module(module_name)
+    real, figures, variants, default = module.st, {}, {}, None
+    pending, renders = [{}], 0
+    try:
+        while pending:
+            choices = pending.pop(0)
+            recorder = Recorder(site, figures, choices)
+            module.st = recorder
+            module.render()
+            renders += 1
+            if default is None:
+                default = recorder.used
+            free = [label for label in recorder.options if label not in choices]
+            if free and renders + len(pending) < max_variants:
+                pending += [dict(choices, **{free[0]: option}) for option in recorder.options[free[0]]]
+            else:
+                variants.setdefault(json.dumps(recorder.used, sort_keys=True), "\n".join(recorder.elements))
+    finally:
+        module.st = real
+    variants = [(json.loads(k), v) for k, v in variants.items()]
+    variants.sort(key=lambda v: any(default.get(k, c) != c for k, c in v[0].items()))
+    return variants, figures
+
+
+def _page(title, label, pages, plotly_js, variants, figures):
+    nav = "\n".join('<a href="{}"{}>{}</a>'.format(page, ' class="current"' if other == label else "",
+                                                   html.escape(other))
+                    for other, page in pages)
+    divs = "\n".join("<div class=\"variant\" data-choices='{}'{}>\n{}\n</div>".format(
+        html.escape(json.dumps(choices), quote=True), " hidden" if i else "", body)
+        for i, (choices, body) in enumerate(variants))
+    figures = "{" + ",".join('"{}":{}'.format(k, v) for k, v in figures.items()) + "}"
+    return _PAGE.format(title=html.escape(title), section=html.escape(label), css=_CSS, plotly=plotly_js, nav=nav,
+                        variants=divs, figures=figures.replace("</", "<\\/"), script=_SCRIPT)
+
+
+def precompress(root, exts=GZIP_EXTS):
+    """Write <file>.gz next to every text file, reproducibly (no timestamp)."""
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(exts):
+                path = os.path.join(directory, name)
+                with open(path, "rb") as src, open(path + ".gz", "wb") as raw:
+                    with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=9, mtime=0) as dst:
+                        shutil.copyfileobj(src, dst)
+
+
+def export(out_dir=SITE_DIR, max_variants=MAX_VARIANTS):
+    """Build the static site in a temporary directory and swap it into `out_dir`."""
+    import plotly.offline
+
+    from sections import SECTIONS, TITLE
+
+    tmp = out_dir.rstrip("/") + ".tmp-{}".format(os.getpid())
+    if os.path.isdir(tmp):
+        shutil.rmtree(tmp)
+    site = Site(tmp)
+    plotly_js = site.asset(plotly.offline.get_plotlyjs(), "plotly.min.js")
+    pages = [(label, "index.html" if i == 0 else module.rsplit(".", 1)[-1] + ".html")
+             for i, (label, module) in enumerate(SECTIONS.items())]
+    manifest = {"title": TITLE, "pages": {}, "assets": site.sources}
+    for (label, page), module in zip(pages, SECTIONS.values()):
+        variants, figures = render_variants(module, site, max_variants)
+        with open(os.path.join(tmp, page), "w", encoding="utf-8") as f:
+            f.write(_page(TITLE, label, pages, plotly_js, variants, figures))
+        manifest["pages"][page] = {"section": label, "variants": len(variants), "figures": len(figures)}
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+    precompress(tmp)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the dashboard as a static, pre-rendered site")
+    parser.add_argument("out", nargs="?", default=SITE_DIR)
+    parser.add_argument("--max-variants", type=int, default=MAX_VARIANTS, help="renders per section")
+    args = parser.parse_args()
+    manifest = export(args.out, args.max_variants)
+    for page, info in manifest["pages"].items():
+        print("{:<14} {:<24} {} variants, {} figures".format(page, info["section"], info["variants"], info["figures"]))
+    print("{} assets under {}".format(len(os.listdir(os.path.join(args.out, "assets"))), args.out))
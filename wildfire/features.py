@@ -0,0 +1,116 @@
+"""
+Cached image-to-feature-matrix stage for the XGBoost classifiers.
+
+`load_dataset` in 003_bd_pytorch_xgboost_no_distributed.ipynb decodes,
+resizes and flattens every image one at a time into a Python list and
+stacks the result in RAM, on every run. `build_matrix` does the same
+transform (cv2 decode, resize, flatten, scale to [0, 1]) on a process
+pool, with each worker writing its rows straight into a preallocated
+memory-mapped `.npy`. The matrix is stored under a key made from the
+content hash of every source image plus the transform parameters, so a
+later run with the same inputs only memory-maps the existing file.
+
+    X, y = load_matrix([(config.FIRE_PATH, 1), (config.NON_FIRE_PATH, 0)])
+    cross_val_score(xgb.XGBClassifier(), X, y, cv=2)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from wildfire import instrument
+from wildfire.cache import file_digests
+
+FEATURE_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "wildfire", "features")
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+SIZE = (128, 128)
+
+# rows handed to a worker at a time
+BATCH = 256
+
+
+def list_images(path):
+    """Image files under path, sorted, like imutils.paths.list_images."""
+    found = []
+    for root, _, files in os.walk(path):
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTS):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def matrix_key(paths, labels, digests, size=SIZE, flatten=True):
+    h = hashlib.sha1()
+    h.update(json.dumps({"size": list(size), "flatten": flatten, "scale": 255, "reader": "cv2"}).encode())
+    for path, label in zip(paths, labels):
+        h.update("{}:{}\n".format(digests[path], label).encode())
+    return h.hexdigest()
+
+
+def _decode(path, size):
+    import cv2
+
+    image = cv2.imread(path)
+    if image is None:
+        raise ValueError("could not decode {}".format(path))
+    return cv2.resize(image, size)
+
+
+def _fill(out_path, start, paths, size, flatten):
+    X = np.load(out_path, mmap_mode="r+")
+    for i, path in enumerate(paths, start):
+        image = _decode(path, size).astype("float32") / 255
+        X[i] = image.reshape(-1) if flatten else image
+    X.flush()
+    return len(paths)
+
+
+def build_matrix(sources, cache_dir=FEATURE_CACHE, size=SIZE, flatten=True, max_samples=None, workers=None):
+    """
+    Feature matrix for [(directory, label), ...] as (X path, y path).
+
+    X is float32 with one row per image (flattened HxWx3 when flatten is
+    set), written once per distinct key and reused afterwards.
+    """
+    paths, labels = [], []
+    for directory, label in sources:
+        found = list_images(directory)[:max_samples]
+        paths += found
+        labels += [label] * len(found)
+    digests = file_digests(paths, os.path.join(cache_dir, "digests.json"), workers)
+    key = matrix_key(paths, labels, digests, size, flatten)
+    final = os.path.join(cache_dir, key)
+    x_path, y_path = os.path.join(final, "X.npy"), os.path.join(final, "y.npy")
+    if os.path.exists(y_path):
+        return x_path, y_path
+
+    tmp = final + ".tmp-{}".format(os.getpid())
+    os.makedirs(tmp, exist_ok=True)
+    shape = (len(paths), size[0] * size[1] * 3) if flatten else (len(paths), size[1], size[0], 3)
+    X = np.lib.format.open_memmap(os.path.join(tmp, "X.npy"), mode="w+", dtype="float32", shape=shape)
+    del X
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_fill, os.path.join(tmp, "X.npy"), i, paths[i:i + BATCH], size, flatten)
+                   for i in range(0, len(paths), BATCH)]
+        for fut in futures:
+            fut.result()
+    np.save(os.path.join(tmp, "y.npy"), np.asarray(labels, dtype="float32"))
+    try:
+        os.rename(tmp, final)
+    except OSError:
+        # another run finished the same key first
+        shutil.rmtree(tmp)
+    return x_path, y_path
+
+
+@instrument.traced()
+def load_matrix(sources, cache_dir=FEATURE_CACHE, size=SIZE, flatten=True, max_samples=None, workers=None):
+    """(X, y) with X memory-mapped read-only, building the cache entry if needed."""
+    x_path, y_path = build_matrix(sources, cache_dir, size, flatten, max_samples, workers)
+    return np.load(x_path, mmap_mode="r"), np.load(y_path)
@@ -0,0 +1,221 @@
+"""
+Streaming aggregation of the NASA FIRMS MODIS fire archive.
+
+Replaces the Spark pipeline in 002_bd_proj_subei.ipynb. The archive CSV
+is split into newline-aligned byte segments that worker processes parse
+with pandas and reduce to a small partial aggregate, keyed on
+(year, month, 5-degree lat/lng cell). Partials are mergeable (counts,
+sums, min and max), so memory stays flat no matter how large the archive
+is, and every rollup from the notebook is derived from the merged cube:
+
+    by_year            fireByYear
+    by_month_year      fireByMonthYear pivot
+    by_region          fireByRegion (georegion, year, month)
+    mean_by_year       fireIntensityFRPByYear / fireIntensityBRTByYear
+    region_yoy         fireByRegionYoY lag() window
+
+    python -m wildfire.firms fire_archive_M-C61_234859.csv results/firms/cube.parquet
+"""
+
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# presumed vegetation fires only, nominal or high confidence
+FIRE_TYPE = 0
+MIN_CONFIDENCE = 50
+
+# 2000 has only Nov/Dec and 2021 only Jan-Apr in the archive
+EXCLUDE_YEARS = (2000, 2021)
+
+REGION_DEG = 5
+
+SEGMENT_BYTES = 64 << 20
+
+USECOLS = ["latitude", "longitude", "brightness", "acq_date", "confidence", "frp", "type"]
+
+DTYPES = {
+    "latitude": "float32",
+    "longitude": "float32",
+    "brightness": "float32",
+    "confidence": "int16",
+    "frp": "float32",
+    "type": "int8",
+}
+
+KEYS = ["year", "month", "lat", "lng"]
+
+SUMS = ["count", "frp_sum", "brightness_sum"]
+
+MINS = ["frp_min", "brightness_min"]
+
+MAXS = ["frp_max", "brightness_max"]
+
+CUBE_COLS = KEYS + SUMS + MINS + MAXS
+
+
+def empty_cube():
+    return pd.DataFrame({c: pd.Series(dtype="float64" if c not in KEYS + ["count"] else "int64")
+                         for c in CUBE_COLS})
+
+
+def aggregate_frame(df):
+    """Filter one chunk of raw FIRMS rows and reduce it to a partial cube."""
+    keep = df["confidence"] >= MIN_CONFIDENCE
+    # NRT downloads have no `type` column; only the archive is classified
+    if "type" in df:
+        keep &= df["type"] == FIRE_TYPE
+    df = df[keep]
+    if df.empty:
+        return empty_cube()
+    date = df["acq_date"].astype(str)
+    keyed = pd.DataFrame({
+        "year": date.str.slice(0, 4).astype("int16"),
+        "month": date.str.slice(5, 7).astype("int8"),
+        "lat": (np.floor(df["latitude"].to_numpy() / REGION_DEG) * REGION_DEG).astype("int16"),
+        "lng": (np.floor(df["longitude"].to_numpy() / REGION_DEG) * REGION_DEG).astype("int16"),
+        "frp": df["frp"].to_numpy(dtype="float64"),
+        "brightness": df["brightness"].to_numpy(dtype="float64"),
+    })
+    grouped = keyed.groupby(KEYS, sort=False)
+    cube = grouped.agg(
+        count=("frp", "size"),
+        frp_sum=("frp", "sum"),
+        brightness_sum=("brightness", "sum"),
+        frp_min=("frp", "min"),
+        brightness_min=("brightness", "min"),
+        frp_max=("frp", "max"),
+        brightness_max=("brightness", "max"),
+    ).reset_index()
+    return _normalize(cube)
+
+
+def _normalize(cube):
+    cube = cube[CUBE_COLS]
+    return cube.astype({k: "int64" for k in KEYS + ["count"]}).astype(
+        {c: "float64" for c in SUMS[1:] + MINS + MAXS})
+
+
+def merge(partials):
+    """Combine partial cubes into one; the result is itself a partial."""
+    partials = [p for p in partials if len(p)]
+    if not partials:
+        return empty_cube()
+    cube = pd.concat(partials, ignore_index=True)
+    agg = dict({c: "sum" for c in SUMS}, **{c: "min" for c in MINS}, **{c: "max" for c in MAXS})
+    cube = cube.groupby(KEYS, sort=True).agg(agg).reset_index()
+    return _normalize(cube)
+
+
+def segments(path, size=SEGMENT_BYTES):
+    """Newline-aligned (start, end) byte ranges covering the data rows."""
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        bounds = []
+        while start < total:
+            f.seek(min(start + size, total))
+            if f.tell() < total:
+                f.readline()
+            end = f.tell()
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _aggregate_segment(path, start, end):
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(header + data), usecols=lambda c: c in USECOLS, dtype=DTYPES)
+    return aggregate_frame(df)
+
+
+def aggregate_file(path, workers=None, segment_bytes=SEGMENT_BYTES):
+    """
+    Aggregate a FIRMS archive CSV into a cube. Segments are spread over a
+    process pool of `workers` processes (all cores by default); with
+    workers=1 everything runs in-process.
+    """
+    bounds = segments(path, segment_bytes)
+    if workers == 1 or len(bounds) <= 1:
+        return merge([_aggregate_segment(path, s, e) for s, e in bounds])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_aggregate_segment, path, s, e) for s, e in bounds]
+        # fold as results arrive so only one merged cube is kept around
+        cube = empty_cube()
+        for fut in futures:
+            cube = merge([cube, fut.result()])
+    return cube
+
+
+def _complete(cube, exclude=EXCLUDE_YEARS):
+    return cube[~cube["year"].isin(exclude)] if exclude else cube
+
+
+def georegion(cube):
+    return cube["lat"].astype(str) + "," + cube["lng"].astype(str)
+
+
+def by_year(cube, exclude=EXCLUDE_YEARS):
+    out = _complete(cube, exclude).groupby("year")["count"].sum()
+    return out.reset_index()
+
+
+def by_month_year(cube, exclude=EXCLUDE_YEARS):
+    """Fire counts with one row per month and one column per year."""
+    out = _complete(cube, exclude).pivot_table(index="month", columns="year", values="count", aggfunc="sum")
+    return out.sort_index()
+
+
+def by_region(cube, exclude=EXCLUDE_YEARS):
+    cube = _complete(cube, exclude)
+    out = cube.assign(georegion=georegion(cube)).groupby(["georegion", "year", "month"])["count"].sum()
+    return out.reset_index().sort_values("count", ascending=False, ignore_index=True)
+
+
+def mean_by_year(cube, column, exclude=EXCLUDE_YEARS):
+    """Yearly mean of `frp` or `brightness` from the per-cell sums."""
+    sums = _complete(cube, exclude).groupby("year")[[column + "_sum", "count"]].sum()
+    return (sums[column + "_sum"] / sums["count"]).rename(column).reset_index()
+
+
+def top_regions(cube, n=10, exclude=EXCLUDE_YEARS):
+    """Regions with the highest average yearly fire count."""
+    yearly = by_region(cube, exclude).groupby(["georegion", "year"])["count"].sum()
+    return yearly.groupby("georegion").mean().nlargest(n).index.tolist()
+
+
+def region_yoy(cube, regions=None, exclude=EXCLUDE_YEARS):
+    """Year-over-year change in fire count per region, as the lag() window."""
+    yearly = by_region(cube, exclude).groupby(["georegion", "year"])["count"].sum().reset_index()
+    if regions is not None:
+        yearly = yearly[yearly["georegion"].isin(regions)]
+    yearly = yearly.sort_values(["georegion", "year"])
+    yearly["pyCount"] = yearly.groupby("georegion")["count"].shift(1)
+    yearly["yearlyChange"] = yearly["count"] - yearly["pyCount"]
+    yearly["yearlyInc"] = yearly["yearlyChange"] / yearly["pyCount"]
+    return yearly.sort_values("yearlyChange", ascending=False, ignore_index=True)
+
+
+def load_cube(path):
+    return pd.read_parquet(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate a FIRMS archive CSV into a rollup cube")
+    parser.add_argument("archive")
+    parser.add_argument("output")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--segment-mb", type=int, default=SEGMENT_BYTES >> 20)
+    args = parser.parse_args()
+    cube = aggregate_file(args.archive, args.workers, args.segment_mb << 20)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    cube.to_parquet(args.output, index=False)
+    print("{} fires in {} cells written to {}".format(cube["count"].sum(), len(cube), args.output))
@@ -0,0 +1,283 @@
+"""
+Indexed columnar store for the FPA FOD wildfire records (the Kaggle
+"1.88 Million US Wildfires" SQLite database, or the CSV releases).
+
+The burned-area-by-cause and by-state figures (media/image10.png,
+image11.png) were aggregated once in a notebook and frozen as images.
+`ingest` reads the `Fires` table in chunks and writes each column as a
+.npy file, with state, cause and size class dictionary-encoded, and the
+rows sorted by (year, state, cause):
+
+    <root>/index.json       dictionaries, year range, row count
+    <root>/offsets.npy      first row of every (year, state, cause) cell
+    <root>/acres.npy        dense year x state x cause burned-acres cube
+    <root>/cube.parquet     the same cube in long form, with counts
+    <root>/columns/<name>.npy
+
+The offsets are a clustered index on all three keys: any combination of
+year, state and cause filters resolves to a set of contiguous row ranges,
+and counts per cell are their lengths. Group-bys over those keys are
+sums over the dense cube; filters on other columns (size, day of year)
+only read the rows in the selected ranges.
+
+    python -m wildfire.fpafod FPA_FOD_20170508.sqlite results/fpafod
+
+    store = Store("results/fpafod")
+    store.aggregate(by=["cause"], years=(2000, 2015), states=["CA", "OR"])
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+FPAFOD_ROOT = "results/fpafod"
+
+INDEX = "index.json"
+
+TABLE = "Fires"
+
+CHUNKSIZE = 250_000
+
+# stored column -> source columns, the first one present is used
+COLUMNS = {
+    "year": ("FIRE_YEAR",),
+    "state": ("STATE",),
+    "cause": ("STAT_CAUSE_DESCR", "NWCG_GENERAL_CAUSE"),
+    "acres": ("FIRE_SIZE",),
+    "size_class": ("FIRE_SIZE_CLASS",),
+    "doy": ("DISCOVERY_DOY",),
+    "latitude": ("LATITUDE",),
+    "longitude": ("LONGITUDE",),
+}
+
+KEYS = ("year", "state", "cause")
+
+# dictionary-encoded columns -> their labels in index.json
+CODED = {"state": "states", "cause": "causes", "size_class": "size_classes"}
+
+DTYPES = {"year": "int16", "acres": "float32", "doy": "int16", "latitude": "float32", "longitude": "float32"}
+
+UNKNOWN = "Unknown"
+
+
+def _source_columns(available):
+    picked = {}
+    for name, aliases in COLUMNS.items():
+        found = [a for a in aliases if a in available]
+        if found:
+            picked[found[0]] = name
+        elif name in KEYS or name == "acres":
+            raise ValueError("no {} column (expected one of {})".format(name, ", ".join(aliases)))
+    return picked
+
+
+def chunks(path, table=TABLE, chunksize=CHUNKSIZE):
+    """Raw records with stored column names, from the SQLite database or a CSV release."""
+    if path.endswith((".sqlite", ".db")):
+        with sqlite3.connect("file:{}?mode=ro".format(path), uri=True) as conn:
+            available = [row[1] for row in conn.execute("PRAGMA table_info({})".format(table))]
+            picked = _source_columns(available)
+            sql = "SELECT {} FROM {}".format(", ".join(picked), table)
+            for chunk in pd.read_sql_query(sql, conn, chunksize=chunksize):
+                yield chunk.rename(columns=picked)
+    else:
+        picked = _source_columns(pd.read_csv(path, nrows=0).columns)
+        for chunk in pd.read_csv(path, usecols=list(picked), chunksize=chunksize, low_memory=False):
+            yield chunk.rename(columns=picked)
+
+
+def _normalize(chunk):
+    chunk = chunk.dropna(subset=["year"])
+    out = {name: chunk[name].astype(DTYPES[name]) for name in DTYPES if name in chunk}
+    out["acres"] = chunk["acres"].fillna(0).astype("float32")
+    for name in CODED:
+        if name in chunk:
+            out[name] = chunk[name].fillna(UNKNOWN).astype(str).str.strip().astype("category")
+    return pd.DataFrame(out)
+
+
+def ingest(path, root=FPAFOD_ROOT, table=TABLE, chunksize=CHUNKSIZE):
+    """Rebuild the store from the database or CSV; returns the index."""
+    parts = [_normalize(chunk) for chunk in chunks(path, table, chunksize)]
+    coded = [name for name in CODED if name in parts[0]]
+    columns = {}
+    for name in parts[0].columns:
+        if name in coded:
+            union = pd.api.types.union_categoricals([p[name] for p in parts], sort_categories=True)
+            columns[name] = union
+        else:
+            columns[name] = np.concatenate([p[name].to_numpy() for p in parts])
+    del parts
+    years = (int(columns["year"].min()), int(columns["year"].max()))
+    labels = {name: [str(c) for c in columns[name].categories] for name in coded}
+    for name in coded:
+        codes = columns[name].codes
+        columns[name] = codes.astype("uint8" if len(labels[name]) < 256 else "uint16")
+    shape = (years[1] - years[0] + 1, len(labels["state"]), len(labels["cause"]))
+    key = np.ravel_multi_index((columns["year"] - years[0], columns["state"], columns["cause"]), shape)
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+
+    tmp = root.rstrip("/") + ".tmp-{}".format(os.getpid())
+    if os.path.isdir(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(os.path.join(tmp, "columns"))
+    for name, values in columns.items():
+        np.save(os.path.join(tmp, "columns", name + ".npy"), values[order])
+    cells = int(np.prod(shape))
+    np.save(os.path.join(tmp, "offsets.npy"), np.searchsorted(key, np.arange(cells + 1)))
+    acres = np.bincount(key, weights=columns["acres"][order], minlength=cells).reshape(shape)
+    np.save(os.path.join(tmp, "acres.npy"), acres)
+    counts = np.bincount(key, minlength=cells).reshape(shape)
+    y, s, c = np.nonzero(counts)
+    pd.DataFrame({"year": (y + years[0]).astype("int16"), "state": np.asarray(labels["state"])[s],
+                  "cause": np.asarray(labels["cause"])[c], "count": counts[y, s, c],
+                  "acres": acres[y, s, c]}).to_parquet(os.path.join(tmp, "cube.parquet"), index=False)
+    index = {"source": os.path.basename(path), "rows": int(len(key)), "years": list(years),
+             "columns": {name: str(values.dtype) for name, values in columns.items()}}
+    index.update({CODED[name]: labels[name] for name in coded})
+    with open(os.path.join(tmp, INDEX), "w") as f:
+        json.dump(index, f, indent=1)
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    os.replace(tmp, root)
+    return index
+
+
+def _positions(labels, values):
+    # sorted and unique: row ranges are walked in cube order, and record-level
+    # aggregates look labels up with searchsorted
+    lookup = {label: i for i, label in enumerate(labels)}
+    return np.unique(np.array([lookup[v] for v in values if v in lookup], dtype="int64"))
+
+
+class Store:
+    """Read side of the store: cube aggregates and row ranges by year, state and cause."""
+
+    def __init__(self, root=FPAFOD_ROOT):
+        self.root = root
+        with open(os.path.join(root, INDEX)) as f:
+            self.index = json.load(f)
+        self.offsets = np.load(os.path.join(root, "offsets.npy"))
+        self.acres = np.load(os.path.join(root, "acres.npy"))
+        self.counts = np.diff(self.offsets).reshape(self.acres.shape)
+        self._columns = {}
+
+    @property
+    def years(self):
+        return tuple(self.index["years"])
+
+    @property
+    def states(self):
+        return self.index["states"]
+
+    @property
+    def causes(self):
+        return self.index["causes"]
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = np.load(os.path.join(self.root, "columns", name + ".npy"), mmap_mode="r")
+        return self._columns[name]
+
+    def _axes(self, years=None, states=None, causes=None):
+        first, last = self.years
+        # years is an inclusive (first, last) range; either end may be None
+        lo = first if years is None or years[0] is None else max(years[0], first)
+        hi = last if years is None or years[1] is None else min(years[1], last)
+        return (np.arange(lo - first, hi - first + 1),
+                np.arange(len(self.states)) if states is None else _positions(self.states, states),
+                np.arange(len(self.causes)) if causes is None else _positions(self.causes, causes))
+
+    def row_ids(self, years=None, states=None, causes=None):
+        """Row numbers of the records matching the filters, from the offsets alone."""
+        axes = self._axes(years, states, causes)
+        cells = np.ravel_multi_index(np.ix_(*axes), self.counts.shape).ravel()
+        starts, ends = self.offsets[cells], self.offsets[cells + 1]
+        lengths = ends - starts
+        keep = lengths > 0
+        starts, lengths = starts[keep], lengths[keep]
+        # one arange per range, without a Python loop
+        shift = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return shift + np.arange(lengths.sum())
+
+    def rows(self, years=None, states=None, causes=None, columns=None):
+        """Matching records, decoded."""
+        ids = self.row_ids(years, states, causes)
+        out = {}
+        for name in columns or self.index["columns"]:
+            values = np.asarray(self.column(name)[ids])
+            labels = self.index.get(CODED.get(name))
+            out[name] = pd.Categorical.from_codes(values, labels) if labels is not None else values
+        return pd.DataFrame(out)
+
+    def aggregate(self, by=(), years=None, states=None, causes=None, min_acres=None, size_classes=None):
+        """
+        Fire count and burned acres grouped by any of year, state and cause.
+        Answered from the cube, unless `min_acres` or `size_classes` filter
+        individual records.
+        """
+        axes = self._axes(years, states, causes)
+        if min_acres is None and size_classes is None:
+            counts = self.counts[np.ix_(*axes)]
+            acres = self.acres[np.ix_(*axes)]
+        else:
+            ids = self.row_ids(years, states, causes)
+            keep = np.ones(len(ids), dtype=bool)
+            row_acres = np.asarray(self.column("acres")[ids], dtype="float64")
+            if min_acres is not None:
+                keep &= row_acres >= min_acres
+            if size_classes is not None:
+                keep &= np.isin(self.column("size_class")[ids], _positions(self.index["size_classes"], size_classes))
+            ids, row_acres = ids[keep], row_acres[keep]
+            local = [np.searchsorted(axis, self.column(key)[ids] - (self.years[0] if key == "year" else 0))
+                     for axis, key in zip(axes, KEYS)]
+            shape = tuple(len(axis) for axis in axes)
+            flat = np.ravel_multi_index(local, shape) if len(ids) else np.zeros(0, dtype="int64")
+            size = int(np.prod(shape))
+            counts = np.bincount(flat, minlength=size).reshape(shape)
+            acres = np.bincount(flat, weights=row_acres, minlength=size).reshape(shape)
+        # grouped axes in the order of `by`, the rest summed out
+        keep_axes = [KEYS.index(key) for key in by]
+        drop = tuple(i for i in range(3) if i not in keep_axes)
+        order = np.argsort(np.argsort(keep_axes))
+        counts = counts.sum(axis=drop).transpose(order)
+        acres = acres.sum(axis=drop).transpose(order)
+        if not keep_axes:
+            return pd.DataFrame({"count": [int(counts)], "acres": [float(acres)]})
+        labels = {0: np.arange(self.years[0], self.years[1] + 1), 1: np.asarray(self.states),
+                  2: np.asarray(self.causes)}
+        grid = np.meshgrid(*[labels[i][axes[i]] for i in keep_axes], indexing="ij")
+        out = pd.DataFrame({KEYS[i]: g.ravel() for i, g in zip(keep_axes, grid)})
+        out["count"] = counts.ravel()
+        out["acres"] = acres.ravel()
+        return out[out["count"] > 0].reset_index(drop=True)
+
+
+def exceeded_states(store, state="AK", years=None):
+    """How many of the smallest states by burned area `state` outburns combined."""
+    by_state = store.aggregate(by=["state"], years=years).set_index("state")["acres"]
+    others = np.cumsum(np.sort(by_state.drop(state, errors="ignore").to_numpy()))
+    return int(np.searchsorted(others, by_state.get(state, 0.0)))
+
+
+def load_store(path):
+    """Store for an index.json path (FileCache loader)."""
+    return Store(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest the FPA FOD wildfire records into an indexed columnar store")
+    parser.add_argument("source", help="FPA_FOD_*.sqlite or a CSV release")
+    parser.add_argument("root", nargs="?", default=FPAFOD_ROOT)
+    parser.add_argument("--table", default=TABLE)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+    index = ingest(args.source, args.root, args.table, args.chunksize)
+    print("{} records, {}-{}, {} states, {} causes written to {}".format(
+        index["rows"], *index["years"], len(index["states"]), len(index["causes"]), args.root))
@@ -0,0 +1,327 @@
+"""
+Batched CPU inference for the trained DenseNet161 / Wide-ResNet50-2
+checkpoints.
+
+003_bd_pytorch_xgboost_no_distributed.ipynb has four copies of
+`get_predictions`, each rebuilding a torchvision model, loading one
+`.pt` state dict and looping over a DataLoader. `Engine` loads a
+checkpoint once (models are shared through a FileCache, so a second
+engine on the same file reuses it) and serves single-image requests:
+`submit` queues an image, and batcher threads gather queued requests
+into batches of up to `max_batch`, waiting at most `max_latency_ms`
+after the oldest request before running a partial batch. The graph can
+be exported to TorchScript or ONNX (onnxruntime) for inference.
+
+The architecture and dataset are read from the checkpoint name as saved
+by the notebook (`<groundfire|aerialfire|satfire>_<arch>.pt`):
+
+    with Engine("satfire_wide_resnet50_2.pt", export="torchscript") as engine:
+        probs = engine.predict(paths)          # (n, 2) softmax, Fire first
+        print(engine.stats())
+
+    python -m wildfire.inference aerialfire_densenet161.pt FLAME/Test --export torchscript
+"""
+
+import argparse
+import collections
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from wildfire import instrument
+from wildfire.cache import FileCache
+from wildfire.features import list_images
+
+CLASSES = ("Fire", "No Fire")
+
+ARCHS = ("densenet161", "wide_resnet50_2")
+
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype="float32")
+
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype="float32")
+
+# input handling per dataset, keyed by the checkpoint prefix the notebook used
+DATASETS = {
+    "ground": {"prefix": "groundfire", "size": 256},
+    "aerial": {"prefix": "aerialfire", "size": 256},
+    "satellite": {"prefix": "satfire", "size": 256, "bands": (2, 6, 7)},
+}
+
+MAX_BATCH = 32
+
+MAX_LATENCY_MS = 20
+
+# latencies kept for the percentile report
+LATENCY_WINDOW = 10000
+
+MODELS = instrument.watch_cache("models", FileCache(maxsize=8, hash_contents=False))
+
+
+def parse_checkpoint(path):
+    """(dataset, arch) from a checkpoint name like satfire_wide_resnet50_2.pt."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    for dataset, spec in DATASETS.items():
+        prefix = spec["prefix"] + "_"
+        if name.startswith(prefix) and name[len(prefix):] in ARCHS:
+            return dataset, name[len(prefix):]
+    raise ValueError("cannot infer dataset/architecture from {}".format(path))
+
+
+def build_model(arch, pretrained=False):
+    """
+    torchvision architecture with the two-class head the notebook trained;
+    `pretrained` starts from the ImageNet weights, as the notebook did.
+    """
+    import torch.nn as nn
+    from torchvision import models
+
+    model = getattr(models, arch)(weights="DEFAULT" if pretrained else None)
+    if arch == "densenet161":
+        model.classifier = nn.Linear(model.classifier.in_features, len(CLASSES))
+    else:
+        model.fc = nn.Linear(model.fc.in_features, len(CLASSES))
+    return model
+
+
+def load_model(path, arch=None):
+    import torch
+
+    if arch is None:
+        arch = parse_checkpoint(path)[1]
+    model = build_model(arch)
+    model.load_state_dict(torch.load(path, map_location="cpu"))
+    return model.eval()
+
+
+def _export(model, kind, size, channels, path):
+    import torch
+
+    example = torch.zeros(1, channels, size, size)
+    if kind == "torchscript":
+        with torch.no_grad():
+            traced = torch.jit.trace(model, example)
+        return torch.jit.optimize_for_inference(traced)
+    if kind == "onnx":
+        import onnxruntime
+
+        onnx_path = os.path.splitext(path)[0] + ".onnx"
+        if not os.path.exists(onnx_path) or os.path.getmtime(onnx_path) < os.path.getmtime(path):
+            torch.onnx.export(model, example, onnx_path + ".tmp", input_names=["x"], output_names=["logits"],
+                              dynamic_axes={"x": {0: "n"}, "logits": {0: "n"}}, opset_version=13)
+            os.replace(onnx_path + ".tmp", onnx_path)
+        session = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        return lambda x: torch.from_numpy(session.run(None, {"x": x.numpy()})[0])
+    raise ValueError("unknown export {!r}".format(kind))
+
+
+def read_image(path, size=256):
+    """RGB image resized (nearest) and ImageNet-normalized, as CHW float32."""
+    from PIL import Image
+
+    with Image.open(path) as im:
+        x = np.asarray(im.convert("RGB").resize((size, size), Image.NEAREST), dtype="float32") / 255
+    return ((x - IMAGENET_MEAN) / IMAGENET_STD).transpose(2, 0, 1)
+
+
+def read_tile(path, bands=(2, 6, 7), mean=None, std=None):
+    """Selected Landsat bands as CHW float32, standardized per band when mean/std are given."""
+    import rasterio
+
+    with rasterio.open(path) as src:
+        x = src.read(bands).astype("float32")
+    if mean is not None:
+        x = (x - np.asarray(mean, dtype="float32")[:, None, None]) / np.asarray(std, dtype="float32")[:, None, None]
+    return x
+
+
+class Engine:
+    """
+    Dynamic-batching inference over one checkpoint.
+
+    `submit` accepts a CHW array or an image/tile path and returns a
+    Future of the softmax probabilities. Paths are decoded on a thread
+    pool; `workers` batcher threads share the model and use `threads`
+    intra-op threads. Satellite tiles are upsampled to 256x256 in the
+    batch, and standardized with `band_stats` = (mean, std) when given
+    (e.g. from `wildfire.landsat.BandStore.stats`).
+    """
+
+    def __init__(self, checkpoint, dataset=None, arch=None, max_batch=MAX_BATCH, max_latency_ms=MAX_LATENCY_MS,
+                 workers=1, threads=None, export=None, band_stats=None):
+        import torch
+
+        parsed = parse_checkpoint(checkpoint) if dataset is None or arch is None else (dataset, arch)
+        self.dataset, self.arch = dataset or parsed[0], arch or parsed[1]
+        self.spec = DATASETS[self.dataset]
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self.band_stats = band_stats
+        if threads is not None:
+            torch.set_num_threads(threads)
+        model = MODELS.get(checkpoint, lambda p: load_model(p, self.arch), key=("model", self.arch))
+        if export is not None:
+            channels = len(self.spec.get("bands", "rgb"))
+            model = MODELS.get(checkpoint, lambda p: _export(model, export, self.spec["size"], channels, p),
+                               key=("export", self.arch, export))
+        self.model = model
+        self._queue = queue.Queue()
+        self._decode = ThreadPoolExecutor(max_workers=max(2, workers * 2))
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._images = 0
+        self._batches = 0
+        self._busy = 0.0
+        self._started = time.perf_counter()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # finish decoding first so no request is queued behind the stop markers
+        self._decode.shutdown()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+    def preprocess(self, item):
+        if not isinstance(item, str):
+            return np.asarray(item, dtype="float32")
+        if self.dataset == "satellite":
+            mean, std = self.band_stats if self.band_stats is not None else (None, None)
+            return read_tile(item, self.spec["bands"], mean, std)
+        return read_image(item, self.spec["size"])
+
+    def submit(self, item):
+        """Queue one image (CHW array or path); returns a Future of its class probabilities."""
+        fut = Future()
+        submitted = time.perf_counter()
+        if isinstance(item, str):
+            decoded = self._decode.submit(self.preprocess, item)
+            decoded.add_done_callback(lambda d: self._enqueue(d, fut, submitted))
+        else:
+            self._queue.put((self.preprocess(item), fut, submitted))
+        return fut
+
+    def _enqueue(self, decoded, fut, submitted):
+        if decoded.exception() is not None:
+            fut.set_exception(decoded.exception())
+        else:
+            self._queue.put((decoded.result(), fut, submitted))
+
+    def _gather(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_latency
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=max(timeout, 0)) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # let close() stop this thread after the current batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._gather()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            try:
+                probs = self._forward(np.stack([x for x, _, _ in batch]))
+            except Exception as e:
+                for _, fut, _ in batch:
+                    fut.set_exception(e)
+                continue
+            done = time.perf_counter()
+            with self._lock:
+                self._images += len(batch)
+                self._batches += 1
+                self._busy += done - start
+                self._latencies.extend(done - t for _, _, t in batch)
+            instrument.count("inference.images", len(batch))
+            for p, (_, fut, _) in zip(probs, batch):
+                fut.set_result(p)
+
+    @instrument.traced("inference.forward")
+    def _forward(self, x):
+        import torch
+        import torch.nn.functional as F
+
+        with torch.inference_mode():
+            x = torch.from_numpy(x)
+            size = self.spec["size"]
+            if x.shape[-1] != size or x.shape[-2] != size:
+                x = F.interpolate(x, size=(size, size), mode="bilinear", align_corners=False)
+            return torch.softmax(self.model(x), dim=1).numpy()
+
+    def predict(self, items):
+        """(n, classes) probabilities for a list of images, batched dynamically."""
+        futures = [self.submit(item) for item in items]
+        return np.stack([f.result() for f in futures]) if futures else np.zeros((0, len(CLASSES)), "float32")
+
+    @instrument.traced("inference.get_predictions")
+    def predict_loader(self, loader):
+        """(labels, predicted labels) over a DataLoader, like the notebook's get_predictions."""
+        labels, futures = [], []
+        for x, y in loader:
+            labels.append(np.asarray(y))
+            futures += [self.submit(np.asarray(xi)) for xi in x]
+        probs = np.stack([f.result() for f in futures])
+        return np.concatenate(labels), probs.argmax(axis=1)
+
+    def stats(self):
+        """Throughput and latency since the engine started."""
+        with self._lock:
+            lat = np.array(self._latencies) * 1000
+            images, batches, busy = self._images, self._batches, self._busy
+        wall = time.perf_counter() - self._started
+        return {
+            "images": images,
+            "batches": batches,
+            "mean_batch": images / batches if batches else 0.0,
+            "images_per_sec": images / wall if wall else 0.0,
+            "compute_images_per_sec": images / busy if busy else 0.0,
+            "p50_ms": float(np.percentile(lat, 50)) if len(lat) else None,
+            "p99_ms": float(np.percentile(lat, 99)) if len(lat) else None,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify images with a trained fire checkpoint")
+    parser.add_argument("checkpoint")
+    parser.add_argument("inputs", nargs="+", help="image/tile files or directories")
+    parser.add_argument("--export", choices=["torchscript", "onnx"], default=None)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-latency-ms", type=float, default=MAX_LATENCY_MS)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+    paths = []
+    for p in args.inputs:
+        paths += list_images(p) if os.path.isdir(p) else [p]
+    with Engine(args.checkpoint, max_batch=args.max_batch, max_latency_ms=args.max_latency_ms,
+                workers=args.workers, threads=args.threads, export=args.export) as engine:
+        predicted = engine.predict(paths).argmax(axis=1)
+        stats = engine.stats()
+    for i, name in enumerate(CLASSES):
+        print("{}: {}".format(name, int((predicted == i).sum())))
+    print("{images} images in {batches} batches (mean {mean_batch:.1f}), {images_per_sec:.1f} images/s, "
+          "p50 {p50_ms:.1f} ms, p99 {p99_ms:.1f} ms".format(**stats))
@@ -0,0 +1,460 @@
+"""
+Spans, counters and memory snapshots for the dashboard and the pipelines.
+
+The dashboard loaders, section renders, ingest steps and training and
+inference loops report into one process-wide registry:
+
+    span(name)          timed block; nested spans record their parent
+    traced(name)        the same, as a function decorator
+    count(name, n)      monotonically increasing counter
+    snapshot(label)     RSS, plus tracemalloc current/peak when enabled
+    watch_cache(name)   FileCache hit/miss counts
+
+Instrumentation is off unless WILDFIRE_TRACE=1 or `enable()` is called.
+Off, `span` returns a shared no-op context manager and `traced` functions
+make one flag check before calling through, so the hooks can stay in hot
+paths. WILDFIRE_PROFILE=1 (or `enable(profile=True)`) also starts a
+sampling profiler that folds the stacks of all threads every few ms.
+
+Results export as Prometheus text (for a node_exporter textfile
+collector), as a Chrome trace (chrome://tracing, Perfetto) and as folded
+stacks for flame graphs. With WILDFIRE_METRICS / WILDFIRE_TRACE_FILE set,
+`flush()` rewrites those files, which the dashboard does after every run.
+
+    WILDFIRE_TRACE=1 streamlit run streamlit_app.py
+    python -m wildfire.instrument --profile wildfire.bench --cases xgboost
+"""
+
+import argparse
+import bisect
+import functools
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from collections import deque
+
+TRACE_ENV = "WILDFIRE_TRACE"
+
+PROFILE_ENV = "WILDFIRE_PROFILE"
+
+METRICS_ENV = "WILDFIRE_METRICS"
+
+TRACE_FILE_ENV = "WILDFIRE_TRACE_FILE"
+
+METRICS_OUT = "results/bench/metrics.prom"
+
+TRACE_OUT = "results/bench/trace.json"
+
+PROFILE_OUT = "results/bench/profile.folded"
+
+PREFIX = "wildfire"
+
+# spans kept for the JSON trace; the aggregates cover every span
+MAX_EVENTS = 20_000
+
+MAX_SNAPSHOTS = 1_000
+
+# histogram bucket upper bounds, seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROFILE_INTERVAL = 0.005
+
+PROFILE_DEPTH = 64
+
+_enabled = False
+
+_lock = threading.Lock()
+
+_local = threading.local()
+
+_origin = time.perf_counter_ns()
+
+_stats = {}
+
+_counters = Counter()
+
+_events = deque(maxlen=MAX_EVENTS)
+
+_snapshots = deque(maxlen=MAX_SNAPSHOTS)
+
+_caches = {}
+
+_profiler = None
+
+
+class _Stat:
+    __slots__ = ("count", "total", "max", "errors", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "start", "parent")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _local.stack.pop()
+        seconds = (end - self.start) / 1e9
+        with _lock:
+            stat = _stats.get(self.name)
+            if stat is None:
+                stat = _stats[self.name] = _Stat()
+            stat.count += 1
+            stat.total += seconds
+            stat.max = max(stat.max, seconds)
+            stat.errors += exc_type is not None
+            stat.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+            _events.append((self.name, self.start, end, threading.get_ident(), self.parent,
+                            self.attrs, exc_type.__name__ if exc_type else None))
+        return False
+
+
+def enabled():
+    return _enabled
+
+
+def enable(memory=False, profile=False):
+    """Start recording; `memory` also starts tracemalloc, `profile` the sampling profiler."""
+    global _enabled
+    _enabled = True
+    if memory:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    if profile:
+        start_profiler()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    stop_profiler()
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _counters.clear()
+        _events.clear()
+        _snapshots.clear()
+
+
+def span(name, **attrs):
+    """Context manager timing the block under `name` (a no-op while disabled)."""
+    if not _enabled:
+        return _NULL
+    return _Span(name, attrs)
+
+
+def traced(name=None):
+    """Decorator: every call is a span, named after the function by default."""
+
+    def wrap(fn):
+        label = name or "{}.{}".format(fn.__module__.rsplit(".", 1)[-1], fn.__qualname__)
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+
+        return inner
+
+    return wrap
+
+
+def count(name, n=1):
+    if _enabled:
+        with _lock:
+            _counters[name] += n
+
+
+def _rss():
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        import resource
+
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def snapshot(label):
+    """Record process memory under `label`; returns the snapshot, or None while disabled."""
+    if not _enabled:
+        return None
+    snap = {"label": label, "ts": (time.perf_counter_ns() - _origin) / 1e3, "rss": _rss()}
+    import tracemalloc
+
+    if tracemalloc.is_tracing():
+        snap["traced_current"], snap["traced_peak"] = tracemalloc.get_traced_memory()
+    with _lock:
+        _snapshots.append(snap)
+    return snap
+
+
+def watch_cache(name, cache):
+    """Report a FileCache's hits and misses under `name`; returns the cache."""
+    _caches[name] = cache
+    return cache
+
+
+def cache_stats():
+    """{name: (hits, misses, hit rate)} of the watched caches."""
+    out = {}
+    for name, cache in _caches.items():
+        total = cache.hits + cache.misses
+        out[name] = (cache.hits, cache.misses, cache.hits / total if total else None)
+    return out
+
+
+def span_stats(prefix=""):
+    """{name: (count, total s, mean s, max s, errors)} of spans starting with `prefix`."""
+    with _lock:
+        return {name: (s.count, s.total, s.total / s.count, s.max, s.errors)
+                for name, s in sorted(_stats.items()) if name.startswith(prefix)}
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def snapshots():
+    with _lock:
+        return list(_snapshots)
+
+
+class Profiler:
+    """Samples the stacks of every other thread and counts them folded, root first."""
+
+    def __init__(self, interval=PROFILE_INTERVAL, depth=PROFILE_DEPTH):
+        self.interval = interval
+        self.depth = depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wildfire-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.depth:
+                    code = frame.f_code
+                    names.append("{}:{}".format(os.path.basename(code.co_filename), code.co_name))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def folded(self):
+        """Stacks in the `frame;frame;frame count` format flamegraph.pl and speedscope read."""
+        stacks = self.stacks.copy()
+        return "".join("{} {}\n".format(stack, n) for stack, n in stacks.most_common())
+
+
+def profiler():
+    """The running Profiler, or None."""
+    return _profiler
+
+
+def start_profiler(interval=PROFILE_INTERVAL):
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(interval).start()
+    return _profiler
+
+
+def stop_profiler():
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def _metric(name):
+    return PREFIX + "_" + "".join(c if c.isalnum() else "_" for c in name).strip("_").lower()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """All spans, counters, caches and the latest memory snapshot in Prometheus text format."""
+    lines = []
+    spans = _metric("span_seconds")
+    lines += ["# HELP {} Duration of instrumented spans.".format(spans), "# TYPE {} histogram".format(spans)]
+    with _lock:
+        stats = sorted(_stats.items())
+        counts = sorted(_counters.items())
+        last = _snapshots[-1] if _snapshots else None
+    for name, stat in stats:
+        label = 'span="{}"'.format(_label(name))
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), stat.buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append('{}_bucket{{{},le="{}"}} {}'.format(spans, label, le, cumulative))
+        lines.append("{}_sum{{{}}} {:.9f}".format(spans, label, stat.total))
+        lines.append("{}_count{{{}}} {}".format(spans, label, stat.count))
+    errors = _metric("span_errors_total")
+    lines += ["# TYPE {} counter".format(errors)]
+    lines += ['{}{{span="{}"}} {}'.format(errors, _label(name), stat.errors) for name, stat in stats]
+    for name, value in counts:
+        metric = _metric(name + "_total")
+        lines += ["# TYPE {} counter".format(metric), "{} {}".format(metric, value)]
+    caches = cache_stats()
+    for kind, i in (("hits", 0), ("misses", 1)):
+        metric = _metric("cache_{}_total".format(kind))
+        lines += ["# TYPE {} counter".format(metric)]
+        lines += ['{}{{cache="{}"}} {}'.format(metric, _label(name), v[i]) for name, v in caches.items()]
+    if last is not None:
+        for key in ("rss", "traced_current", "traced_peak"):
+            if key in last:
+                metric = _metric(key + "_bytes")
+                lines += ["# TYPE {} gauge".format(metric), "{} {}".format(metric, last[key])]
+    return "\n".join(lines) + "\n"
+
+
+def trace():
+    """Spans and memory snapshots as a Chrome trace event object."""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+        snaps = list(_snapshots)
+    out = [{"name": name, "ph": "X", "ts": (start - _origin) / 1e3, "dur": (end - start) / 1e3, "pid": pid,
+            "tid": tid, "args": dict(attrs, parent=parent, error=error) if error else dict(attrs, parent=parent)}
+           for name, start, end, tid, parent, attrs, error in events]
+    out += [{"name": "memory", "ph": "C", "ts": s["ts"], "pid": pid,
+             "args": {k: v for k, v in s.items() if k not in ("label", "ts")}} for s in snaps]
+    return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = "{}.tmp-{}".format(path, os.getpid())
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_prometheus(path=METRICS_OUT):
+    _write(path, prometheus_text())
+
+
+def write_trace(path=TRACE_OUT):
+    _write(path, json.dumps(trace()))
+
+
+def write_profile(path=PROFILE_OUT, profiler=None):
+    """Folded stacks of `profiler` (stopped), or of a snapshot of the running one."""
+    profiler = profiler or _profiler
+    if profiler is not None:
+        _write(path, profiler.folded())
+
+
+def flush():
+    """Rewrite the files named by WILDFIRE_METRICS / WILDFIRE_TRACE_FILE, if any."""
+    if not _enabled:
+        return
+    if os.environ.get(METRICS_ENV):
+        write_prometheus(os.environ[METRICS_ENV])
+    if os.environ.get(TRACE_FILE_ENV):
+        write_trace(os.environ[TRACE_FILE_ENV])
+
+
+# WILDFIRE_TRACE=memory also traces Python allocations
+if os.environ.get(TRACE_ENV, "").lower() in ("1", "true", "yes", "memory"):
+    enable(memory=os.environ[TRACE_ENV].lower() == "memory", profile=bool(os.environ.get(PROFILE_ENV)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a module with instrumentation on and export what it recorded")
+    parser.add_argument("--memory", action="store_true", help="also trace Python allocations")
+    parser.add_argument("--profile", action="store_true", help="also run the sampling profiler")
+    parser.add_argument("--interval", type=float, default=PROFILE_INTERVAL)
+    parser.add_argument("--metrics", default=METRICS_OUT)
+    parser.add_argument("--trace", default=TRACE_OUT)
+    parser.add_argument("--folded", default=PROFILE_OUT)
+    parser.add_argument("module", help="e.g. wildfire.bench")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    # the instrumented modules import wildfire.instrument, not __main__
+    from wildfire import instrument
+
+    instrument.enable(memory=args.memory)
+    if args.profile:
+        instrument.start_profiler(args.interval)
+    sys.argv = [args.module] + args.args
+    instrument.snapshot("start")
+    try:
+        with instrument.span("main/" + args.module):
+            runpy.run_module(args.module, run_name="__main__", alter_sys=True)
+    finally:
+        instrument.snapshot("end")
+        profiler = instrument.stop_profiler()
+        instrument.write_prometheus(args.metrics)
+        instrument.write_trace(args.trace)
+        if profiler is not None:
+            instrument.write_profile(args.folded, profiler)
+        print("metrics: {}\ntrace: {}{}".format(args.metrics, args.trace,
+                                                "\nprofile: {} ({} samples)".format(args.folded, profiler.samples)
+                                                if profiler else ""), file=sys.stderr)
@@ -0,0 +1,221 @@
+"""
+Band-selective, cached loader for the Landsat-8 `landsat_mini` tiles.
+
+The satellite loaders in 003_bd_pytorch_xgboost_no_distributed.ipynb open
+every 10-band GeoTIFF with rasterio and decode it again on each run, even
+though only a few bands (2, 6 and 7; the SWIR bands 6 and 7 matter most)
+are used. `BandStore` reads one band at a time, optionally through a
+window, for all tiles on a process pool and keeps each band as its own
+memory-mapped (tiles, height, width) array. Per-band mean and std are
+accumulated in the same pass. Trying another band subset only reads the
+bands that are not cached yet.
+
+    store = BandStore([(TRAIN_FIRE, 1), (TRAIN_NO_FIRE, 0)])
+    X = store.features((2, 6, 7))             # XGBoost rows
+    loader = DataLoader(store.dataset((6, 7)), batch_size=8, shuffle=True)
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from wildfire.cache import file_digests
+from wildfire.features import list_images
+
+LANDSAT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "wildfire", "landsat")
+
+BANDS = (2, 6, 7)
+
+SWIR_BANDS = (6, 7)
+
+# tiles handed to a worker at a time
+BATCH = 128
+
+TIF_EXTS = (".tif", ".tiff")
+
+
+def _window(window):
+    if window is None:
+        return None
+    from rasterio.windows import Window
+
+    return Window(*window)
+
+
+def _probe(path):
+    import rasterio
+
+    try:
+        with rasterio.open(path) as src:
+            return src.count, src.height, src.width, src.dtypes[0]
+    except Exception:
+        return None
+
+
+def _read_band(out_path, start, paths, band, window):
+    """Read `band` of each tile into rows of the memmap; returns partial stats."""
+    import rasterio
+
+    out = np.load(out_path, mmap_mode="r+")
+    total = np.zeros(2, dtype="float64")
+    for i, path in enumerate(paths, start):
+        with rasterio.open(path) as src:
+            data = src.read(band, window=_window(window))
+        out[i] = data
+        data = data.astype("float64")
+        total += (data.sum(), np.square(data).sum())
+    out.flush()
+    return total
+
+
+class BandStore:
+    """Per-band memory-mapped cache over a fixed, labelled set of tiles."""
+
+    def __init__(self, sources, cache_dir=LANDSAT_CACHE, window=None, workers=None):
+        self.window = tuple(window) if window is not None else None
+        self.workers = workers
+        paths, labels = [], []
+        for directory, label in sources:
+            found = [p for p in list_images(directory) if p.lower().endswith(TIF_EXTS)]
+            paths += found
+            labels += [label] * len(found)
+        digests = file_digests(paths, os.path.join(cache_dir, "digests.json"), workers)
+        h = hashlib.sha1(json.dumps({"window": self.window}).encode())
+        for path, label in zip(paths, labels):
+            h.update("{}:{}\n".format(digests[path], label).encode())
+        self.root = os.path.join(cache_dir, h.hexdigest())
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index(paths, labels)
+
+    def _load_index(self, paths, labels):
+        index_path = os.path.join(self.root, "tiles.json")
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                index = json.load(f)
+        else:
+            # drop tiles rasterio cannot open, as the notebook did
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                probes = list(pool.map(_probe, paths, chunksize=64))
+            ok = [i for i, p in enumerate(probes) if p is not None]
+            if not ok:
+                raise ValueError("no readable GeoTIFF tiles found")
+            count, height, width, dtype = probes[ok[0]]
+            if self.window is not None:
+                height, width = self.window[3], self.window[2]
+            index = {
+                "paths": [paths[i] for i in ok],
+                "labels": [labels[i] for i in ok],
+                "skipped": len(paths) - len(ok),
+                "count": count,
+                "shape": [height, width],
+                "dtype": dtype,
+                "stats": {},
+            }
+            self._save_index(index)
+        self.index = index
+        self.paths = index["paths"]
+        self.labels = np.asarray(index["labels"], dtype="int64")
+
+    def _save_index(self, index):
+        index_path = os.path.join(self.root, "tiles.json")
+        tmp = index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, index_path)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _band_path(self, band):
+        return os.path.join(self.root, "band_{}.npy".format(band))
+
+    def band(self, band):
+        """(tiles, height, width) memmap of one band, read from the tiles on first use."""
+        path = self._band_path(band)
+        if not os.path.exists(path):
+            self._build_band(band, path)
+        return np.load(path, mmap_mode="r")
+
+    def _build_band(self, band, path):
+        if not 1 <= band <= self.index["count"]:
+            raise ValueError("band {} out of range 1..{}".format(band, self.index["count"]))
+        tmp = path + ".tmp.npy"
+        shape = (len(self.paths),) + tuple(self.index["shape"])
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=self.index["dtype"], shape=shape)
+        del out
+        total = np.zeros(2, dtype="float64")
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_read_band, tmp, i, self.paths[i:i + BATCH], band, self.window)
+                       for i in range(0, len(self.paths), BATCH)]
+            for fut in futures:
+                total += fut.result()
+        n = float(np.prod(shape))
+        mean = total[0] / n
+        std = float(np.sqrt(max(total[1] / n - mean * mean, 0.0)))
+        os.replace(tmp, path)
+        self.index["stats"][str(band)] = {"mean": mean, "std": std}
+        self._save_index(self.index)
+
+    def stats(self, bands=BANDS):
+        """Per-band (mean, std) arrays over every pixel of every tile."""
+        for b in bands:
+            self.band(b)
+        stats = self.index["stats"]
+        mean = np.array([stats[str(b)]["mean"] for b in bands], dtype="float32")
+        std = np.array([stats[str(b)]["std"] for b in bands], dtype="float32")
+        return mean, std
+
+    def features(self, bands=BANDS, normalize=True):
+        """
+        Flattened (tiles, height * width * bands) float32 rows in the
+        reshape_as_image (HWC) order the XGBoost notebooks used, cached as
+        a memmap per band subset.
+        """
+        name = "features_{}{}.npy".format("_".join(str(b) for b in bands), "_norm" if normalize else "")
+        path = os.path.join(self.root, name)
+        if os.path.exists(path):
+            return np.load(path, mmap_mode="r")
+        mean, std = self.stats(bands)
+        h, w = self.index["shape"]
+        tmp = path + ".tmp.npy"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype="float32", shape=(len(self), h * w * len(bands)))
+        view = out.reshape(len(self), h, w, len(bands))
+        for c, b in enumerate(bands):
+            data = self.band(b)
+            for i in range(0, len(self), BATCH):
+                chunk = data[i:i + BATCH].astype("float32")
+                view[i:i + BATCH, :, :, c] = (chunk - mean[c]) / std[c] if normalize else chunk
+        out.flush()
+        del view, out
+        os.replace(tmp, path)
+        return np.load(path, mmap_mode="r")
+
+    def dataset(self, bands=BANDS, normalize=True):
+        return TileDataset(self, bands, normalize)
+
+
+class TileDataset:
+    """
+    Map-style dataset of (bands, height, width) float32 tiles and labels,
+    usable directly with torch.utils.data.DataLoader.
+    """
+
+    def __init__(self, store, bands=BANDS, normalize=True, transform=None):
+        self.labels = store.labels
+        self.bands = [store.band(b) for b in bands]
+        self.mean, self.std = store.stats(bands) if normalize else (None, None)
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, i):
+        x = np.stack([b[i] for b in self.bands]).astype("float32")
+        if self.mean is not None:
+            x = (x - self.mean[:, None, None]) / self.std[:, None, None]
+        if self.transform is not None:
+            x = self.transform(x)
+        return x, self.labels[i]
@@ -0,0 +1,398 @@
+"""
+Load test for concurrent dashboard sessions.
+
+Starts `streamlit run streamlit_app.py` on a local port and drives N
+headless sessions against it at once. Each session speaks the browser's
+WebSocket protocol: it asks for a script run, reads the protobuf messages
+back until the run finishes, then replays a scripted list of widget
+changes (the sidebar section, `Pick a model` on the results page, ...)
+as the browser would. For each step the report has p50/p95/p99 latency
+from sending the change to the end of the rerun. It also has the
+server's RSS (idle, peak, and per session above idle) and failures:
+port conflicts, a server that never became healthy, exceptions shown in
+the page, timeouts and dropped connections.
+
+A fresh server is started for each session count. The report is JSON
+with a fixed layout and rounded numbers, so two versions can be diffed
+or compared with --compare:
+
+    python -m wildfire.loadtest --sessions 1 4 16 --repeats 3
+    python -m wildfire.loadtest --sessions 8 --step "Section=Results" --step "Pick a model=Resnet: Ground"
+    python -m wildfire.loadtest --sessions 1 4 16 --compare results/bench/load.json --out results/bench/load-new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from wildfire.bench import metadata
+
+APP = "streamlit_app.py"
+
+LOAD_OUT = "results/bench/load.json"
+
+PORT = 8599
+
+SESSIONS = (1, 4, 16)
+
+REPEATS = 2
+
+# (widget label, option) changes replayed by every session, after the first run
+SCENARIO = (
+    ("Section", "Results"),
+    ("Pick a model", "Densenet: Ground"),
+    ("Pick a model", "Resnet: Ground"),
+    ("Pick a model", "Densenet: Aerial"),
+    ("Pick a model", "Animation"),
+    ("Dataset", "ground"),
+)
+
+STARTUP_TIMEOUT = 60.0
+
+STEP_TIMEOUT = 120.0
+
+RSS_INTERVAL = 0.25
+
+PERCENTILES = (50, 95, 99)
+
+# Streamlit >= 1.18 serves under /_stcore; older releases at the root
+STREAM_PATHS = ("/_stcore/stream", "/stream")
+
+HEALTH_PATHS = ("/_stcore/health", "/healthz")
+
+# errors kept verbatim per session count
+MAX_ERRORS = 5
+
+_PORT_CONFLICT = re.compile(r"port \d+ is (already )?in use|address already in use", re.IGNORECASE)
+
+
+class LoadTestError(Exception):
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+
+def port_free(port, host="127.0.0.1"):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # as the server binds: a previous run's connections in TIME_WAIT do not count
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+def _rss(pid):
+    """RSS of a process and its children, in bytes."""
+    import psutil
+
+    try:
+        proc = psutil.Process(pid)
+        procs = [proc] + proc.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0
+    total = 0
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+class Server:
+    """`streamlit run` in a subprocess, with its log captured and its peak RSS sampled."""
+
+    def __init__(self, app=APP, port=PORT, root="."):
+        self.app = app
+        self.port = port
+        self.root = root
+        self.proc = None
+        self.peak = 0
+        self._log = tempfile.TemporaryFile(mode="w+")
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, timeout=STARTUP_TIMEOUT):
+        if not port_free(self.port):
+            raise LoadTestError("port_conflict", "port {} is already in use".format(self.port))
+        self.proc = subprocess.Popen([sys.executable, "-m", "streamlit", "run", self.app,
+                                      "--server.headless", "true", "--server.port", str(self.port),
+                                      "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+                                     cwd=self.root, stdout=self._log, stderr=subprocess.STDOUT)
+        start = time.perf_counter()
+        while time.perf_counter() - start < timeout:
+            if self.proc.poll() is not None:
+                log = self.log()
+                kind = "port_conflict" if _PORT_CONFLICT.search(log) else "startup"
+                raise LoadTestError(kind, "server exited with {}: {}".format(self.proc.returncode, log[-2000:]))
+            if self.health_path() is not None:
+                self.startup_s = time.perf_counter() - start
+                self._sampler.start()
+                return self
+            time.sleep(0.2)
+        raise LoadTestError("startup", "server not healthy after {:.0f}s".format(timeout))
+
+    def health_path(self):
+        for path in HEALTH_PATHS:
+            try:
+                with urllib.request.urlopen("http://127.0.0.1:{}{}".format(self.port, path), timeout=1) as r:
+                    if r.status == 200:
+                        return path
+            except OSError:
+                pass
+        return None
+
+    def rss(self):
+        return _rss(self.proc.pid)
+
+    def _sample(self):
+        while not self._stop.wait(RSS_INTERVAL):
+            self.peak = max(self.peak, self.rss())
+
+    def log(self):
+        self._log.flush()
+        self._log.seek(0)
+        return self._log.read()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler.is_alive():
+            self._sampler.join()
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+
+def _by_value():
+    """Newer Streamlit releases send radio/selectbox choices as strings, older ones as indexes."""
+    from streamlit.proto.Radio_pb2 import Radio
+
+    return "raw_value" in Radio.DESCRIPTOR.fields_by_name
+
+
+class Session:
+    """One headless browser session: script runs driven over the WebSocket."""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = None
+        self.widgets = {}
+        self.states = {}
+        self.by_value = _by_value()
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        error = None
+        for path in STREAM_PATHS:
+            try:
+                self.conn = await websocket_connect("ws://127.0.0.1:{}{}".format(self.port, path),
+                                                    subprotocols=["streamlit"])
+                return self
+            except Exception as e:
+                error = e
+        raise LoadTestError("connection", "could not open a session: {!r}".format(error))
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+    async def rerun(self, timeout=STEP_TIMEOUT):
+        """Request a script run with the current widget states; (seconds, [exceptions shown])."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back = BackMsg()
+        back.rerun_script.query_string = ""
+        for widget_id, value in self.states.items():
+            state = back.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if isinstance(value, str):
+                state.string_value = value
+            else:
+                state.int_value = value
+        start = time.perf_counter()
+        await self.conn.write_message(back.SerializeToString(), binary=True)
+        errors = []
+        while True:
+            remaining = timeout - (time.perf_counter() - start)
+            try:
+                data = await asyncio.wait_for(self.conn.read_message(), max(remaining, 0))
+            except asyncio.TimeoutError:
+                raise LoadTestError("timeout", "no end of run after {:.0f}s".format(timeout))
+            if data is None:
+                raise LoadTestError("connection", "server closed the session")
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype in ("radio", "selectbox"):
+                    widget = getattr(element, etype)
+                    self.widgets[widget.label] = (widget.id, list(widget.options))
+                elif etype == "exception":
+                    errors.append("{}: {}".format(element.exception.type, element.exception.message))
+            elif kind == "session_event" and msg.session_event.WhichOneof("type") == "script_compilation_exception":
+                exc = msg.session_event.script_compilation_exception
+                errors.append("{}: {}".format(exc.type, exc.message))
+            elif kind == "script_finished":
+                status = ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)
+                if status != "FINISHED_EARLY_FOR_RERUN":
+                    return time.perf_counter() - start, errors
+
+    async def set(self, label, option, timeout=STEP_TIMEOUT):
+        """Pick `option` in the radio or selectbox labelled `label`, then rerun."""
+        if label not in self.widgets:
+            raise LoadTestError("missing_widget", "no widget labelled {!r} on the page".format(label))
+        widget_id, options = self.widgets[label]
+        if option not in options:
+            raise LoadTestError("missing_widget", "{!r} has no option {!r}".format(label, option))
+        self.states[widget_id] = option if self.by_value else options.index(option)
+        return await self.rerun(timeout)
+
+
+async def _drive(port, scenario, repeats, timings, failures, errors):
+    session = Session(port)
+    steps = [("open", None)] + [("{}={}".format(label, option), (label, option))
+                                for _ in range(repeats) for label, option in scenario]
+    try:
+        await session.connect()
+        for name, change in steps:
+            seconds, shown = await (session.rerun() if change is None else session.set(*change))
+            timings.setdefault(name, []).append(seconds)
+            for error in shown:
+                failures["exception"] = failures.get("exception", 0) + 1
+                errors.append(error)
+    except LoadTestError as e:
+        failures[e.kind] = failures.get(e.kind, 0) + 1
+        errors.append(str(e))
+    finally:
+        session.close()
+
+
+def _percentiles(values):
+    ms = np.asarray(values) * 1000
+    row = {"count": len(ms)}
+    row.update({"p{}_ms".format(p): round(float(np.percentile(ms, p)), 1) for p in PERCENTILES})
+    row["max_ms"] = round(float(ms.max()), 1)
+    return row
+
+
+def run_level(sessions, scenario=SCENARIO, repeats=REPEATS, app=APP, port=PORT, root="."):
+    """Start a server, run `sessions` concurrent sessions through the scenario, and summarize."""
+    timings, failures, errors = {}, {}, []
+    level = {"sessions": sessions}
+    try:
+        with Server(app, port, root) as server:
+            idle = server.rss()
+
+            async def drive_all():
+                await asyncio.gather(*[_drive(port, scenario, repeats, timings, failures, errors)
+                                       for _ in range(sessions)])
+
+            start = time.perf_counter()
+            asyncio.run(drive_all())
+            level["wall_s"] = round(time.perf_counter() - start, 2)
+            level["startup_s"] = round(server.startup_s, 2)
+            server.peak = max(server.peak, server.rss())
+            level["rss_mb"] = {"idle": round(idle / 2 ** 20, 1), "peak": round(server.peak / 2 ** 20, 1),
+                               "per_session": round((server.peak - idle) / 2 ** 20 / sessions, 2)}
+            conflicts = len(_PORT_CONFLICT.findall(server.log()))
+            if conflicts:
+                failures["port_conflict"] = failures.get("port_conflict", 0) + conflicts
+    except LoadTestError as e:
+        failures[e.kind] = failures.get(e.kind, 0) + 1
+        errors.append(str(e))
+    order = ["open"] + ["{}={}".format(label, option) for label, option in scenario]
+    level["steps"] = [dict(step=name, **_percentiles(timings[name])) for name in order if name in timings]
+    level["failures"] = dict(sorted(failures.items()))
+    level["errors"] = sorted(set(errors))[:MAX_ERRORS]
+    return level
+
+
+def load_test(sessions=SESSIONS, scenario=SCENARIO, repeats=REPEATS, app=APP, port=PORT, root="."):
+    params = {"app": app, "sessions": list(sessions), "repeats": repeats, "scenario": [list(s) for s in scenario]}
+    meta = metadata(params)
+    meta["libraries"]["streamlit"] = _streamlit_version()
+    return {"meta": meta, "levels": [run_level(n, scenario, repeats, app, port, root) for n in sessions]}
+
+
+def _streamlit_version():
+    import streamlit
+
+    return streamlit.__version__
+
+
+def compare(report, baseline):
+    """p50/p95 per (sessions, step) against a previous report."""
+    base = {(level["sessions"], s["step"]): s for level in baseline["levels"] for s in level["steps"]}
+    rows = []
+    for level in report["levels"]:
+        for s in level["steps"]:
+            b = base.get((level["sessions"], s["step"]), {})
+            rows.append({"sessions": level["sessions"], "step": s["step"],
+                         "p50_ms": s["p50_ms"], "p50_before": b.get("p50_ms"),
+                         "p95_ms": s["p95_ms"], "p95_before": b.get("p95_ms"),
+                         "p95_ratio": s["p95_ms"] / b["p95_ms"] if b.get("p95_ms") else None})
+    return pd.DataFrame(rows)
+
+
+def _step(text):
+    label, _, option = text.partition("=")
+    if not option:
+        raise argparse.ArgumentTypeError("expected LABEL=OPTION, got {!r}".format(text))
+    return label, option
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive concurrent headless sessions against the dashboard")
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--root", default=".", help="directory to run the app from")
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(SESSIONS))
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="passes through the scenario per session")
+    parser.add_argument("--step", type=_step, action="append", default=None, metavar="LABEL=OPTION",
+                        help="widget change to replay (repeatable); defaults to a tour of the results page")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--out", default=LOAD_OUT)
+    parser.add_argument("--compare", default=None, help="earlier report to compare against")
+    args = parser.parse_args()
+    report = load_test(args.sessions, args.step or SCENARIO, args.repeats, args.app, args.port, args.root)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=1)
+        f.write("\n")
+    for level in report["levels"]:
+        print("{} sessions: rss {} failures {}".format(level["sessions"], level.get("rss_mb"), level["failures"]))
+        if level["steps"]:
+            print(pd.DataFrame(level["steps"]).to_string(index=False))
+        for error in level["errors"]:
+            print("  " + error[:200])
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(report, json.load(f)).to_string(index=False, float_format="{:.2f}".format))
@@ -0,0 +1,463 @@
+"""
+Burned area per state and year, and simplified fire perimeters for maps.
+
+006_bd_proj_dennis.ipynb sums `gisacres` from the Historic GeoMAC
+perimeter CSV (2000-2018) and `poly_Acres_AutoCalc` from the WFIGS
+perimeters (2020-) per state and year through Spark, divides by the
+state areas in stateAreas.csv, and the "Percent of State Burned" maps
+(media/image12.jpg, image13.jpg) are two frames of that cube frozen as
+images. `build_cube` reads each CSV once, in chunks, into the same
+state x year cube of fires, acres and percent of state area:
+
+    <root>/cube.parquet
+
+`build_shapes` streams the perimeter polygons out of the GeoJSON
+downloads of the same datasets and writes them once per zoom level,
+simplified (Douglas-Peucker) to about a pixel at that level and rounded
+to matching precision. Each (level, year) file keeps the largest fires
+that fit in its byte budget, so what a map sends to the browser is
+bounded whatever the year:
+
+    <root>/shapes/level=<n>/<year>.json
+    <root>/shapes/manifest.json
+
+    python -m wildfire.perimeters cube Historic_GeoMAC_Perimeters_Combined_2000-2018.csv WFIGS_-_Wildland_Fire_Perimeters_Full_History.csv
+    python -m wildfire.perimeters shapes Historic_GeoMAC_Perimeters_Combined_2000-2018.geojson WFIGS_-_Wildland_Fire_Perimeters_Full_History.geojson
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from wildfire import instrument
+from wildfire.cache import FileCache
+
+PERIMETERS_ROOT = "results/perimeters"
+
+CUBE = "cube.parquet"
+
+MANIFEST = "manifest.json"
+
+CHUNKSIZE = 200_000
+
+# columns of the two perimeter datasets, by role
+SCHEMAS = {
+    "geomac": {"state": "state", "acres": "gisacres", "year": "fireyear", "name": "incidentname"},
+    "wfigs": {"state": "irwin_POOState", "acres": "poly_Acres_AutoCalc", "year": "irwin_ContainmentDateTime",
+              "name": "poly_IncidentName", "type": "irwin_IncidentTypeCategory"},
+}
+
+WILDFIRE = "WF"
+
+# total area (land and water) in square miles, 2010 Census
+STATE_SQMI = {
+    "AK": 665384, "AL": 52420, "AR": 53179, "AZ": 113990, "CA": 163695, "CO": 104094, "CT": 5543,
+    "DC": 68, "DE": 2489, "FL": 65758, "GA": 59425, "HI": 10932, "IA": 56273, "ID": 83569,
+    "IL": 57914, "IN": 36420, "KS": 82278, "KY": 40408, "LA": 52378, "MA": 10554, "MD": 12406,
+    "ME": 35380, "MI": 96714, "MN": 86936, "MO": 69707, "MS": 48432, "MT": 147040, "NC": 53819,
+    "ND": 70698, "NE": 77348, "NH": 9349, "NJ": 8723, "NM": 121590, "NV": 110572, "NY": 54555,
+    "OH": 44826, "OK": 69899, "OR": 98379, "PA": 46054, "PR": 5325, "RI": 1545, "SC": 32020,
+    "SD": 77116, "TN": 42144, "TX": 268596, "UT": 84897, "VA": 42775, "VT": 9616, "WA": 71298,
+    "WI": 65496, "WV": 24230, "WY": 97813,
+}
+
+ACRES_PER_SQMI = 640
+
+# simplification tolerance in degrees at level 0 (the whole US across a
+# ~800px map), halved at every finer level
+BASE_TOLERANCE = 0.07
+
+LEVELS = 4
+
+# bytes per (level, year) file at level 0, doubled at every finer level
+BASE_BYTES = 512 << 10
+
+MAP_WIDTH_PX = 800
+
+READ_BYTES = 1 << 20
+
+# features whose properties are parsed together
+BATCH = 5000
+
+CACHE = instrument.watch_cache("perimeters", FileCache(maxsize=32, hash_contents=False))
+
+
+def tolerance(level):
+    return BASE_TOLERANCE / (1 << level)
+
+
+def max_bytes(level):
+    return BASE_BYTES << level
+
+
+def decimals(level):
+    """Coordinate precision that keeps rounding under a quarter of the tolerance."""
+    return max(0, math.ceil(math.log10(4 / tolerance(level))))
+
+
+def state_acres(path=None):
+    """State areas in acres, from the built-in table or a stateAreas.csv (code, acres; no header)."""
+    if path is None:
+        return pd.Series({state: sqmi * ACRES_PER_SQMI for state, sqmi in STATE_SQMI.items()}, dtype="float64")
+    areas = pd.read_csv(path, header=None, names=["state", "acres"])
+    return areas.set_index(areas["state"].str.strip().str.upper())["acres"].astype("float64")
+
+
+def _schema(columns):
+    for name, schema in SCHEMAS.items():
+        if schema["acres"] in columns:
+            return schema
+    raise ValueError("not a GeoMAC or WFIGS perimeter file (no gisacres or poly_Acres_AutoCalc column)")
+
+
+def _state(values):
+    # GeoMAC has "CA", WFIGS "US-CA"
+    return values.astype(str).str.strip().str.upper().str.split("-").str[-1]
+
+
+def _year(values):
+    if pd.api.types.is_numeric_dtype(values) and values.max() > 1e10:
+        # epoch milliseconds, as in the GeoJSON downloads
+        return pd.to_datetime(values, unit="ms", errors="coerce").dt.year
+    return pd.to_numeric(values.astype(str).str.slice(0, 4), errors="coerce")
+
+
+def records(frame, schema):
+    """Wildfire perimeters as (year, state, acres, name) rows."""
+    if "type" in schema:
+        frame = frame[frame[schema["type"]] == WILDFIRE]
+    out = pd.DataFrame({
+        "year": _year(frame[schema["year"]]),
+        "state": _state(frame[schema["state"]]),
+        "acres": pd.to_numeric(frame[schema["acres"]], errors="coerce").fillna(0.0),
+        "name": frame[schema["name"]] if schema["name"] in frame else "",
+    })
+    out = out[out["year"].notna() & out["state"].isin(STATE_SQMI)]
+    return out.astype({"year": "int16"})
+
+
+def _cube_file(path, chunksize=CHUNKSIZE):
+    schema = _schema(pd.read_csv(path, nrows=0).columns)
+    usecols = [c for role, c in schema.items() if role != "name"]
+    parts = []
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, low_memory=False):
+        rows = records(chunk, schema)
+        parts.append(rows.groupby(["year", "state"]).agg(fires=("acres", "size"), acres=("acres", "sum")))
+    if not parts:
+        return pd.DataFrame(columns=["fires", "acres"])
+    return pd.concat(parts).groupby(level=["year", "state"]).sum()
+
+
+def build_cube(paths, root=PERIMETERS_ROOT, areas=None, chunksize=CHUNKSIZE):
+    """
+    State x year cube from the perimeter CSVs. Where sources overlap, a year
+    comes from the first source that has it (GeoMAC ends in 2018, WFIGS
+    perimeters start in earnest in 2020).
+    """
+    parts = []
+    covered = set()
+    for path in paths:
+        cube = _cube_file(path, chunksize)
+        years = set(cube.index.get_level_values("year"))
+        parts.append(cube[~cube.index.get_level_values("year").isin(covered)])
+        covered |= years
+    cube = pd.concat(parts).sort_index().reset_index()
+    area = cube["state"].map(state_acres(areas))
+    cube = cube.assign(fires=cube["fires"].astype("int64"), percent=100.0 * cube["acres"] / area)
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, CUBE)
+    tmp = path + ".tmp"
+    cube.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return cube
+
+
+def load_cube(path):
+    return pd.read_parquet(path)
+
+
+def features(path, read_bytes=READ_BYTES):
+    """Features of a GeoJSON FeatureCollection, decoded one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        while '"features"' not in buf:
+            more = f.read(read_bytes)
+            if not more:
+                return
+            buf += more
+        pos = buf.index("[", buf.index('"features"')) + 1
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                feature, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(read_bytes)
+                eof = not more
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield feature
+            pos = end
+            if pos > read_bytes:
+                buf, pos = buf[pos:], 0
+
+
+def simplify(ring, tol):
+    """Douglas-Peucker on an (n, 2) array, keeping both end points."""
+    n = len(ring)
+    if n < 3:
+        return ring
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a, b = ring[first], ring[last]
+        seg = b - a
+        pts = ring[first + 1:last] - a
+        length = math.hypot(*seg)
+        if length == 0.0:
+            dist = np.hypot(pts[:, 0], pts[:, 1])
+        else:
+            dist = np.abs(seg[0] * pts[:, 1] - seg[1] * pts[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tol:
+            mid = first + 1 + i
+            keep[mid] = True
+            stack.append((first, mid))
+            stack.append((mid, last))
+    return ring[keep]
+
+
+def _polygons(geometry):
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def polygon_arrays(geometry):
+    """Rings of a Polygon or MultiPolygon as (n, 2) arrays, grouped by polygon."""
+    return [[np.asarray(ring, dtype="float64")[:, :2] for ring in polygon] for polygon in _polygons(geometry)]
+
+
+def simplify_geometry(polygons, level):
+    """Geometry from `polygon_arrays` simplified and rounded for `level`, or None once nothing is left."""
+    tol, places = tolerance(level), decimals(level)
+    out = []
+    for polygon in polygons:
+        rings = []
+        for ring in polygon:
+            ring = np.round(simplify(ring, tol), places)
+            ring = ring[np.r_[True, np.any(np.diff(ring, axis=0) != 0, axis=1)]]
+            if len(ring) >= 4:
+                rings.append(ring.tolist())
+            elif not rings:
+                break
+        if rings:
+            out.append(rings)
+    if not out:
+        return None
+    if len(out) == 1:
+        return {"type": "Polygon", "coordinates": out[0]}
+    return {"type": "MultiPolygon", "coordinates": out}
+
+
+class _Budget:
+    """Largest fires of one (level, year) that fit in a byte budget."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.size = 0
+        self.seen = 0
+        self.heap = []
+
+    def add(self, acres, text):
+        self.seen += 1
+        heapq.heappush(self.heap, (acres, self.seen, text))
+        self.size += len(text) + 1
+        while self.size > self.limit and self.heap:
+            self.size -= len(heapq.heappop(self.heap)[2]) + 1
+
+    def dump(self, path):
+        body = [text for _, _, text in sorted(self.heap, reverse=True)]
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write('{"type":"FeatureCollection","features":[' + ",".join(body) + "]}")
+        os.replace(tmp, path)
+        return {"features": len(body), "dropped": self.seen - len(body), "bytes": os.path.getsize(path)}
+
+
+def _batches(path, size=BATCH):
+    batch = []
+    for feature in features(path):
+        batch.append(feature)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_shapes(paths, root=PERIMETERS_ROOT, levels=LEVELS, years=None):
+    """
+    Simplified perimeters per level and year from the GeoJSON downloads, in
+    one pass over each file. Returns the manifest.
+    """
+    out_dir = os.path.join(root, "shapes")
+    budgets = {}
+    covered = set()
+    for path in paths:
+        source = os.path.basename(path)
+        found = set()
+        seen = 0
+        for batch in _batches(path):
+            props = pd.DataFrame([feature.get("properties") or {} for feature in batch])
+            rows = records(props, _schema(props.columns))
+            keep = ~rows["year"].isin(covered)
+            if years is not None:
+                keep &= rows["year"].between(*years)
+            rows = rows[keep]
+            found.update(rows["year"].tolist())
+            for i, row in zip(rows.index, rows.itertuples(index=False)):
+                properties = {"name": row.name.strip().title() if isinstance(row.name, str) else "",
+                              "state": row.state, "acres": round(float(row.acres), 1)}
+                polygons = polygon_arrays(batch[i].get("geometry"))
+                for level in range(levels):
+                    geometry = simplify_geometry(polygons, level)
+                    if geometry is None:
+                        continue
+                    text = json.dumps({"type": "Feature", "id": "{}-{}".format(source, seen + i),
+                                       "properties": properties, "geometry": geometry}, separators=(",", ":"))
+                    budgets.setdefault((level, int(row.year)), _Budget(max_bytes(level))).add(row.acres, text)
+            seen += len(batch)
+        covered |= found
+    tmp = out_dir + ".tmp-{}".format(os.getpid())
+    if os.path.isdir(tmp):
+        shutil.rmtree(tmp)
+    manifest = {"levels": [{"level": level, "tolerance": tolerance(level), "decimals": decimals(level),
+                            "max_bytes": max_bytes(level)} for level in range(levels)],
+                "years": {}, "built": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    for (level, year), budget in sorted(budgets.items()):
+        level_dir = os.path.join(tmp, "level={}".format(level))
+        os.makedirs(level_dir, exist_ok=True)
+        stats = budget.dump(os.path.join(level_dir, "{}.json".format(year)))
+        manifest["years"].setdefault(str(year), {})[str(level)] = stats
+    os.makedirs(tmp, exist_ok=True)
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+    return manifest
+
+
+def load_manifest(root=PERIMETERS_ROOT):
+    return CACHE.get(os.path.join(root, "shapes", MANIFEST), _read_json)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def shape_years(root=PERIMETERS_ROOT):
+    return sorted(int(year) for year in load_manifest(root)["years"])
+
+
+def bounds(collection):
+    """(west, south, east, north) of a FeatureCollection, or None if it is empty."""
+    points = [np.asarray(ring)
+              for feature in collection["features"]
+              for polygon in _polygons(feature["geometry"])
+              for ring in polygon[:1]]
+    if not points:
+        return None
+    points = np.concatenate(points)
+    return tuple(float(v) for v in (*points.min(axis=0), *points.max(axis=0)))
+
+
+def pick_level(bbox, levels=LEVELS, width_px=MAP_WIDTH_PX):
+    """Coarsest level whose tolerance is still under a pixel of a map showing bbox."""
+    deg_per_px = max(bbox[2] - bbox[0], bbox[3] - bbox[1]) / width_px
+    for level in range(levels):
+        if tolerance(level) <= deg_per_px:
+            return level
+    return levels - 1
+
+
+@instrument.traced()
+def shapes(year, states=None, level=None, root=PERIMETERS_ROOT):
+    """
+    Perimeters of one year as a FeatureCollection, optionally for some
+    states only. Without a level, the coarsest level holding any of the
+    selection picks where it is, then the level for its extent is read.
+    Fires too small for a coarse level are dropped from it, so a selection
+    of small fires only shows up from a finer level on.
+    """
+    levels = len(load_manifest(root)["levels"])
+    if level is not None:
+        return _level_shapes(root, level, year, states)
+    for first in range(levels):
+        coarse = _level_shapes(root, first, year, states)
+        extent = bounds(coarse)
+        if extent is not None:
+            break
+    else:
+        return coarse
+    level = max(first, pick_level(extent, levels))
+    return coarse if level == first else _level_shapes(root, level, year, states)
+
+
+def _level_shapes(root, level, year, states):
+    path = os.path.join(root, "shapes", "level={}".format(level), "{}.json".format(year))
+    if not os.path.exists(path):
+        return {"type": "FeatureCollection", "features": []}
+    collection = CACHE.get(path, _read_json)
+    if states is None:
+        return collection
+    return {"type": "FeatureCollection",
+            "features": [f for f in collection["features"] if f["properties"]["state"] in states]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the burned-area cube and simplified fire perimeters")
+    commands = parser.add_subparsers(dest="command", required=True)
+    cube_cmd = commands.add_parser("cube", help="state x year burned area from the perimeter CSVs")
+    cube_cmd.add_argument("csv", nargs="+", help="GeoMAC first, then WFIGS")
+    cube_cmd.add_argument("--areas", default=None, help="stateAreas.csv (code, acres); default: 2010 Census areas")
+    shapes_cmd = commands.add_parser("shapes", help="simplified perimeters from the GeoJSON downloads")
+    shapes_cmd.add_argument("geojson", nargs="+", help="GeoMAC first, then WFIGS")
+    shapes_cmd.add_argument("--levels", type=int, default=LEVELS)
+    shapes_cmd.add_argument("--years", type=int, nargs=2, default=None, metavar=("FIRST", "LAST"))
+    for command in (cube_cmd, shapes_cmd):
+        command.add_argument("--root", default=PERIMETERS_ROOT)
+    args = parser.parse_args()
+    if args.command == "cube":
+        cube = build_cube(args.csv, args.root, args.areas)
+        print("{} state-years, {}-{}".format(len(cube), cube["year"].min(), cube["year"].max()))
+    else:
+        manifest = build_shapes(args.geojson, args.root, args.levels, args.years)
+        for level in manifest["levels"]:
+            sizes = [y[str(level["level"])]["bytes"] for y in manifest["years"].values() if str(level["level"]) in y]
+            print("level {}: tolerance {:.4f} deg, {} years, largest file {} bytes".format(
+                level["level"], level["tolerance"], len(sizes), max(sizes, default=0)))
@@ -0,0 +1,187 @@
+"""
+Incrementally maintained FIRMS rollups.
+
+The store keeps the aggregate cube from `wildfire.firms` split by year,
+with one partial per (year, source file):
+
+    <store>/manifest.json                 sources already ingested, by path
+    <store>/year=2021/<source>.parquet    that source's cells for 2021
+    <store>/year=2021/_merged.parquet     all sources for 2021, merged
+
+Ingesting a delta file (e.g. a daily FIRMS NRT download) aggregates only
+that file and re-merges only the years it touches, so refresh cost
+scales with the delta rather than with the 20-year archive. A source is
+identified by its path and remembered with its content hash: ingesting an
+unchanged file again is a no-op, and a file that grew or was rewritten in
+place replaces its earlier partials instead of being counted twice.
+Different files are assumed to hold different fires.
+
+    python -m wildfire.rollups results/firms/rollups fire_nrt_M-C61_*.csv
+"""
+
+import argparse
+import glob
+import json
+import hashlib
+import os
+
+import pandas as pd
+
+from wildfire import firms
+from wildfire.cache import file_digest
+
+MERGED = "_merged.parquet"
+
+MANIFEST = "manifest.json"
+
+
+def _year_dir(store, year):
+    return os.path.join(store, "year={}".format(int(year)))
+
+
+def _write(df, path):
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def read_manifest(store):
+    path = os.path.join(store, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(store, manifest):
+    path = os.path.join(store, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _remerge(store, year):
+    year_dir = _year_dir(store, year)
+    parts = [p for p in glob.glob(os.path.join(year_dir, "*.parquet")) if os.path.basename(p) != MERGED]
+    if not parts:
+        # the only source for the year was replaced by one without it
+        if os.path.exists(os.path.join(year_dir, MERGED)):
+            os.remove(os.path.join(year_dir, MERGED))
+        return
+    merged = firms.merge([pd.read_parquet(p) for p in parts])
+    _write(merged, os.path.join(year_dir, MERGED))
+
+
+def _source_name(path):
+    return hashlib.sha1(path.encode()).hexdigest()
+
+
+def _earlier(manifest, path):
+    """Manifest keys of earlier ingests of path (older stores keyed sources by digest)."""
+    return [key for key, entry in manifest.items() if key == path or entry.get("path") == path]
+
+
+def ingest(store, path, workers=None):
+    """
+    Add one FIRMS CSV to the store. Returns the years that were refreshed,
+    or an empty list when the file was ingested before with the same
+    contents. A changed file replaces what it contributed before.
+    """
+    os.makedirs(store, exist_ok=True)
+    manifest = read_manifest(store)
+    path = os.path.abspath(path)
+    digest = file_digest(path)
+    earlier = _earlier(manifest, path)
+    if any(manifest[key].get("digest", key) == digest for key in earlier):
+        return []
+    cube = firms.aggregate_file(path, workers)
+    name = _source_name(path)
+    years = sorted(int(y) for y in cube["year"].unique())
+    stale = set()
+    for key in earlier:
+        entry = manifest.pop(key)
+        for year in entry["years"]:
+            part = os.path.join(_year_dir(store, year), entry.get("partial", key) + ".parquet")
+            if os.path.exists(part):
+                os.remove(part)
+            stale.add(year)
+    for year in years:
+        os.makedirs(_year_dir(store, year), exist_ok=True)
+        _write(cube[cube["year"] == year], os.path.join(_year_dir(store, year), name + ".parquet"))
+    refreshed = sorted(stale | set(years))
+    for year in refreshed:
+        _remerge(store, year)
+    st = os.stat(path)
+    manifest[path] = {
+        "digest": digest,
+        "partial": name,
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "years": years,
+        "fires": int(cube["count"].sum()),
+    }
+    _write_manifest(store, manifest)
+    return refreshed
+
+
+def stored_years(store):
+    return sorted(int(os.path.basename(d).split("=")[1])
+                  for d in glob.glob(os.path.join(store, "year=*"))
+                  if os.path.exists(os.path.join(d, MERGED)))
+
+
+def load(store, years=None):
+    """Merged cube for the given years (all years by default)."""
+    wanted = stored_years(store) if years is None else years
+    parts = [pd.read_parquet(os.path.join(_year_dir(store, y), MERGED))
+             for y in wanted if os.path.exists(os.path.join(_year_dir(store, y), MERGED))]
+    return firms.merge(parts)
+
+
+def load_manifest(path):
+    """Whole-store cube, for FileCache keyed on the manifest file."""
+    return load(os.path.dirname(path))
+
+
+def yoy(cube, exclude=()):
+    """
+    Yearly fire count with FRP/brightness sums and means, plus the
+    year-over-year change in count, as in the notebook's lag() window.
+    """
+    cube = cube[~cube["year"].isin(exclude)] if exclude else cube
+    out = cube.groupby("year")[["count", "frp_sum", "brightness_sum"]].sum().sort_index()
+    out["frp"] = out["frp_sum"] / out["count"]
+    out["brightness"] = out["brightness_sum"] / out["count"]
+    out["pyCount"] = out["count"].shift(1)
+    out["yearlyChange"] = out["count"] - out["pyCount"]
+    out["yearlyInc"] = out["yearlyChange"] / out["pyCount"]
+    return out.reset_index()
+
+
+def year_to_date(cube):
+    """
+    Fire count of the latest year and of the same months one year earlier,
+    as (year, months, count, prior count). The prior count is None when the
+    cube has no data for the earlier year.
+    """
+    year = int(cube["year"].max())
+    months = int(cube.loc[cube["year"] == year, "month"].max())
+    upto = cube[cube["month"] <= months]
+    count = int(upto.loc[upto["year"] == year, "count"].sum())
+    prior = upto.loc[upto["year"] == year - 1, "count"]
+    return year, months, count, int(prior.sum()) if len(prior) else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest FIRMS CSV deltas into the incremental rollup store")
+    parser.add_argument("store")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    for path in args.files:
+        refreshed = ingest(args.store, path, args.workers)
+        if refreshed:
+            print("{}: refreshed {}".format(path, ", ".join(str(y) for y in refreshed)))
+        else:
+            print("{}: already ingested".format(path))
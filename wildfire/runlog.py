@@ -0,0 +1,340 @@
+"""
+Non-blocking, offline-first run logger.
+
+`save_results` in the notebooks calls `collection.insert_one(results)`
+synchronously, so every run (and any per-epoch logging) waits on a round
+trip to MongoDB Atlas, and a run finished while the network is down is
+lost. `RunLogger.log` only puts the record on a queue. A background
+thread appends queued records to a local write-ahead JSONL file, then
+bulk-writes them from the file to a sink in batches, retrying with
+backoff until the sink accepts them. Records carry an `_id` (generated
+when missing) and every sink ignores ids it already has, so replaying
+the write-ahead log after a crash or an outage never duplicates a run.
+
+    with RunLogger("results/runlog/wal.jsonl", SQLiteSink("results/runlog/runs.db")) as runlog:
+        for epoch in range(epochs):
+            runlog.log_metric(run_id, "val_acc", acc, step=epoch)
+        runlog.log(results)
+
+    python -m wildfire.runlog results/runlog/wal.jsonl --sqlite results/runlog/runs.db
+
+`StoreSink` appends run records to the Parquet experiment store
+(`wildfire.experiments`) that the dashboard's learning curves read.
+"""
+
+import argparse
+import atexit
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+WAL_PATH = "results/runlog/wal.jsonl"
+
+BATCH_SIZE = 500
+
+FLUSH_INTERVAL = 1.0
+
+MAX_BACKOFF = 60.0
+
+# ObjectId-sized ids: 8 random bytes per process followed by a counter
+_ID_PREFIX = os.urandom(8).hex()
+
+_ID_COUNTER = itertools.count()
+
+
+def new_id():
+    return "{}{:08x}".format(_ID_PREFIX, next(_ID_COUNTER) & 0xFFFFFFFF)
+
+
+def _default(value):
+    # numpy scalars and arrays, datetimes
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(record):
+    return json.dumps(record, default=_default, separators=(",", ":"))
+
+
+class JsonlSink:
+    """Append-only JSONL file, skipping `_id`s already in it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.seen = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.seen = {json.loads(line)["_id"] for line in f if line.strip()}
+
+    def write(self, records):
+        new = [r for r in records if r["_id"] not in self.seen]
+        if not new:
+            return 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write("".join(dumps(r) + "\n" for r in new))
+            f.flush()
+            os.fsync(f.fileno())
+        self.seen.update(r["_id"] for r in new)
+        return len(new)
+
+    def close(self):
+        pass
+
+
+class SQLiteSink:
+    """One row per record keyed on `_id`; the record itself is stored as JSON."""
+
+    def __init__(self, path, table="runs"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.table = table
+        # the sink is only used from the logger thread, but created on the caller's
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS {} (_id TEXT PRIMARY KEY, run_id TEXT, kind TEXT, "
+                          "logged REAL, record TEXT)".format(table))
+
+    def write(self, records):
+        rows = [(r["_id"], r.get("run_id", r["_id"]), r.get("kind", "run"), r.get("logged"), dumps(r))
+                for r in records]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO {} VALUES (?, ?, ?, ?, ?)".format(self.table), rows)
+            return self.conn.total_changes - before
+
+    def read(self, kind=None):
+        sql = "SELECT record FROM {}".format(self.table)
+        rows = self.conn.execute(sql + " WHERE kind = ?", (kind,)) if kind else self.conn.execute(sql)
+        return [json.loads(r[0]) for r in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+class StoreSink:
+    """Run records into the Parquet experiment store; metric records are not kept."""
+
+    def __init__(self, store=None):
+        from wildfire import experiments
+
+        self.store = store or experiments.STORE
+
+    def write(self, records):
+        from wildfire import experiments
+
+        return experiments.ingest_records([r for r in records if r.get("kind", "run") == "run"], self.store)
+
+    def close(self):
+        pass
+
+
+class MongoSink:
+    """insert_many into a MongoDB (or API-compatible) collection, ignoring duplicate `_id`s."""
+
+    def __init__(self, uri, database="wildfire", collection="results"):
+        from pymongo import MongoClient
+
+        self.client = MongoClient(uri)
+        self.collection = self.client[database][collection]
+
+    def write(self, records):
+        from pymongo.errors import BulkWriteError
+
+        try:
+            return len(self.collection.insert_many([dict(r) for r in records], ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            # 11000 is a duplicate key: that record was delivered by an earlier attempt
+            if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                raise
+            return e.details["nInserted"]
+
+    def close(self):
+        self.client.close()
+
+
+class RunLogger:
+    """
+    Queue records in memory, persist them to `wal_path` on a background
+    thread and deliver them to `sink` in batches. The write-ahead log is
+    truncated once everything in it has been delivered; whatever is left
+    (e.g. the sink was unreachable) is delivered by the next logger
+    opened on the same file.
+    """
+
+    def __init__(self, wal_path=WAL_PATH, sink=None, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_backoff=MAX_BACKOFF, fsync=True):
+        self.wal_path = wal_path
+        self.offset_path = wal_path + ".offset"
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.fsync = fsync
+        self.logged = 0
+        self.written = 0
+        self.delivered = 0
+        self.failures = 0
+        self.last_error = None
+        os.makedirs(os.path.dirname(wal_path) or ".", exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._count = itertools.count(1)
+        self._stop = threading.Event()
+        self._flushed = threading.Condition()
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._thread = threading.Thread(target=self._run, name="runlog", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _put(self, record):
+        self._queue.put(record)
+        self.logged = next(self._count)
+        return record["_id"]
+
+    def log(self, record):
+        """Queue a copy of one record; returns its `_id`. Never blocks on I/O."""
+        record = dict(record)
+        record.setdefault("_id", new_id())
+        record.setdefault("logged", time.time())
+        return self._put(record)
+
+    def log_metric(self, run_id, key, value, step=None):
+        return self._put({"_id": new_id(), "kind": "metric", "run_id": run_id, "key": key, "value": value,
+                          "step": step, "logged": time.time()})
+
+    def flush(self, timeout=None):
+        """Wait until everything logged so far is in the write-ahead log."""
+        target = self.logged
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self.written >= target, timeout)
+
+    def close(self, timeout=30.0):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        if self.sink is not None:
+            self.sink.close()
+        atexit.unregister(self.close)
+
+    def pending(self):
+        """Bytes of the write-ahead log not yet delivered to the sink."""
+        size = os.path.getsize(self.wal_path) if os.path.exists(self.wal_path) else 0
+        return size - self._read_offset()
+
+    def _drain(self):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _append(self, batch):
+        with open(self.wal_path, "a") as f:
+            f.write("".join(dumps(r) + "\n" for r in batch))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        with self._flushed:
+            self.written += len(batch)
+            self._flushed.notify_all()
+
+    def _read_offset(self):
+        try:
+            with open(self.offset_path) as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset):
+        tmp = self.offset_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp, self.offset_path)
+
+    def _deliver(self):
+        """Send undelivered WAL lines to the sink, batch by batch, advancing the offset."""
+        if not os.path.exists(self.wal_path):
+            return
+        offset = self._read_offset()
+        with open(self.wal_path, "rb") as f:
+            f.seek(offset)
+            while True:
+                lines = list(itertools.islice(f, self.batch_size))
+                # a line without its newline is still being written
+                if lines and not lines[-1].endswith(b"\n"):
+                    lines.pop()
+                if not lines:
+                    break
+                self.delivered += self.sink.write([json.loads(line) for line in lines])
+                offset += sum(len(line) for line in lines)
+                self._write_offset(offset)
+        if offset == os.path.getsize(self.wal_path):
+            # everything delivered: start a fresh log. The offset goes back to 0
+            # first; a crash before the truncate only replays lines the sink
+            # already has, which it ignores, never seeks into a newer log
+            self._write_offset(0)
+            open(self.wal_path, "w").close()
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            if batch:
+                self._append(batch)
+            if self.sink is not None and time.monotonic() >= self._retry_at and self.pending() > 0:
+                try:
+                    self._deliver()
+                    self._backoff = 0.0
+                except Exception as e:
+                    self.failures += 1
+                    self.last_error = repr(e)
+                    self._backoff = min(max(self._backoff * 2, self.flush_interval), self.max_backoff)
+                    self._retry_at = time.monotonic() + self._backoff
+            if self._stop.is_set() and self._queue.empty():
+                if self.sink is not None and self.pending() > 0 and self.failures == 0:
+                    continue
+                return
+
+    def stats(self):
+        return {"logged": self.logged, "written": self.written, "delivered": self.delivered,
+                "failures": self.failures, "pending_bytes": self.pending(), "last_error": self.last_error}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deliver a run log's undelivered records to a sink")
+    parser.add_argument("wal", nargs="?", default=WAL_PATH)
+    sinks = parser.add_mutually_exclusive_group(required=True)
+    sinks.add_argument("--jsonl")
+    sinks.add_argument("--sqlite")
+    sinks.add_argument("--mongo", help="connection URI")
+    sinks.add_argument("--store", help="Parquet experiment store (wildfire.experiments)")
+    parser.add_argument("--database", default="wildfire")
+    parser.add_argument("--collection", default="results")
+    args = parser.parse_args()
+    if args.jsonl:
+        sink = JsonlSink(args.jsonl)
+    elif args.sqlite:
+        sink = SQLiteSink(args.sqlite)
+    elif args.store:
+        sink = StoreSink(args.store)
+    else:
+        sink = MongoSink(args.mongo, args.database, args.collection)
+    with RunLogger(args.wal, sink, flush_interval=0.1) as runlog:
+        pass
+    print(json.dumps(runlog.stats()))
@@ -0,0 +1,279 @@
+"""
+Full-scene fire scanning with a cheap-first cascade.
+
+The classifiers in 003_bd_pytorch_xgboost_no_distributed.ipynb only ever
+see pre-cropped 128x128 `landsat_mini` tiles, and the Dixie Creek
+snapshots in 001_bd_proj_main.ipynb are only displayed. `scan` walks a
+whole GeoTIFF as overlapping tiles. Rows are read once, through windowed
+reads into a rolling strip, and every tile goes through three stages:
+
+    0. prefilter  fraction of "hot" pixels, SWIR >= threshold and
+                  SWIR / reference band >= ratio, computed for a whole strip
+                  of tiles at once with cumulative sums
+    1. XGBoost    the satellite booster on tiles that pass the prefilter
+    2. CNN        the satfire checkpoint (wildfire.inference.Engine) on
+                  tiles XGBoost still calls fire
+
+The result is a three-band GeoTIFF on the tile grid: the fire
+probability from the last model that scored each tile (0 for tiles the
+prefilter rejects, NaN for tiles no model scored), how far the tile got,
+and its hot-pixel fraction. Stage values:
+
+    0  rejected by the prefilter
+    1  rejected by XGBoost
+    2  passed XGBoost (or passed through without a booster)
+    3  scored by the CNN
+
+The report gives km2/s and the fraction of tiles escalated past each stage.
+
+    python -m wildfire.scan LC08_scene.tif results/scan/heat.tif \\
+        --xgb satfire_xgb.json --checkpoint satfire_wide_resnet50_2.pt --stats band_stats.json
+
+Without `--threshold`, SWIR must reach both a high percentile of the
+scene and an absolute floor (half of full scale), so a scene with no fire
+in it passes next to nothing through the prefilter. For a 3-band RGB
+snapshot, pass the bands it has; red stands in for SWIR against green:
+
+    python -m wildfire.scan dixie_rgb.tif results/scan/dixie.tif --swir-band 1 --ref-band 2 --bands 1,2,3
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from wildfire import landsat
+
+TILE = 128
+
+STRIDE = 64
+
+# Landsat-8 SWIR-2 and NIR, as in the ratio tests of the Landsat active fire products
+SWIR_BAND = 7
+
+REF_BAND = 5
+
+RATIO = 1.4
+
+# overview percentile used as the SWIR threshold when none is given
+HOT_PERCENTILE = 99.5
+
+# absolute floor under that threshold, as a fraction of full scale (the dtype
+# range for integer scenes, 1.0 for reflectance)
+HOT_FLOOR = 0.5
+
+MIN_HOT_FRACTION = 0.001
+
+XGB_THRESHOLD = 0.5
+
+# overview decimation for the threshold estimate
+OVERVIEW = 16
+
+KM_PER_DEG = 111.32
+
+
+def tile_offsets(size, tile=TILE, stride=STRIDE):
+    """Tile start offsets covering `size` pixels; the last tile may run past the edge."""
+    return np.arange(0, max(size - tile, 0) + stride, stride)
+
+
+def window_sums(mask, offsets, tile):
+    """Per-tile sums of a (rows, width) mask over columns [o, o + tile)."""
+    cols = np.concatenate([[0], np.cumsum(mask.sum(axis=0, dtype="int64"))])
+    ends = np.minimum(offsets + tile, mask.shape[1])
+    return cols[ends] - cols[offsets]
+
+
+def hot_floor(dtype, floor=HOT_FLOOR):
+    """Absolute SWIR floor for a band of `dtype`."""
+    dtype = np.dtype(dtype)
+    return float(np.iinfo(dtype).max * floor) if np.issubdtype(dtype, np.integer) else floor
+
+
+def hot_threshold(src, band=SWIR_BAND, percentile=HOT_PERCENTILE, overview=OVERVIEW, floor=HOT_FLOOR):
+    """
+    SWIR threshold from a decimated read of the whole band: its percentile,
+    but never below the absolute floor, since a scene-relative percentile
+    alone marks the brightest pixels of every scene as hot.
+    """
+    shape = (max(src.height // overview, 1), max(src.width // overview, 1))
+    value = float(np.percentile(src.read(band, out_shape=shape), percentile))
+    return max(value, hot_floor(src.dtypes[band - 1], floor))
+
+
+def pixel_km2(src):
+    """Area of one pixel, or None when the scene has no CRS."""
+    if src.crs is None:
+        return None
+    dx, dy = src.res
+    if src.crs.is_geographic:
+        lat = (src.bounds.top + src.bounds.bottom) / 2
+        return dx * dy * KM_PER_DEG ** 2 * np.cos(np.radians(lat))
+    return dx * dy * src.crs.linear_units_factor[1] ** 2 / 1e6
+
+
+def _strips(src, bands, offsets, tile):
+    """(row offset, (bands, tile, width) strip) with each source row read once."""
+    from rasterio.windows import Window
+
+    buf, start = np.zeros((len(bands), 0, src.width), dtype="float32"), 0
+    for r in offsets:
+        end = min(r + tile, src.height)
+        have = start + buf.shape[1]
+        if end > have:
+            new = src.read(bands, window=Window(0, have, src.width, end - have)).astype("float32")
+            buf = np.concatenate([buf, new], axis=1)
+        buf, start = buf[:, r - start:], r
+        strip = buf[:, :tile]
+        if strip.shape[1] < tile:
+            strip = np.pad(strip, ((0, 0), (0, tile - strip.shape[1]), (0, 0)))
+        yield r, strip
+
+
+def _tiles(strip, offsets, tile):
+    """(n, bands, tile, tile) view of the strip at the column offsets."""
+    pad = offsets[-1] + tile - strip.shape[2]
+    if pad > 0:
+        strip = np.pad(strip, ((0, 0), (0, 0), (0, pad)))
+    view = np.lib.stride_tricks.sliding_window_view(strip, tile, axis=2)[:, :, offsets]
+    return view.transpose(2, 0, 1, 3)
+
+
+def load_booster(path):
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return booster
+
+
+def scan(path, out_path=None, xgb_model=None, checkpoint=None, band_stats=None, tile=TILE, stride=STRIDE,
+         swir_band=SWIR_BAND, ref_band=REF_BAND, ratio=RATIO, threshold=None, min_hot_fraction=MIN_HOT_FRACTION,
+         xgb_threshold=XGB_THRESHOLD, model_bands=landsat.BANDS, engine_kwargs=None):
+    """
+    Run the cascade over one scene. `band_stats` is the (mean, std) of
+    `model_bands` used when training (e.g. `BandStore.stats`); both
+    models see tiles standardized with it. Without an XGBoost model or a
+    checkpoint the corresponding stage passes everything through.
+    Returns (probability grid, stage grid, report).
+    """
+    import rasterio
+    from affine import Affine
+
+    started = time.perf_counter()
+    booster = load_booster(xgb_model) if xgb_model else None
+    engine = None
+    if checkpoint:
+        from wildfire.inference import Engine
+
+        engine = Engine(checkpoint, dataset="satellite", **(engine_kwargs or {}))
+    mean, std = (np.asarray(s, dtype="float32")[:, None, None] for s in band_stats) if band_stats else (0.0, 1.0)
+    with rasterio.open(path) as src:
+        if threshold is None:
+            threshold = hot_threshold(src, swir_band)
+        bands = sorted({swir_band, ref_band, *model_bands} - {None})
+        at = {b: i for i, b in enumerate(bands)}
+        model_idx = [at[b] for b in model_bands]
+        rows, cols = tile_offsets(src.height, tile, stride), tile_offsets(src.width, tile, stride)
+        prob = np.zeros((len(rows), len(cols)), dtype="float32")
+        stage = np.zeros((len(rows), len(cols)), dtype="uint8")
+        hot_frac = np.zeros((len(rows), len(cols)), dtype="float32")
+        pending = []
+        for i, (_, strip) in enumerate(_strips(src, bands, rows, tile)):
+            swir = strip[at[swir_band]]
+            hot = swir >= threshold
+            if ref_band is not None:
+                hot &= swir >= ratio * strip[at[ref_band]]
+            frac = window_sums(hot, cols, tile) / float(tile * tile)
+            passed = np.flatnonzero(frac >= min_hot_fraction)
+            hot_frac[i] = frac
+            if not len(passed):
+                continue
+            stage[i, passed] = 1
+            prob[i, passed] = np.nan
+            x = (_tiles(strip, cols, tile)[passed][:, model_idx] - mean) / std
+            if booster is not None:
+                import xgboost as xgb
+
+                # HWC flattening, as in BandStore.features
+                p = booster.predict(xgb.DMatrix(x.transpose(0, 2, 3, 1).reshape(len(x), -1)))
+                prob[i, passed] = p
+                keep = p >= xgb_threshold
+                passed, x = passed[keep], x[keep]
+            stage[i, passed] = 2
+            if engine is not None and len(passed):
+                stage[i, passed] = 3
+                pending += [(i, j, engine.submit(np.ascontiguousarray(t))) for j, t in zip(passed, x)]
+        for i, j, fut in pending:
+            # class 0 is Fire for the CNN checkpoints
+            prob[i, j] = fut.result()[0]
+        cell = pixel_km2(src)
+        # each grid cell is the stride-sized block centred in its tile
+        transform = src.transform * Affine.translation((tile - stride) / 2, (tile - stride) / 2) * Affine.scale(stride)
+        profile = {"driver": "GTiff", "height": len(rows), "width": len(cols), "count": 3, "dtype": "float32",
+                   "crs": src.crs, "transform": transform}
+        area = src.width * src.height * cell if cell is not None else None
+    if engine is not None:
+        engine.close()
+    if out_path:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with rasterio.open(out_path + ".tmp", "w", **profile) as dst:
+            dst.write(prob, 1)
+            dst.write(stage.astype("float32"), 2)
+            dst.write(hot_frac, 3)
+            dst.set_band_description(1, "fire_probability")
+            dst.set_band_description(2, "stage")
+            dst.set_band_description(3, "hot_fraction")
+        os.replace(out_path + ".tmp", out_path)
+    seconds = time.perf_counter() - started
+    n = prob.size
+    report = {
+        "tiles": int(n),
+        "threshold": threshold,
+        "prefilter_passed": int((stage >= 1).sum()),
+        "xgb_passed": int((stage >= 2).sum()),
+        "cnn_escalated": int((stage == 3).sum()),
+        "prefilter_fraction": float((stage >= 1).sum() / n),
+        "xgb_fraction": float((stage >= 2).sum() / n),
+        "cnn_fraction": float((stage == 3).sum() / n),
+        "fire_tiles": int((prob >= 0.5).sum()),
+        "area_km2": area,
+        "seconds": seconds,
+        "km2_per_sec": area / seconds if area is not None else None,
+        "tiles_per_sec": n / seconds,
+    }
+    return prob, stage, report
+
+
+def load_stats(path):
+    with open(path) as f:
+        stats = json.load(f)
+    return stats["mean"], stats["std"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan a GeoTIFF scene for fire with a prefilter/XGBoost/CNN cascade")
+    parser.add_argument("scene")
+    parser.add_argument("output")
+    parser.add_argument("--xgb", default=None, help="saved XGBoost booster")
+    parser.add_argument("--checkpoint", default=None, help="satfire_*.pt checkpoint")
+    parser.add_argument("--stats", default=None, help='JSON {"mean": [...], "std": [...]} for the model bands')
+    parser.add_argument("--tile", type=int, default=TILE)
+    parser.add_argument("--stride", type=int, default=STRIDE)
+    parser.add_argument("--swir-band", type=int, default=SWIR_BAND)
+    parser.add_argument("--ref-band", type=int, default=REF_BAND)
+    parser.add_argument("--ratio", type=float, default=RATIO)
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--min-hot-fraction", type=float, default=MIN_HOT_FRACTION)
+    parser.add_argument("--bands", default=",".join(str(b) for b in landsat.BANDS))
+    args = parser.parse_args()
+    _, _, report = scan(
+        args.scene, args.output, args.xgb, args.checkpoint,
+        band_stats=load_stats(args.stats) if args.stats else None,
+        tile=args.tile, stride=args.stride, swir_band=args.swir_band, ref_band=args.ref_band,
+        ratio=args.ratio, threshold=args.threshold, min_hot_fraction=args.min_hot_fraction,
+        model_bands=tuple(int(b) for b in args.bands.split(",")),
+    )
+    print(json.dumps(report, indent=1))
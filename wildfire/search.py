@@ -0,0 +1,381 @@
+"""
+Parallel hyperparameter search with successive-halving pruning.
+
+The notebooks train a bare `xgb.XGBClassifier()` and CNNs with fixed
+`LR = 0.001`, `BATCH_SIZE = 8` and `accum_iter = 4`. `search` samples
+configurations from a space and runs them as trials on a process pool
+(one core per trial). It prunes with successive halving: every trial
+gets `min_resource` boosting rounds (XGBoost) or epochs (CNN). Only the
+best 1/eta by final validation accuracy continue, with eta times the
+resource, until `max_resource`. A trial resumes from its own state at
+each rung instead of starting over, and its training/validation curves
+grow across rungs.
+
+Every finished or pruned trial goes to the run log (`wildfire.runlog`)
+as an xgb_pt.csv-shaped record (name, classifier, dataset, loss_dict,
+acc_dict, acc, runtime, epochs, LR, ...), plus its params and the rung
+it reached.
+
+    python -m wildfire.search xgboost --sources Fire NoFire --trials 27 --min-resource 10 --max-resource 270
+    python -m wildfire.search densenet161 --train-shards results/shards/aerial/Training \\
+        --valid-shards results/shards/aerial/Test --dataset aerial --trials 9 --max-resource 9
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from wildfire import runlog
+
+ETA = 3
+
+TEST_SPLIT = 0.25
+
+XGB_SPACE = {
+    "max_depth": [3, 4, 6, 8, 10],
+    "learning_rate": [0.01, 0.03, 0.1, 0.3],
+    "subsample": [0.6, 0.8, 1.0],
+    "colsample_bytree": [0.3, 0.5, 0.8, 1.0],
+    "min_child_weight": [1, 3, 10],
+    "reg_lambda": [0.1, 1.0, 10.0],
+}
+
+CNN_SPACE = {
+    "LR": [1e-4, 3e-4, 1e-3, 3e-3],
+    "batch_size": [8, 16, 32],
+    "accum_iter": [1, 2, 4],
+    "Optim": ["Adam", "SGD"],
+    "pretrained": [True],
+}
+
+PREFIXES = {"ground": "groundfire", "aerial": "aerialfire", "satellite": "satfire"}
+
+
+def sample(space, n, seed=0):
+    """n distinct random configurations from a {param: choices} space (fewer if the grid is smaller)."""
+    rng = np.random.default_rng(seed)
+    keys = sorted(space)
+    grid = int(np.prod([len(space[k]) for k in keys]))
+    seen, configs = set(), []
+    while len(configs) < min(n, grid):
+        choice = tuple(int(rng.integers(len(space[k]))) for k in keys)
+        if choice not in seen:
+            seen.add(choice)
+            configs.append({k: space[k][i] for k, i in zip(keys, choice)})
+    return configs
+
+
+def rungs(min_resource, max_resource, eta=ETA):
+    r, out = min_resource, []
+    while r < max_resource:
+        out.append(r)
+        r *= eta
+    return out + [max_resource]
+
+
+def _split(n, seed, test_split):
+    order = np.random.default_rng(seed).permutation(n)
+    n_test = int(n * test_split)
+    return np.sort(order[n_test:]), np.sort(order[:n_test])
+
+
+def xgb_trial(params, data, resource, state):
+    """
+    Continue one XGBoost trial up to `resource` boosting rounds. `data`
+    holds the X/y .npy paths from wildfire.features.build_matrix.
+    """
+    import xgboost as xgb
+
+    X, y = np.load(data["X"], mmap_mode="r"), np.load(data["y"])
+    train, valid = _split(len(y), data["seed"], data["test_split"])
+    dtrain, dvalid = xgb.DMatrix(X[train], y[train]), xgb.DMatrix(X[valid], y[valid])
+    booster = None
+    if state is not None:
+        booster = xgb.Booster()
+        booster.load_model(bytearray(state["model"]))
+    done = state["rounds"] if state else 0
+    evals = {}
+    booster = xgb.train(
+        dict(params, objective="binary:logistic", eval_metric=["logloss", "error"], tree_method="hist", nthread=1),
+        dtrain, num_boost_round=resource - done, evals=[(dtrain, "Training"), (dvalid, "Validation")],
+        evals_result=evals, xgb_model=booster, verbose_eval=False,
+    )
+    pred = (booster.predict(dvalid) >= 0.5).astype("int64")
+    return {
+        "state": {"model": bytes(booster.save_raw()), "rounds": resource},
+        "loss": {phase: evals[phase]["logloss"] for phase in evals},
+        "acc": {phase: [1 - e for e in evals[phase]["error"]] for phase in evals},
+        "confmatrix": _confmatrix(y[valid].astype("int64"), pred),
+    }
+
+
+def cnn_trial(params, data, resource, state):
+    """
+    Continue one CNN trial up to `resource` epochs, with the notebook's
+    loop (cross entropy, gradient accumulation over `accum_iter` batches).
+    `data` holds the train/valid shard directories from wildfire.shards.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    from wildfire.inference import build_model
+    from wildfire.shards import make_loader
+
+    torch.set_num_threads(1)
+    torch.manual_seed(data["seed"])
+    model = build_model(data["arch"], params.get("pretrained", False))
+    opt_cls = torch.optim.Adam if params["Optim"] == "Adam" else torch.optim.SGD
+    optimizer = opt_cls(model.parameters(), lr=params["LR"])
+    done = 0
+    if state is not None:
+        saved = torch.load(state["path"], map_location="cpu")
+        model.load_state_dict(saved["model"])
+        optimizer.load_state_dict(saved["optimizer"])
+        done = state["epochs"]
+    train = make_loader(data["train"], batch_size=params["batch_size"], workers=0, seed=data["seed"])
+    valid = make_loader(data["valid"], batch_size=64, workers=0, shuffle=False)
+    loss = {"Training": [], "Validation": []}
+    acc = {"Training": [], "Validation": []}
+    labels, preds = [], []
+    for epoch in range(done, resource):
+        train.dataset.set_epoch(epoch)
+        for phase, loader in (("Training", train), ("Validation", valid)):
+            model.train(phase == "Training")
+            total, correct, seen = 0.0, 0, 0
+            labels, preds = [], []
+            for i, (x, y) in enumerate(loader, 1):
+                with torch.set_grad_enabled(phase == "Training"):
+                    out = model(x)
+                    batch_loss = F.cross_entropy(out, y)
+                    if phase == "Training":
+                        (batch_loss / params["accum_iter"]).backward()
+                        if i % params["accum_iter"] == 0:
+                            optimizer.step()
+                            optimizer.zero_grad()
+                pred = out.argmax(1)
+                total += batch_loss.item() * len(y)
+                correct += int((pred == y).sum())
+                seen += len(y)
+                labels.append(y.numpy())
+                preds.append(pred.numpy())
+            loss[phase].append(total / seen)
+            acc[phase].append(correct / seen)
+    path = state["path"] if state else os.path.join(data["work_dir"], "trial-{}.pt".format(os.urandom(6).hex()))
+    torch.save({"model": model.state_dict(), "optimizer": optimizer.state_dict()}, path)
+    return {
+        "state": {"path": path, "epochs": resource},
+        "loss": loss,
+        "acc": acc,
+        "confmatrix": _confmatrix(np.concatenate(labels), np.concatenate(preds)) if labels else None,
+    }
+
+
+def _confmatrix(expected, predicted, classes=2):
+    m = np.zeros((classes, classes), dtype="int64")
+    np.add.at(m, (expected, predicted), 1)
+    return m.tolist()
+
+
+class Trial:
+    def __init__(self, number, params):
+        self.number = number
+        self.params = params
+        self.state = None
+        self.resource = 0
+        self.loss = {}
+        self.acc = {}
+        self.confmatrix = None
+        self.seconds = 0.0
+        self.pruned = False
+        self.rung = -1
+        self.error = None
+
+    def update(self, result, resource, seconds):
+        self.state = result["state"]
+        self.resource = resource
+        self.confmatrix = result["confmatrix"]
+        self.seconds += seconds
+        for phase, values in result["loss"].items():
+            self.loss.setdefault(phase, []).extend(values)
+        for phase, values in result["acc"].items():
+            self.acc.setdefault(phase, []).extend(values)
+
+    def fail(self, error, rung):
+        self.error = "{}: {}".format(type(error).__name__, error)
+        self.rung = rung
+
+    @property
+    def val_acc(self):
+        return self.acc["Validation"][-1] if self.acc.get("Validation") else None
+
+    @property
+    def val_loss(self):
+        return self.loss["Validation"][-1] if self.loss.get("Validation") else None
+
+    @property
+    def score(self):
+        # final validation accuracy, ties broken by lower validation loss; failed trials rank last
+        if self.error is not None:
+            return float("-inf"), float("-inf")
+        return self.val_acc, -self.val_loss
+
+
+def _timed(fn, params, data, resource, state):
+    start = time.perf_counter()
+    result = fn(params, data, resource, state)
+    return result, time.perf_counter() - start
+
+
+def successive_halving(trial_fn, configs, data, min_resource, max_resource, eta=ETA, workers=None, on_done=None):
+    """
+    Run configs through successive-halving rungs on a process pool.
+    `on_done(trial)` is called once per trial, when it is pruned, fails
+    or finishes; a trial that raises is dropped from the search with its
+    `error` set, and the others go on. Returns all trials, best first.
+    """
+    trials = [Trial(i, params) for i, params in enumerate(configs)]
+    alive = list(trials)
+    steps = rungs(min_resource, max_resource, eta)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for rung, resource in enumerate(steps):
+            futures = [(t, pool.submit(_timed, trial_fn, t.params, data, resource, t.state)) for t in alive]
+            for t, fut in futures:
+                try:
+                    result, seconds = fut.result()
+                except Exception as e:
+                    t.fail(e, rung)
+                    if on_done:
+                        on_done(t)
+                    continue
+                t.update(result, resource, seconds)
+                t.rung = rung
+            alive = [t for t in alive if t.error is None]
+            alive.sort(key=lambda t: t.score, reverse=True)
+            if rung == len(steps) - 1:
+                break
+            keep = max(1, len(alive) // eta)
+            for t in alive[keep:]:
+                t.pruned = True
+                if on_done:
+                    on_done(t)
+            alive = alive[:keep]
+    for t in alive:
+        if on_done:
+            on_done(t)
+    return sorted(trials, key=lambda t: (t.resource, t.score), reverse=True)
+
+
+def trial_record(trial, classifier, dataset, test_split, stamp):
+    """A run-log record with the xgb_pt.csv columns."""
+    params = trial.params
+    return {
+        "name": "search_{}_{}_{:03d}_{}".format(classifier, dataset, trial.number, stamp),
+        "classifier": classifier,
+        "dataset": dataset,
+        "loss_dict": trial.loss,
+        "acc_dict": trial.acc,
+        "acc": None if trial.val_acc is None else round(trial.val_acc, 3),
+        "runtime": trial.seconds,
+        "epochs": trial.resource,
+        "LR": params.get("LR", params.get("learning_rate")),
+        "Optim": params.get("Optim"),
+        "batch_size": params.get("batch_size"),
+        "Gradient Accumulation": params.get("accum_iter", 1) > 1,
+        "Skip Training": False,
+        "metric": None,
+        "confmatrix": trial.confmatrix,
+        "train_test_split": test_split,
+        "cross_val": 0,
+        "distributed": False,
+        "params": params,
+        "pruned": trial.pruned,
+        "rung": trial.rung,
+        "error": trial.error,
+    }
+
+
+def search(kind, data, dataset, trials=27, min_resource=1, max_resource=27, eta=ETA, space=None, workers=None,
+           seed=0, logger=None):
+    """
+    Sample `trials` configurations for `kind` ("xgboost" or a CNN arch)
+    and run them through successive halving. Returns a DataFrame of
+    trials, best first, with a `compute` row total against a full run of
+    every configuration.
+    """
+    if kind == "xgboost":
+        trial_fn, classifier = xgb_trial, "xgboost"
+        space = space or XGB_SPACE
+    else:
+        trial_fn, classifier = cnn_trial, "{}_{}".format(PREFIXES.get(dataset, dataset), kind)
+        space = space or CNN_SPACE
+        data = dict(data, arch=kind)
+    configs = sample(space, trials, seed)
+    stamp = datetime.now().strftime("%d_%m_%Y_%H_%M_%S")
+
+    def on_done(trial):
+        if logger is not None:
+            logger.log(trial_record(trial, classifier, dataset, data.get("test_split"), stamp))
+
+    done = successive_halving(trial_fn, configs, data, min_resource, max_resource, eta, workers, on_done)
+    report = pd.DataFrame([{
+        "trial": t.number,
+        "resource": t.resource,
+        "pruned": t.pruned,
+        "val_acc": t.val_acc,
+        "val_loss": t.val_loss,
+        "seconds": t.seconds,
+        "error": t.error,
+        **t.params,
+    } for t in done])
+    report.attrs["resource_used"] = int(sum(t.resource for t in done))
+    report.attrs["resource_full"] = len(done) * max_resource
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search")
+    parser.add_argument("kind", help="xgboost, densenet161 or wide_resnet50_2")
+    parser.add_argument("--dataset", default="ground")
+    parser.add_argument("--sources", nargs=2, metavar=("FIRE", "NO_FIRE"), help="image folders (xgboost)")
+    parser.add_argument("--max-samples", type=int, default=None)
+    parser.add_argument("--train-shards", help="wildfire.shards output (CNNs)")
+    parser.add_argument("--valid-shards")
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--min-resource", type=int, default=1)
+    parser.add_argument("--max-resource", type=int, default=27)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--wal", default=runlog.WAL_PATH)
+    parser.add_argument("--sqlite", default=None, help="deliver trial records to this SQLite run log")
+    parser.add_argument("--store", default=None, help="deliver trial records to this Parquet experiment store")
+    args = parser.parse_args()
+    work_dir = tempfile.mkdtemp(prefix="search-")
+    if args.kind == "xgboost":
+        from wildfire.features import build_matrix
+
+        x_path, y_path = build_matrix([(args.sources[0], 1), (args.sources[1], 0)], max_samples=args.max_samples)
+        data = {"X": x_path, "y": y_path, "seed": args.seed, "test_split": TEST_SPLIT}
+    else:
+        data = {"train": args.train_shards, "valid": args.valid_shards, "seed": args.seed, "work_dir": work_dir,
+                "test_split": None}
+    sink = None
+    if args.sqlite:
+        sink = runlog.SQLiteSink(args.sqlite)
+    elif args.store:
+        sink = runlog.StoreSink(args.store)
+    with runlog.RunLogger(args.wal, sink) as logger:
+        report = search(args.kind, data, args.dataset, args.trials, args.min_resource, args.max_resource, args.eta,
+                        workers=args.workers, seed=args.seed, logger=logger)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    print(report.to_string(index=False, float_format="{:.4f}".format))
+    print(json.dumps({"resource_used": report.attrs["resource_used"], "resource_full": report.attrs["resource_full"],
+                      "fraction": report.attrs["resource_used"] / report.attrs["resource_full"]}))
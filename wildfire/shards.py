@@ -0,0 +1,235 @@
+"""
+Pre-decoded, sharded image datasets for the CNN training loops.
+
+The PyTorch sections of 003_bd_pytorch_xgboost_no_distributed.ipynb read
+`ImageFolder` directories through `transforms.Resize((256, 256))`, so
+every epoch opens, decodes and resizes each JPEG again from a Drive
+mount. `compile_folder` does that work once: images are resized with the
+same nearest-neighbour filter and written as uint8 into large shard
+files, each a memory-mappable `.npy` of (n, height, width, 3):
+
+    <out>/index.json          classes, image size, shard files and counts
+    <out>/labels.npy          int64 labels of all images, in shard order
+    <out>/shard-00000.npy
+    <out>/shard-00001.npy
+    ...
+
+`ShardDataset` is an IterableDataset over those shards. Each epoch it
+shuffles the shard order and, within groups of shards, the images, from
+a seed and the epoch number, so runs are repeatable. DataLoader workers
+each take their own shards.
+
+    python -m wildfire.shards FLAME/Training results/shards/aerial/Training
+
+    loader = make_loader("results/shards/aerial/Training", batch_size=8, workers=4)
+    for epoch in range(epochs):
+        loader.dataset.set_epoch(epoch)
+        for inputs, labels in loader:
+            ...
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from wildfire.cache import file_digests
+from wildfire.features import list_images
+
+try:
+    from torch.utils.data import IterableDataset
+except ImportError:
+    # compiling shards does not need torch
+    IterableDataset = object
+
+SIZE = (256, 256)
+
+SHARD_SIZE = 1024
+
+# shards whose images are shuffled together; larger mixes better, reads less sequentially
+SHUFFLE_GROUP = 4
+
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype="float32") * 255
+
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype="float32") * 255
+
+
+def folder_sources(root):
+    """[(class directory, label)] with labels assigned like ImageFolder (sorted class names)."""
+    classes = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+    return [(os.path.join(root, c), i) for i, c in enumerate(classes)], classes
+
+
+def _decode(path, size):
+    from PIL import Image
+
+    with Image.open(path) as im:
+        return np.asarray(im.convert("RGB").resize(size, Image.NEAREST), dtype="uint8")
+
+
+def _write_shard(path, paths, size):
+    out = np.lib.format.open_memmap(path, mode="w+", dtype="uint8", shape=(len(paths), size[1], size[0], 3))
+    for i, p in enumerate(paths):
+        out[i] = _decode(p, size)
+    out.flush()
+    return len(paths)
+
+
+def compile_sources(sources, out_dir, size=SIZE, shard_size=SHARD_SIZE, classes=None, workers=None):
+    """
+    Write shards for [(directory, label), ...]. Returns the index; an
+    existing output built from the same files and settings is reused.
+    """
+    paths, labels = [], []
+    for directory, label in sources:
+        found = list_images(directory)
+        paths += found
+        labels += [label] * len(found)
+    if not paths:
+        raise ValueError("no images found")
+    digests = file_digests(paths, out_dir + ".digests.json", workers)
+    h = hashlib.sha1(json.dumps({"size": list(size), "shard_size": shard_size, "filter": "nearest"}).encode())
+    for path, label in zip(paths, labels):
+        h.update("{}:{}\n".format(digests[path], label).encode())
+    key = h.hexdigest()
+    index_path = os.path.join(out_dir, "index.json")
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+        if index["key"] == key:
+            return index
+
+    tmp = out_dir + ".tmp-{}".format(os.getpid())
+    os.makedirs(tmp, exist_ok=True)
+    chunks = [(i, paths[i:i + shard_size]) for i in range(0, len(paths), shard_size)]
+    names = ["shard-{:05d}.npy".format(n) for n in range(len(chunks))]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = list(pool.map(_write_shard, [os.path.join(tmp, n) for n in names],
+                               [c for _, c in chunks], [tuple(size)] * len(chunks)))
+    np.save(os.path.join(tmp, "labels.npy"), np.asarray(labels, dtype="int64"))
+    index = {
+        "key": key,
+        "size": list(size),
+        "classes": classes or sorted({str(label) for label in labels}),
+        "total": len(paths),
+        "shards": [{"file": n, "count": c} for n, c in zip(names, counts)],
+    }
+    with open(os.path.join(tmp, "index.json"), "w") as f:
+        json.dump(index, f, indent=1)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+    return index
+
+
+def compile_folder(root, out_dir, size=SIZE, shard_size=SHARD_SIZE, workers=None):
+    """Shards for an ImageFolder-style directory (one subdirectory per class)."""
+    sources, classes = folder_sources(root)
+    return compile_sources(sources, out_dir, size, shard_size, classes, workers)
+
+
+def load_index(root):
+    with open(os.path.join(root, "index.json")) as f:
+        return json.load(f)
+
+
+class ShardDataset(IterableDataset):
+    """
+    Iterate (CHW float32 image, label) pairs from compiled shards.
+
+    Images are normalized with the ImageNet mean/std of the notebook's
+    `dset_transform` unless `normalize` is False, in which case the
+    uint8 HWC array is yielded for `transform` to handle.
+    """
+
+    def __init__(self, root, shuffle=True, seed=0, shuffle_group=SHUFFLE_GROUP, normalize=True, transform=None):
+        self.root = root
+        self.index = load_index(root)
+        self.labels = np.load(os.path.join(root, "labels.npy"))
+        self.offsets = np.cumsum([0] + [s["count"] for s in self.index["shards"]])
+        self.shuffle = shuffle
+        self.seed = seed
+        self.shuffle_group = shuffle_group
+        self.normalize = normalize
+        self.transform = transform
+        self.epoch = 0
+        self._shards = {}
+
+    def __len__(self):
+        return self.index["total"]
+
+    @property
+    def classes(self):
+        return self.index["classes"]
+
+    def set_epoch(self, epoch):
+        """Reshuffle for the given epoch (set before iterating, as with DistributedSampler)."""
+        self.epoch = epoch
+
+    def _shard(self, n):
+        if n not in self._shards:
+            self._shards[n] = np.load(os.path.join(self.root, self.index["shards"][n]["file"]), mmap_mode="r")
+        return self._shards[n]
+
+    def order(self, worker=0, workers=1):
+        """(shard, row) pairs this worker yields this epoch."""
+        rng = np.random.default_rng([self.seed, self.epoch])
+        shards = np.arange(len(self.index["shards"]))
+        if self.shuffle:
+            shards = rng.permutation(shards)
+        for g in range(0, len(shards), self.shuffle_group * workers):
+            group = shards[g:g + self.shuffle_group * workers][worker::workers]
+            pairs = np.concatenate([np.stack([np.full(self.index["shards"][s]["count"], s),
+                                              np.arange(self.index["shards"][s]["count"])], axis=1)
+                                    for s in group]) if len(group) else np.zeros((0, 2), dtype="int64")
+            if self.shuffle:
+                pairs = pairs[rng.permutation(len(pairs))]
+            yield from pairs
+
+    def __iter__(self):
+        worker, workers = 0, 1
+        try:
+            from torch.utils.data import get_worker_info
+
+            info = get_worker_info()
+            if info is not None:
+                worker, workers = info.id, info.num_workers
+        except ImportError:
+            pass
+        for s, i in self.order(worker, workers):
+            image = self._shard(s)[i]
+            label = int(self.labels[self.offsets[s] + i])
+            if self.normalize:
+                image = ((image.astype("float32") - IMAGENET_MEAN) / IMAGENET_STD).transpose(2, 0, 1)
+            if self.transform is not None:
+                image = self.transform(image)
+            yield image, label
+
+
+def make_loader(root, batch_size=8, workers=2, prefetch_factor=4, shuffle=True, seed=0, **kwargs):
+    """
+    DataLoader over a ShardDataset with prefetching workers. Workers are
+    started per epoch so they see the epoch set with `set_epoch`.
+    """
+    from torch.utils.data import DataLoader
+
+    dataset = ShardDataset(root, shuffle=shuffle, seed=seed, **kwargs)
+    extra = {"prefetch_factor": prefetch_factor} if workers else {}
+    return DataLoader(dataset, batch_size=batch_size, num_workers=workers, **extra)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile an ImageFolder directory into uint8 shards")
+    parser.add_argument("folder")
+    parser.add_argument("output")
+    parser.add_argument("--size", type=int, nargs=2, default=list(SIZE), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="images per shard")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    index = compile_folder(args.folder, args.output, tuple(args.size), args.shard_size, args.workers)
+    print("{} images of {} in {} shards under {}".format(index["total"], ", ".join(index["classes"]),
+                                                        len(index["shards"]), args.output))
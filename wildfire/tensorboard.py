@@ -0,0 +1,198 @@
+"""
+In-process reader for TensorBoard event logs.
+
+Parses the TFRecord-framed `events.out.tfevents.*` files written by
+PyTorch Lightning directly, without tensorflow/tensorboard, and turns
+scalar summaries into columnar step / wall time / value arrays that the
+dashboard can plot with plotly.
+"""
+
+import glob
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from wildfire import instrument
+from wildfire.cache import FileCache
+
+TB_ROOT = "results/tensorboard"
+
+Curve = namedtuple("Curve", ["version", "step", "wall_time", "value"])
+
+Run = namedtuple("Run", ["logdir", "scalars", "hparams"])
+
+_HEADER = struct.Struct("<QI")
+
+CACHE = instrument.watch_cache("tensorboard", FileCache(maxsize=64, hash_contents=False))
+
+
+def _varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(buf):
+    """Yield (field number, wire type, value) for one protobuf message."""
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        num, wire = key >> 3, key & 7
+        if wire == 0:
+            val, pos = _varint(buf, pos)
+        elif wire == 1:
+            val = buf[pos:pos + 8]
+            pos += 8
+        elif wire == 2:
+            size, pos = _varint(buf, pos)
+            val = buf[pos:pos + size]
+            pos += size
+        elif wire == 5:
+            val = buf[pos:pos + 4]
+            pos += 4
+        else:
+            raise ValueError("unsupported protobuf wire type {}".format(wire))
+        yield num, wire, val
+
+
+def _tensor_scalar(buf):
+    # TensorProto: 1 dtype, 4 tensor_content, 5 float_val, 6 double_val
+    dtype = None
+    for num, wire, val in _fields(buf):
+        if num == 1:
+            dtype = val
+        elif num == 5:
+            return struct.unpack("<f", val[:4])[0]
+        elif num == 6:
+            return struct.unpack("<d", val[:8])[0]
+        elif num == 4:
+            if dtype == 2 and len(val) >= 8:
+                return struct.unpack("<d", val[:8])[0]
+            if len(val) >= 4:
+                return struct.unpack("<f", val[:4])[0]
+    return None
+
+
+def _summary_scalars(buf):
+    # Summary.Value: 1 tag, 2 simple_value, 8 tensor
+    for num, _, value in _fields(buf):
+        if num != 1:
+            continue
+        tag = None
+        scalar = None
+        for vnum, _, val in _fields(value):
+            if vnum == 1:
+                tag = bytes(val).decode("utf-8")
+            elif vnum == 2:
+                scalar = struct.unpack("<f", val)[0]
+            elif vnum == 8:
+                scalar = _tensor_scalar(val)
+        if tag is not None and scalar is not None:
+            yield tag, scalar
+
+
+def read_records(path):
+    """Yield the raw payload of each TFRecord in an event file."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            length, _ = _HEADER.unpack(header)
+            data = f.read(length)
+            f.read(4)
+            if len(data) < length:
+                # truncated trailing record from a run that is still writing
+                return
+            yield memoryview(data)
+
+
+def read_scalars(path):
+    """Scalar points of one event file as {tag: [(step, wall_time, value)]}."""
+    points = {}
+    for record in read_records(path):
+        # Event: 1 wall_time, 2 step, 5 summary
+        wall_time = 0.0
+        step = 0
+        summary = None
+        for num, _, val in _fields(record):
+            if num == 1:
+                wall_time = struct.unpack("<d", val)[0]
+            elif num == 2:
+                step = val
+            elif num == 5:
+                summary = val
+        if summary is None:
+            continue
+        for tag, value in _summary_scalars(summary):
+            points.setdefault(tag, []).append((step, wall_time, value))
+    return points
+
+
+def _to_curve(points):
+    arr = np.array(points, dtype=np.float64).reshape(-1, 4)
+    # within a version, the last point logged for a step wins
+    arr = arr[np.lexsort((arr[:, 2], arr[:, 1], arr[:, 0]))]
+    keep = np.append((arr[1:, 0] != arr[:-1, 0]) | (arr[1:, 1] != arr[:-1, 1]), True)
+    arr = arr[keep]
+    return Curve(
+        arr[:, 0].astype(np.int16),
+        arr[:, 1].astype(np.int64),
+        arr[:, 2],
+        arr[:, 3].astype(np.float32),
+    )
+
+
+@instrument.traced()
+def load_run(logdir):
+    """
+    Merge every `version_*` directory under logdir into one Run.
+
+    Each curve carries a `version` column so separate training runs stay
+    distinguishable. Event files are parsed once per (size, mtime) and
+    reused on later calls, so a rerun of the page does not touch them.
+    """
+    versions = sorted(glob.glob(os.path.join(logdir, "version_*"))) or [logdir]
+    points = {}
+    hparams = {}
+    for version in versions:
+        base = os.path.basename(version)
+        vnum = int(base.split("_")[-1]) if base.startswith("version_") else 0
+        for path in sorted(glob.glob(os.path.join(version, "events.out.tfevents.*"))):
+            for tag, pts in CACHE.get(path, read_scalars).items():
+                points.setdefault(tag, []).extend((vnum,) + p for p in pts)
+        hp = os.path.join(version, "hparams.yaml")
+        if os.path.exists(hp):
+            with open(hp) as f:
+                hparams.update(yaml.safe_load(f) or {})
+    scalars = {tag: _to_curve(pts) for tag, pts in sorted(points.items())}
+    return Run(logdir, scalars, hparams)
+
+
+def curves_frame(run, tags=None):
+    """Long-format frame of (tag, version, step, wall_time, value) for plotting."""
+    frames = []
+    for tag, curve in run.scalars.items():
+        if tags is not None and tag not in tags:
+            continue
+        frames.append(pd.DataFrame({
+            "tag": tag,
+            "version": curve.version,
+            "step": curve.step,
+            "wall_time": curve.wall_time,
+            "value": curve.value,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["tag", "version", "step", "wall_time", "value"])
+    return pd.concat(frames, ignore_index=True)
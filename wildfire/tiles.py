@@ -0,0 +1,214 @@
+"""
+Multi-resolution grid index of fire points for interactive maps.
+
+Points (FIRMS detections or NIFC/WFIGS incidents) are binned once into a
+fine lat/lng grid with per-(cell, year, cause) counts and FRP sums. The
+coarser zoom levels are rolled up from that table by halving the cell
+index, so the raw points are only read a single time. Each level is
+written as its own Parquet file:
+
+    <index>/level=0.parquet    BASE_DEG cells
+    <index>/level=1.parquet    BASE_DEG / 2 cells
+    ...
+
+`query` answers "cells in this bounding box, for these years, at this
+zoom" from the level files, so the dashboard can draw a density map from
+the full data set instead of a 2% sample.
+
+    python -m wildfire.tiles firms fire_archive_M-C61_234859.csv results/tiles/firms
+    python -m wildfire.tiles wfigs WFIGS_-_Wildland_Fire_Locations_Full_History.csv results/tiles/wfigs
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from wildfire import firms
+from wildfire import instrument
+from wildfire import wfigs
+from wildfire.cache import FileCache
+
+BASE_DEG = 8.0
+
+LEVELS = 7
+
+CHUNKSIZE = 1_000_000
+
+KEYS = ["year", "ix", "iy", "cause"]
+
+UNKNOWN = "Unknown"
+
+# west, south, east, north
+US_BBOX = (-125.0, 24.0, -66.0, 50.0)
+
+CA_BBOX = (-124.5, 32.5, -114.0, 42.0)
+
+# a view is drawn at the finest level that stays under this many cells
+MAX_CELLS = 5000
+
+CACHE = instrument.watch_cache("tiles", FileCache(maxsize=32, hash_contents=False))
+
+
+def cell_deg(level):
+    return BASE_DEG / (1 << level)
+
+
+def _bin(points, level):
+    deg = cell_deg(level)
+    ix = np.floor((points["longitude"].to_numpy(dtype="float64") + 180.0) / deg).astype("int32")
+    iy = np.floor((points["latitude"].to_numpy(dtype="float64") + 90.0) / deg).astype("int32")
+    return ix, iy
+
+
+def aggregate_points(points, level=LEVELS - 1):
+    """
+    Bin one frame of points (latitude, longitude, year and optionally frp
+    and cause) into cells at `level`.
+    """
+    ix, iy = _bin(points, level)
+    binned = pd.DataFrame({
+        "year": points["year"].to_numpy(dtype="int16"),
+        "ix": ix,
+        "iy": iy,
+        "cause": points["cause"].astype(object).fillna(UNKNOWN).to_numpy() if "cause" in points else UNKNOWN,
+        "frp": points["frp"].to_numpy(dtype="float64") if "frp" in points else 0.0,
+    })
+    out = binned.groupby(KEYS, sort=False).agg(count=("frp", "size"), frp_sum=("frp", "sum"))
+    return out.reset_index()
+
+
+def _combine(frames):
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=KEYS + ["count", "frp_sum"])
+    out = pd.concat(frames, ignore_index=True)
+    return out.groupby(KEYS, sort=False)[["count", "frp_sum"]].sum().reset_index()
+
+
+def build(chunks, out_dir, levels=LEVELS):
+    """
+    Build the index from an iterable of point frames in one pass. Returns
+    the number of cells written per level.
+    """
+    finest = levels - 1
+    fine = None
+    for chunk in chunks:
+        part = aggregate_points(chunk, finest)
+        fine = part if fine is None else _combine([fine, part])
+    if fine is None:
+        fine = aggregate_points(pd.DataFrame({"latitude": [], "longitude": [], "year": []}), finest)
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+    for level in range(finest, -1, -1):
+        shift = finest - level
+        cells = fine.assign(ix=fine["ix"] // (1 << shift), iy=fine["iy"] // (1 << shift))
+        cells = _combine([cells]).sort_values(["iy", "ix", "year"], ignore_index=True)
+        cells = cells.astype({"year": "int16", "ix": "int32", "iy": "int32", "count": "int64", "frp_sum": "float64"})
+        cells["cause"] = cells["cause"].astype("category")
+        path = os.path.join(out_dir, "level={}.parquet".format(level))
+        tmp = path + ".tmp"
+        cells.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        written[level] = len(cells)
+    return written
+
+
+def firms_points(path, chunksize=CHUNKSIZE):
+    """Filtered FIRMS detections as point frames, read in chunks."""
+    cols = ["latitude", "longitude", "acq_date", "confidence", "frp", "type"]
+    for chunk in pd.read_csv(path, usecols=lambda c: c in cols, dtype=firms.DTYPES, chunksize=chunksize):
+        keep = chunk["confidence"] >= firms.MIN_CONFIDENCE
+        if "type" in chunk:
+            keep &= chunk["type"] == firms.FIRE_TYPE
+        chunk = chunk[keep]
+        yield pd.DataFrame({
+            "latitude": chunk["latitude"],
+            "longitude": chunk["longitude"],
+            "year": chunk["acq_date"].str.slice(0, 4).astype("int16"),
+            "frp": chunk["frp"],
+        })
+
+
+def wfigs_points(path, chunksize=CHUNKSIZE):
+    """
+    Origins of US WFIGS wildfires (IncidentTypeCategory WF) with their
+    FireCause, read in chunks. POOState is "US-CA" style; other countries
+    are left out, as in wildfire.wfigs.
+    """
+    cols = ["InitialLatitude", "InitialLongitude", "FireDiscoveryDateTime", "FireCause",
+            "IncidentTypeCategory", "POOState"]
+    for chunk in pd.read_csv(path, usecols=cols, chunksize=chunksize):
+        country = chunk["POOState"].str.strip().str.upper().str.split("-", n=1).str[0]
+        chunk = chunk[(chunk["IncidentTypeCategory"] == wfigs.WILDFIRE) & (country == "US")]
+        chunk = chunk.dropna(subset=["InitialLatitude", "InitialLongitude", "FireDiscoveryDateTime"])
+        yield pd.DataFrame({
+            "latitude": chunk["InitialLatitude"],
+            "longitude": chunk["InitialLongitude"],
+            "year": chunk["FireDiscoveryDateTime"].str.slice(0, 4).astype("int16"),
+            "cause": chunk["FireCause"],
+        })
+
+
+def load_level(index_dir, level):
+    return CACHE.get(os.path.join(index_dir, "level={}.parquet".format(level)), pd.read_parquet)
+
+
+def levels(index_dir):
+    return sorted(int(os.path.basename(p)[6:-8]) for p in glob.glob(os.path.join(index_dir, "level=*.parquet")))
+
+
+def pick_level(index_dir, bbox, max_cells=MAX_CELLS):
+    """Finest level whose grid over bbox stays under max_cells cells."""
+    west, south, east, north = bbox
+    best = 0
+    for level in levels(index_dir):
+        deg = cell_deg(level)
+        if ((east - west) / deg + 1) * ((north - south) / deg + 1) > max_cells:
+            break
+        best = level
+    return best
+
+
+@instrument.traced()
+def query(index_dir, bbox, years=None, level=None, by_cause=False):
+    """
+    Cells inside bbox (west, south, east, north) with counts and FRP summed
+    over the year range. Adds lat/lng cell centres for plotting; with
+    by_cause=True there is one row per (cell, cause).
+    """
+    if level is None:
+        level = pick_level(index_dir, bbox)
+    cells = load_level(index_dir, level)
+    deg = cell_deg(level)
+    west, south, east, north = bbox
+    ix0, ix1 = int(np.floor((west + 180.0) / deg)), int(np.floor((east + 180.0) / deg))
+    iy0, iy1 = int(np.floor((south + 90.0) / deg)), int(np.floor((north + 90.0) / deg))
+    iy = cells["iy"].to_numpy()
+    # rows are sorted by iy, so the latitude band is a contiguous slice
+    lo, hi = np.searchsorted(iy, iy0, "left"), np.searchsorted(iy, iy1, "right")
+    band = cells.iloc[lo:hi]
+    mask = (band["ix"] >= ix0) & (band["ix"] <= ix1)
+    if years is not None:
+        mask &= (band["year"] >= years[0]) & (band["year"] <= years[1])
+    keys = ["ix", "iy", "cause"] if by_cause else ["ix", "iy"]
+    out = band[mask].groupby(keys, observed=True)[["count", "frp_sum"]].sum().reset_index()
+    out["longitude"] = (out["ix"] + 0.5) * deg - 180.0
+    out["latitude"] = (out["iy"] + 0.5) * deg - 90.0
+    out["level"] = level
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the multi-resolution fire grid index")
+    parser.add_argument("source", choices=["firms", "wfigs"])
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--levels", type=int, default=LEVELS)
+    args = parser.parse_args()
+    reader = firms_points if args.source == "firms" else wfigs_points
+    written = build(reader(args.input), args.output, args.levels)
+    for level, n in sorted(written.items()):
+        print("level {} ({} deg): {} cells".format(level, cell_deg(level), n))
@@ -0,0 +1,233 @@
+"""
+Monthly Google Trends series and their relation to fire activity.
+
+fire_interest.csv (Google Trends, one row per month) gains a row every
+month. A `Trends` object parses it vectorized and keeps the derived
+series (yearly peak and mean, a rolling mean, year-over-year deltas) up
+to date incrementally: on refresh only the bytes appended since the last
+read are parsed, and only the years and rolling-window months they touch
+are recomputed. If the file was rewritten rather than appended to, it is
+reread from the start.
+
+`lagged_correlation` compares a yearly interest series with yearly fire
+activity (FIRMS counts or mean FRP) at a range of lags, in NumPy.
+
+    python -m wildfire.trends results/csv/fire_interest.csv --firms results/firms/cube.parquet
+"""
+
+import argparse
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from wildfire import firms
+
+MONTH = "Month"
+
+MONTH_FORMAT = "%Y-%m"
+
+# Google Trends reports values under 1 as "<1"
+BELOW_ONE = 0.5
+
+ROLLING_MONTHS = 12
+
+MAX_LAG = 3
+
+# bytes before the last read position compared on refresh to detect a rewrite
+TAIL_BYTES = 4096
+
+
+def parse(text, header=None):
+    """Monthly values from Trends CSV text, indexed by month start."""
+    if header and not text.strip():
+        return pd.DataFrame(columns=header[1:], dtype="float64", index=pd.DatetimeIndex([], name="month"))
+    df = pd.read_csv(io.StringIO(text), header=None if header else "infer", names=header)
+    month = pd.to_datetime(df.pop(MONTH), format=MONTH_FORMAT)
+    values = df.replace("<1", BELOW_ONE).apply(pd.to_numeric, errors="coerce").astype("float64")
+    return values.set_index(pd.DatetimeIndex(month, name="month"))
+
+
+def _yearly_parts(monthly):
+    grouped = monthly.groupby(monthly.index.year)
+    parts = {"sum": grouped.sum(), "count": grouped.count(), "max": grouped.max()}
+    for part in parts.values():
+        part.index.name = "year"
+    return parts
+
+
+class Trends:
+    """Monthly series of one Trends CSV and its derived series, refreshed incrementally."""
+
+    def __init__(self, path, window=ROLLING_MONTHS):
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.appends = 0
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.header = None
+        self.tail = b""
+        self.monthly = None
+        self.rolling = None
+        self._parts = None
+        self.yearly = None
+
+    def _read_from(self, offset):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        # only complete lines; a partly written last line is read next time
+        end = data.rfind(b"\n") + 1
+        return data[:end], offset + end
+
+    def _tail_matches(self):
+        if self.offset == 0 or os.path.getsize(self.path) < self.offset:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(self.offset - len(self.tail))
+            return f.read(len(self.tail)) == self.tail
+
+    def refresh(self):
+        """Pick up appended months. Returns the number of new months."""
+        with self._lock:
+            if self.monthly is not None and os.path.getsize(self.path) == self.offset and self._tail_matches():
+                return 0
+            if self.monthly is None or not self._tail_matches():
+                self._reset()
+                data, offset = self._read_from(0)
+                first = data.find(b"\n") + 1
+                self.header = data[:first].decode("utf-8-sig").strip().split(",")
+                new = parse(data[first:].decode("utf-8"), self.header)
+                self.reloads += 1
+            else:
+                data, offset = self._read_from(self.offset)
+                new = parse(data.decode("utf-8"), self.header)
+                self.appends += 1
+            self._append(new)
+            self.offset = offset
+            with open(self.path, "rb") as f:
+                f.seek(max(0, offset - TAIL_BYTES))
+                self.tail = f.read(offset - f.tell())
+            return len(new)
+
+    def _append(self, new):
+        if self.monthly is None:
+            self.monthly = new
+            self._parts = _yearly_parts(new)
+            self.rolling = new.rolling(self.window, min_periods=1).mean()
+            self.yearly = self._derive_yearly()
+            return
+        if new.empty:
+            return
+        old_len = len(self.monthly)
+        self.monthly = pd.concat([self.monthly, new])
+        # only the new months and the window behind them are recomputed
+        context = self.monthly.iloc[max(0, old_len - self.window + 1):]
+        tail = context.rolling(self.window, min_periods=1).mean().iloc[-len(new):]
+        self.rolling = pd.concat([self.rolling, tail])
+        parts = _yearly_parts(new)
+        merged = {
+            "sum": self._parts["sum"].add(parts["sum"], fill_value=0),
+            "count": self._parts["count"].add(parts["count"], fill_value=0).astype("int64"),
+            "max": pd.concat([self._parts["max"], parts["max"]]).groupby(level="year").max(),
+        }
+        self._parts = merged
+        self.yearly = self._derive_yearly()
+
+    def _derive_yearly(self):
+        peak = self._parts["max"]
+        mean = self._parts["sum"] / self._parts["count"]
+        return pd.concat({"peak": peak, "mean": mean, "months": self._parts["count"]}, axis=1)
+
+    def resample(self, freq="year", how="peak", column=None):
+        """
+        Series at monthly or yearly frequency; yearly as the peak or mean of
+        the months in each year, or the rolling mean of the months.
+        """
+        self.refresh()
+        column = column or self.monthly.columns[0]
+        if freq == "month":
+            return (self.rolling if how == "rolling" else self.monthly)[column]
+        return self.yearly[(how, column)].rename(column)
+
+    def yoy(self, how="peak", column=None, complete=True):
+        """
+        Year-over-year change of the yearly series, absolute and in percent.
+        With `complete`, a year with fewer than twelve months is left out.
+        """
+        self.refresh()
+        column = column or self.monthly.columns[0]
+        yearly = self.yearly
+        if complete:
+            yearly = yearly[yearly[("months", column)] == 12]
+        values = yearly[(how, column)]
+        return pd.DataFrame({column: values, "change": values.diff(), "pct_change": values.pct_change() * 100})
+
+
+def lagged_correlation(left, right, max_lag=MAX_LAG):
+    """
+    Pearson correlation between two yearly series (indexed by year) for
+    lags -max_lag..max_lag. At lag k, left in year t is paired with right
+    in year t - k, so positive lags mean `left` follows `right`.
+    """
+    lx, ly = np.asarray(left.index, dtype="int64"), left.to_numpy(dtype="float64")
+    rx, ry = np.asarray(right.index, dtype="int64"), right.to_numpy(dtype="float64")
+    rows = []
+    for lag in range(-max_lag, max_lag + 1):
+        _, li, ri = np.intersect1d(lx, rx + lag, return_indices=True)
+        a, b = ly[li], ry[ri]
+        ok = ~(np.isnan(a) | np.isnan(b))
+        a, b = a[ok], b[ok]
+        r = np.nan
+        if len(a) > 2:
+            a, b = a - a.mean(), b - b.mean()
+            denom = np.sqrt((a * a).sum() * (b * b).sum())
+            r = float((a * b).sum() / denom) if denom else np.nan
+        rows.append((lag, r, len(a)))
+    return pd.DataFrame(rows, columns=["lag", "r", "n"])
+
+
+def activity(cube, exclude=firms.EXCLUDE_YEARS):
+    """Yearly FIRMS fire counts and mean FRP from a firms cube, indexed by year."""
+    counts = firms.by_year(cube, exclude).set_index("year")["count"]
+    frp = firms.mean_by_year(cube, "frp", exclude).set_index("year")["frp"]
+    return pd.concat({"count": counts, "frp": frp}, axis=1)
+
+
+_TRENDS = {}
+
+_LOCK = threading.Lock()
+
+
+def load(path, window=ROLLING_MONTHS):
+    """Shared, refreshed `Trends` for path."""
+    key = (os.path.abspath(path), window)
+    with _LOCK:
+        trends = _TRENDS.get(key)
+        if trends is None:
+            trends = _TRENDS[key] = Trends(path, window)
+    trends.refresh()
+    return trends
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yearly Google Trends interest and its lagged correlation with FIRMS activity")
+    parser.add_argument("csv")
+    parser.add_argument("--firms", default=None, help="FIRMS cube.parquet")
+    parser.add_argument("--how", choices=["peak", "mean"], default="peak")
+    parser.add_argument("--max-lag", type=int, default=MAX_LAG)
+    args = parser.parse_args()
+    trends = load(args.csv)
+    print(trends.yoy(args.how).to_string(float_format="{:.1f}".format))
+    if args.firms:
+        yearly = activity(firms.load_cube(args.firms), firms.EXCLUDE_YEARS)
+        interest = trends.resample("year", args.how)
+        for column in yearly:
+            print("\n{} vs FIRMS {}".format(interest.name, column))
+            print(lagged_correlation(interest, yearly[column], args.max_lag).to_string(index=False))
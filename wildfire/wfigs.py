@@ -0,0 +1,143 @@
+"""
+Typed, partitioned ingest of the NIFC WFIGS wildland fire locations.
+
+The notebooks read `WFIGS_-_Wildland_Fire_Locations_Full_History.csv`
+with `inferSchema` (an extra full scan) and derive year/month through
+Python UDFs. `ingest` reads the CSV once, in chunks, with an explicit
+schema, parses FireDiscoveryDateTime vectorized, splits POOState into
+country and state ("US-CA" -> "US", "CA"), fills a missing FireCause
+with "Unknown" as in 007_bd_proj_jinyang.ipynb, and writes Parquet
+partitioned by year and state. The dashboard queries only touch the
+partitions their filters select. `_manifest.json` is written last, so a
+cache keyed on it sees a new version once a rebuild is complete.
+
+    python -m wildfire.wfigs WFIGS_-_Wildland_Fire_Locations_Full_History.csv results/wfigs
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+WFIGS_ROOT = "results/wfigs"
+
+# underscore-prefixed, so pyarrow's dataset discovery skips it
+MANIFEST = "_manifest.json"
+
+CHUNKSIZE = 500_000
+
+# columns kept from the raw CSV and the dtype they are read with
+SCHEMA = {
+    "FireDiscoveryDateTime": "str",
+    "FireOutDateTime": "str",
+    "POOState": "str",
+    "IncidentTypeCategory": "category",
+    "FireCause": "str",
+    "FireCauseGeneral": "str",
+    "FireCauseSpecific": "str",
+    "PrimaryFuelModel": "str",
+    "PredominantFuelGroup": "str",
+    "InitialLatitude": "float64",
+    "InitialLongitude": "float64",
+    "DiscoveryAcres": "float64",
+    "CalculatedAcres": "float64",
+    "TotalIncidentPersonnel": "float64",
+    "EstimatedCostToDate": "float64",
+}
+
+PARTITIONING = ds.partitioning(pa.schema([("year", pa.int16()), ("state", pa.string())]), flavor="hive")
+
+WILDFIRE = "WF"
+
+
+def normalize(chunk):
+    """Typed, derived columns for one raw chunk."""
+    discovered = pd.to_datetime(chunk["FireDiscoveryDateTime"].str.split(" ").str[0],
+                                format="%Y/%m/%d", errors="coerce")
+    state = chunk["POOState"].str.strip().str.upper().str.split("-", n=1)
+    out = chunk.assign(
+        discovered=discovered,
+        year=discovered.dt.year,
+        month=discovered.dt.month,
+        country=state.str[0],
+        state=state.str[1],
+        FireCause=chunk["FireCause"].fillna("Unknown"),
+    ).drop(columns=["FireDiscoveryDateTime", "POOState"])
+    out = out.dropna(subset=["year", "state"])
+    return out.astype({"year": "int16", "month": "int8"})
+
+
+def ingest(path, root=WFIGS_ROOT, chunksize=CHUNKSIZE):
+    """Rebuild the partitioned store from the raw CSV; returns rows written."""
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    rows = 0
+    reader = pd.read_csv(path, usecols=list(SCHEMA), dtype=SCHEMA, chunksize=chunksize)
+    for i, chunk in enumerate(reader):
+        table = pa.Table.from_pandas(normalize(chunk), preserve_index=False)
+        ds.write_dataset(
+            table,
+            root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template="part-{}-{{i}}.parquet".format(i),
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        rows += table.num_rows
+    manifest = os.path.join(root, MANIFEST)
+    with open(manifest + ".tmp", "w") as f:
+        json.dump({"source": os.path.abspath(path), "rows": rows, "built": time.time()}, f, indent=1)
+    os.replace(manifest + ".tmp", manifest)
+    return rows
+
+
+def dataset(root=WFIGS_ROOT):
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+
+def _filter(years=None, states=None, country="US", types=(WILDFIRE,)):
+    expr = ds.field("country") == country
+    # years is an inclusive (first, last) range; either end may be None
+    if years is not None and years[0] is not None:
+        expr &= ds.field("year") >= years[0]
+    if years is not None and years[1] is not None:
+        expr &= ds.field("year") <= years[1]
+    if states is not None:
+        expr &= ds.field("state").isin(list(states))
+    if types is not None:
+        expr &= ds.field("IncidentTypeCategory").isin(list(types))
+    return expr
+
+
+def read(root=WFIGS_ROOT, columns=None, **filters):
+    return dataset(root).to_table(columns=columns, filter=_filter(**filters)).to_pandas()
+
+
+def fires_per_state(root=WFIGS_ROOT, years=None, by_year=False):
+    """Wildfire counts per state (and year), for the firePerState choropleth."""
+    keys = ["year", "state"] if by_year else ["state"]
+    df = read(root, columns=keys, years=years)
+    out = df.groupby(keys, observed=True).size().rename("count").reset_index()
+    return out.sort_values(keys, ignore_index=True)
+
+
+def fires_by_cause(root=WFIGS_ROOT, years=None, causes=None):
+    """Yearly wildfire counts with one column per FireCause."""
+    df = read(root, columns=["year", "FireCause"], years=years)
+    if causes is not None:
+        df = df[df["FireCause"].isin(causes)]
+    return df.groupby(["year", "FireCause"]).size().unstack(fill_value=0).sort_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest the WFIGS locations CSV into partitioned Parquet")
+    parser.add_argument("csv")
+    parser.add_argument("root", nargs="?", default=WFIGS_ROOT)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+    print("{} rows written to {}".format(ingest(args.csv, args.root, args.chunksize), args.root))